@@ -8,6 +8,12 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".
 # Import Utility functions
 from utils import setup_logger
 from utils import load_instructions_file
+from utils import term_label
+from utils import run_query
+from utils.history import make_history_compactor
+from utils.models import resolve_model
+from utils.student_profile import profile_savings, render_student_profile
+from utils.usage import make_usage_logger
 
 # Import necessary modules from Google ADK
 from google.adk import Agent
@@ -24,8 +30,8 @@ logger = setup_logger(__name__)
 client = database.Client()
 
 # === Agent Configuration ===
-MODEL = "gemini-2.0-flash"
 NAME = "manager"
+MODEL = resolve_model(NAME)
 INSTRUCTIONS = load_instructions_file(filename="agents/coordinator/instructions.txt")
 DESCRIPTION = load_instructions_file(filename="agents/coordinator/description.txt")
 
@@ -50,18 +56,6 @@ client = database.Client()
 STUDENT_ID = "FenevvS0J5R+TKOxsGvMx1APaq3HODg+ArWygHyRpYs="
 
 
-def term_label(term_code: str) -> str:
-    """
-    Converts a 6-digit term code (e.g., 202540) into a human-readable format (e.g., Fall 2025)
-    """
-    term_map = {"10": "Winter", "20": "Spring", "30": "Summer", "40": "Fall"}
-    if len(term_code) == 6:
-        year = term_code[:4]
-        code = term_code[4:]
-        return f"{term_map.get(code, 'Unknown')} {year}"
-    return "Unknown Term"
-
-
 def before_agent_callback(callback_context: CallbackContext) -> Optional[types.Content]:
     """
     Callback that runs before the agent starts processing a request.
@@ -87,7 +81,7 @@ def before_agent_callback(callback_context: CallbackContext) -> Optional[types.C
         logger.info(
             f"[BEFORE CALLBACK] Running database to fetch student_major for ID: {STUDENT_ID}"
         )
-        results = list(client.query(query, job_config=job_config).result())
+        results = run_query(client, query, job_config, name="student_details", hedge=True)
 
         if results:
             raw = dict(results[0])
@@ -112,8 +106,14 @@ def before_agent_callback(callback_context: CallbackContext) -> Optional[types.C
                 student["Term_Code"] = term_code
                 student["Term"] = term_label(term_code)
 
-            # Set in state
+            # Set in state: the full record for tools, a compact profile for prompts
+            profile = render_student_profile(student)
             state["student_details"] = student
+            state["student_profile"] = profile
+            full_tokens, profile_tokens = profile_savings(student, profile)
+            logger.info(
+                f"[BEFORE CALLBACK] Student profile ~{profile_tokens} tokens (full record ~{full_tokens})"
+            )
             logger.info(
                 f"[BEFORE CALLBACK] Loaded student: {student.get('Major_1_Desc', 'Unknown Major')} ({raw_student_id})"
             )
@@ -122,10 +122,12 @@ def before_agent_callback(callback_context: CallbackContext) -> Optional[types.C
                 f"[BEFORE CALLBACK] Student ID {STUDENT_ID} not found in database."
             )
             state["student_details"] = {}
+            state["student_profile"] = render_student_profile({})
 
     except Exception as e:
         logger.error(f"[BEFORE CALLBACK] database query failed: {e}")
         state["student_details"] = {}
+        state["student_profile"] = render_student_profile({})
 
     logger.info(
         "[BEFORE CALLBACK] Initialized state with student details from database."
@@ -141,6 +143,8 @@ coordinator = Agent(
     instruction=INSTRUCTIONS,
     sub_agents=[talkative, scheduler],
     before_agent_callback=before_agent_callback,
+    before_model_callback=make_history_compactor(NAME),
+    after_model_callback=make_usage_logger(NAME),
 )
 
 root_agent = coordinator
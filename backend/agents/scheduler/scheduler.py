@@ -9,22 +9,45 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".
 from google.adk.agents import Agent
 from google.adk.tools import ToolContext
 
-from utils import load_instructions_file, setup_logger
+from utils import load_instructions_file, next_term, run_query, setup_logger, singleflight
+from utils.history import make_history_compactor
+from utils.models import resolve_model
+from utils.tool_cache import invalidate_selection, session_memoize
+from utils.parallel_tools import ParallelToolPrefetcher, run_in_thread
+from utils.usage import make_usage_logger
+from scheduling import (
+    SECTION_FIELDS,
+    get_catalog,
+    get_eligibility_store,
+    get_free_slot_index,
+    get_search_index,
+    parse_course_list,
+    plan_terms,
+    solve_schedules,
+    to_legacy_schedule,
+)
 
 # === Logging Setup ===
 client = database.Client.from_service_account_json("database_key.json")
 logger = setup_logger(__name__)
 
 
+def catalog_version() -> str:
+    """Version of the cached catalog snapshot, used to key session-cached tool results."""
+    return get_catalog(client).version
+
+
 # === Tools ===
+@session_memoize(version=catalog_version)
 def get_enrollable_courses(tool_context: ToolContext) -> dict:
     """
     Retrieves the list of courses that a student still needs and that are offered in the upcoming term.
 
-    This function performs two database operations:
-    1. It fetches the list of courses the student has yet to complete.
-    2. It fetches the list of courses being offered in the next academic term.
-    It then computes the intersection to determine which needed courses are available for enrollment.
+    Eligibility is read from the local store materialized nightly by jobs.refresh_eligibility,
+    keyed by student and upcoming term. When the entry is missing or was computed against an
+    older catalog, it is computed live and written back: the student's needed courses are read
+    from the database once per session, and a needed course is enrollable when it is offered and
+    none of its prerequisites are still needed.
 
     Returns:
         dict: A dictionary containing:
@@ -53,28 +76,23 @@ def get_enrollable_courses(tool_context: ToolContext) -> dict:
                 "courses": [],
             }
 
-        # === Query all rows for student ===
-        query_needed = """
-            SELECT courses_still_needed
-            FROM student_details
-            WHERE Student_ID = @student_id
-        """
-        job_config_needed = database.QueryJobConfig(
-            query_parameters=[
-                database.ScalarQueryParameter("student_id", "STRING", student_id)
-            ]
-        )
-
-        result_needed = list(
-            client.query(query_needed, job_config=job_config_needed).result()
-        )
+        # === Precomputed eligibility for the upcoming term ===
+        catalog = get_catalog(client)
+        term_code = student_details.get("Term_Code")
+        upcoming_term = next_term(term_code) if term_code else None
+        store = get_eligibility_store()
+        if upcoming_term:
+            eligible_courses = store.lookup(student_id, upcoming_term, catalog.eligibility_version)
+            if eligible_courses is not None:
+                logger.info(f"Using precomputed eligibility for {student_id} ({upcoming_term})")
+                return {
+                    "status": "success",
+                    "message": f"{len(eligible_courses)} courses are available for enrollment next term.",
+                    "courses": eligible_courses,
+                }
 
-        # === Aggregate all needed courses ===
-        courses_still_needed = set()
-        for row in result_needed:
-            cell = str(row.get("courses_still_needed", "")).strip()
-            if cell and cell.lower() != "nan":
-                courses_still_needed.update(c.strip() for c in cell.split(",") if c.strip())
+        # === Needed courses (structured, cached per student in state) ===
+        courses_still_needed = load_courses_still_needed(student_id, tool_context)
 
         if not courses_still_needed:
             return {
@@ -83,18 +101,20 @@ def get_enrollable_courses(tool_context: ToolContext) -> dict:
                 "courses": [],
             }
 
-        # === Get list of offered courses ===
-        query_offerings = """
-            SELECT COURSE_ID
-            FROM course_offerings_table
-        """
-        result_offerings = list(client.query(query_offerings).result())
-        offered_courses = set(
-            row["COURSE_ID"] for row in result_offerings if row["COURSE_ID"]
+        # === Eligibility over the indexed catalog ===
+        eligible_courses = catalog.eligible_courses(courses_still_needed)
+        if upcoming_term:
+            try:
+                store.write_many(
+                    [(student_id, upcoming_term, eligible_courses)], catalog.eligibility_version
+                )
+            except Exception as e:
+                logger.warning(f"Could not store eligibility for {student_id}: {e}")
+        blocked = sorted(
+            set(courses_still_needed) & catalog.offered_course_ids - set(eligible_courses)
         )
-
-        # === Intersect ===
-        eligible_courses = sorted(list(courses_still_needed & offered_courses))
+        if blocked:
+            logger.info(f"Offered but waiting on prerequisites: {blocked}")
 
         return {
             "status": "success",
@@ -111,15 +131,167 @@ def get_enrollable_courses(tool_context: ToolContext) -> dict:
         }
 
 
-def get_course_details(course_id: str) -> dict:
+def load_courses_still_needed(student_id: str, tool_context: ToolContext) -> list[str]:
+    """
+    Return the student's needed courses, parsing them from the database only once per session.
+    """
+    needed_state = tool_context.state.get("courses_still_needed", {})
+    if needed_state.get("Student_ID") == student_id:
+        return needed_state["courses"]
+
+    courses_still_needed = fetch_courses_still_needed(student_id)
+    tool_context.state["courses_still_needed"] = {
+        "Student_ID": student_id,
+        "courses": courses_still_needed,
+    }
+    return courses_still_needed
+
+
+def fetch_courses_still_needed(student_id: str) -> list[str]:
+    """
+    Query every row for the student and aggregate 'courses_still_needed' into a sorted list.
+    """
+    query_needed = """
+        SELECT courses_still_needed
+        FROM student_details
+        WHERE Student_ID = @student_id
+    """
+    job_config_needed = database.QueryJobConfig(
+        query_parameters=[
+            database.ScalarQueryParameter("student_id", "STRING", student_id)
+        ]
+    )
+
+    result_needed = run_query(
+        client, query_needed, job_config_needed, name="courses_still_needed", hedge=True
+    )
+
+    courses_still_needed = set()
+    for row in result_needed:
+        courses_still_needed.update(parse_course_list(row.get("courses_still_needed")))
+    return sorted(courses_still_needed)
+
+
+@session_memoize(version=catalog_version)
+def plan_degree(
+    num_terms: int, max_units_per_term: int, include_summer: bool, tool_context: ToolContext
+) -> dict:
+    """
+    Plans the student's remaining courses over the next several terms in one call.
+
+    Courses are placed term by term respecting prerequisites, the terms each course is usually
+    offered in (10 Winter, 20 Spring, 30 Summer, 40 Fall) and the units cap, finishing in as
+    few terms as possible.
+
+    Args:
+        num_terms (int): How many upcoming terms to plan (e.g., 3).
+        max_units_per_term (int): Maximum units per term (e.g., 16).
+        include_summer (bool): Whether summer terms may be used.
+        tool_context (ToolContext): Tool context object maintaining agent state.
+
+    Returns:
+        dict: {
+            "status": "success" | "error",
+            "message": str,
+            "plan": [{"term_code", "term", "courses", "units"}, ...],
+            "unplaced": [courses that do not fit within the planned terms]
+        }
+    """
+    try:
+        student_details = tool_context.state.get("student_details", {})
+        student_id = student_details.get("Student_ID")
+        last_term = student_details.get("Term_Code")
+
+        if not student_id or not last_term:
+            return {
+                "status": "error",
+                "message": "Student ID or term not found in context state.",
+                "plan": [],
+            }
+
+        courses_still_needed = load_courses_still_needed(student_id, tool_context)
+        if not courses_still_needed:
+            return {
+                "status": "error",
+                "message": "No 'courses_still_needed' courses found for the student.",
+                "plan": [],
+            }
+
+        catalog = get_catalog(client)
+        result = plan_terms(
+            catalog.prerequisites,
+            courses_still_needed,
+            start_term=next_term(last_term, include_summer),
+            offering_terms=catalog.offering_terms,
+            course_units=catalog.course_units,
+            max_units_per_term=max_units_per_term,
+            max_terms=num_terms,
+            include_summer=include_summer,
+        )
+
+        message = f"Planned {len(courses_still_needed) - len(result['unplaced'])} courses over {len(result['terms'])} terms."
+        if result["unplaced"]:
+            message += f" {len(result['unplaced'])} courses do not fit within {num_terms} terms."
+
+        return {
+            "status": "success",
+            "message": message,
+            "plan": result["terms"],
+            "unplaced": result["unplaced"],
+        }
+
+    except Exception as e:
+        logger.error(f"Error planning degree: {e}")
+        return {
+            "status": "error",
+            "message": f"Failed to plan upcoming terms: {e}",
+            "plan": [],
+        }
+
+
+def convert_decimal(obj):
+    if isinstance(obj, Decimal):
+        return float(obj)
+    return obj
+
+
+@singleflight
+def fetch_course_offerings(course_id: str) -> list[dict]:
+    """
+    Query every section of a course joined with its meetings.
+
+    Identical lookups that are in flight at the same time share a single database query.
+    """
+    query = """
+        SELECT *
+        FROM course_offerings_table o
+        LEFT JOIN course_meetings_table m
+        ON o.COURSE_REFERENCE_NUMBER = m.COURSE_REFERENCE_NUMBER
+        WHERE o.COURSE_ID = @course_id
+    """
+
+    job_config = database.QueryJobConfig(
+        query_parameters=[
+            database.ScalarQueryParameter("course_id", "STRING", course_id)
+        ]
+    )
+    results = run_query(client, query, job_config, name="course_offerings", hedge=True)
+
+    return [{k: convert_decimal(v) for k, v in dict(row).items()} for row in results]
+
+
+@session_memoize(version=catalog_version)
+def get_course_details(course_id: str, tool_context: ToolContext) -> dict:
     """
     Retrieve detailed offering information for a specific course by its course ID.
 
     This function queries database's table to find all sections
-    of a given course (e.g., "ENGR001M") offered in the upcoming term.
+    of a given course (e.g., "ENGR001M") offered in the upcoming term. Results are cached in the
+    session, so repeated lookups of the same course do not query the database again.
 
     Parameters:
         course_id (str): The course ID to look up.
+        tool_context (ToolContext): Tool context object holding the session cache.
 
     Returns:
         dict: {
@@ -128,39 +300,16 @@ def get_course_details(course_id: str) -> dict:
             "message": optional message
         }
     """
-
-    def convert_decimal(obj):
-        if isinstance(obj, Decimal):
-            return float(obj)
-        return obj
-
     try:
-        query = """
-            SELECT *
-            FROM course_offerings_table o
-            LEFT JOIN course_meetings_table m
-            ON o.COURSE_REFERENCE_NUMBER = m.COURSE_REFERENCE_NUMBER
-            WHERE o.COURSE_ID = @course_id
-        """
-
-        job_config = database.QueryJobConfig(
-            query_parameters=[
-                database.ScalarQueryParameter("course_id", "STRING", course_id)
-            ]
-        )
-        results = list(client.query(query, job_config=job_config).result())
+        offerings = fetch_course_offerings(course_id)
 
-        if not results:
+        if not offerings:
             return {
                 "status": "error",
                 "course_details": [],
                 "message": f"No offerings found for course '{course_id}'.",
             }
 
-        offerings = [
-            {k: convert_decimal(v) for k, v in dict(row).items()} for row in results
-        ]
-
         return {"status": "success", "course_details": offerings}
 
     except Exception as e:
@@ -172,12 +321,108 @@ def get_course_details(course_id: str) -> dict:
         }
 
 
+def search_courses(query: str, limit: int = 5) -> dict:
+    """
+    Find offered courses matching a free-text description, such as "the machine learning course"
+    or "intro stats", using the in-memory course search index.
+
+    Matching is fuzzy over course IDs, titles and descriptions, so partial words and typos still
+    find the course. Use the returned course IDs with get_course_details.
+
+    Parameters:
+        query (str): What the student called the course.
+        limit (int): Maximum number of results.
+
+    Returns:
+        dict: {
+            "status": "success" | "error",
+            "message": str,
+            "results": [{"course_id": str, "title": str, "score": float}, ...]
+        }
+    """
+    try:
+        index = get_search_index(get_catalog(client))
+        results = index.search(query, limit=limit)
+        logger.info(f"Course search for '{query}' returned {len(results)} results")
+
+        if not results:
+            return {
+                "status": "error",
+                "message": f"No offered courses match '{query}'.",
+                "results": [],
+            }
+
+        return {
+            "status": "success",
+            "message": f"{len(results)} courses match '{query}'.",
+            "results": results,
+        }
+
+    except Exception as e:
+        logger.error(f"Course search failed for '{query}': {e}")
+        return {
+            "status": "error",
+            "message": f"Course search failed: {e}",
+            "results": [],
+        }
+
+
+@session_memoize(version=catalog_version, depends_on_selection=True)
+def find_courses_that_fit(tool_context: ToolContext) -> dict:
+    """
+    Find the student's enrollable courses that still fit around their current schedule.
+
+    A course fits when at least one of its lecture + discussion/lab combinations overlaps neither
+    the sections in state['final_schedule'] nor the avoided days and times in
+    state['constraints']. All courses are checked at once against the free-slot index of the
+    catalog's sections; courses already in the schedule are left out. The session-cached result
+    is dropped whenever the selections, constraints or final schedule change.
+
+    Returns:
+        dict: {
+            "status": "success" | "error",
+            "message": str,
+            "courses": [{"course_id": str, "fitting_options": int, "example": dict}, ...]
+        }
+    """
+    try:
+        enrollable = get_enrollable_courses(tool_context=tool_context)
+        if enrollable["status"] != "success":
+            return {"status": "error", "message": enrollable["message"], "courses": []}
+
+        final_schedule = tool_context.state.get("final_schedule", {})
+        constraints = tool_context.state.get("constraints", {})
+        index = get_free_slot_index(get_catalog(client))
+        courses = index.fitting_courses(enrollable["courses"], final_schedule, constraints)
+        logger.info(
+            f"{len(courses)} of {len(enrollable['courses'])} enrollable courses fit around "
+            f"{len(final_schedule)} scheduled courses"
+        )
+
+        return {
+            "status": "success",
+            "message": f"{len(courses)} enrollable courses fit in the current schedule.",
+            "courses": courses,
+        }
+
+    except Exception as e:
+        logger.error(f"Error finding courses that fit: {e}")
+        return {
+            "status": "error",
+            "message": f"Failed to find courses that fit: {e}",
+            "courses": [],
+        }
+
+
 def select_desired_courses(
     selected_course_ids: list[str], tool_context: ToolContext
 ) -> dict:
     """
     Retrieves selected course offerings and stores only the essential fields in the state.
 
+    Courses that are already selected keep their stored sections, so swapping one course
+    for another only queries the database for the new course.
+
     Args:
         selected_course_ids (list[str]): List of course IDs (e.g., ["CS201", "CS218"]).
         tool_context (ToolContext): Tool context object maintaining agent state.
@@ -185,18 +430,17 @@ def select_desired_courses(
     Returns:
         dict: Success or error response.
     """
-    desired_fields = {
-        "COURSE_REFERENCE_NUMBER",
-        "COURSE_ID",
-        "SCHEDULE_TYPE",
-        "COURSE_TIME",
-        "MEETING_DAYS",
-    }
-
+    previous_courses = tool_context.state.get("selected_courses", {})
     selected_courses = {}
+    fetched = 0
 
     for course_id in selected_course_ids:
-        response = get_course_details(course_id)
+        if course_id in previous_courses:
+            selected_courses[course_id] = previous_courses[course_id]
+            continue
+
+        response = get_course_details(course_id, tool_context=tool_context)
+        fetched += 1
         if response["status"] != "success" or not response["course_details"]:
             return {
                 "status": "error",
@@ -205,35 +449,72 @@ def select_desired_courses(
 
         filtered_details = []
         for record in response["course_details"]:
-            filtered_record = {k: v for k, v in record.items() if k in desired_fields}
+            filtered_record = {k: v for k, v in record.items() if k in SECTION_FIELDS}
             filtered_details.append(filtered_record)
 
         selected_courses[course_id] = filtered_details
 
+    if selected_courses.keys() != previous_courses.keys():
+        invalidate_selection(tool_context)
     tool_context.state["selected_courses"] = selected_courses
+    logger.info(
+        f"Selected {len(selected_courses)} courses ({fetched} fetched, "
+        f"{len(selected_courses) - fetched} reused from state)"
+    )
 
     return {
         "status": "success",
         "message": f"✅ Added {len(selected_courses)} selected courses to state.",
     }
 
+
+def set_schedule_constraints(
+    avoided_days: list[str], avoided_time_ranges: list[str], tool_context: ToolContext
+) -> dict:
+    """
+    Stores the student's scheduling constraints in the state for finalize_schedule.
+
+    Args:
+        avoided_days (list[str]): Days to keep free, by name or abbreviation (e.g., ["Friday"]).
+        avoided_time_ranges (list[str]): 24-hour HHMM ranges to keep free (e.g., ["0000-1000"]).
+        tool_context (ToolContext): Tool context object maintaining agent state.
+
+    Returns:
+        dict: Success response echoing the stored constraints.
+    """
+    constraints = dict(tool_context.state.get("constraints", {}))
+    constraints["avoided_days"] = avoided_days
+    constraints["avoided_time_ranges"] = avoided_time_ranges
+    tool_context.state["constraints"] = constraints
+    invalidate_selection(tool_context)
+    logger.info(f"Updated constraints: {constraints}")
+
+    return {
+        "status": "success",
+        "message": "✅ Updated scheduling constraints.",
+        "constraints": constraints,
+    }
+
+
 def finalize_schedule(tool_context: ToolContext) -> dict:
     """
-    Builds a student schedule by selecting one lecture section and one discussion/lab section 
+    Builds a student schedule by selecting one lecture section and one discussion/lab section
     (if available) for each course based on the provided constraints.
 
-    This function intelligently selects sections by:
-    1. Finding lecture sections (SCHEDULE_TYPE like 'LEC', 'Lecture', etc.)
-    2. Finding discussion/lab sections (SCHEDULE_TYPE like 'DIS', 'LAB', 'Discussion', 'Laboratory', etc.)
-    3. Selecting one of each type per course
-    4. Building a comprehensive schedule structure
+    This function ranks candidate schedules by:
+    1. Building every lecture + discussion/lab combination per course that avoids the
+       constrained days and times
+    2. Enumerating conflict-free combinations across courses
+    3. Scoring each candidate on gap time, days on campus, earliest start, latest end and
+       back-to-back classes (weights configurable via constraints['score_weights'])
+    4. Returning the best schedule plus the next best alternatives
 
     Returns:
         dict: A structured schedule with both lecture and discussion/lab sections, or error response.
     """
     try:
         logger.info("Starting finalize_schedule function")
-        
+
         selected_courses = tool_context.state.get("selected_courses", {})
         if not selected_courses:
             logger.warning("No selected courses found in state")
@@ -241,210 +522,63 @@ def finalize_schedule(tool_context: ToolContext) -> dict:
                 "status": "error",
                 "message": "No courses found in state. Please select courses first.",
             }
-        
-        logger.info(f"Found {len(selected_courses)} courses in state")
 
-        
-        day_map = {
-            "M": "Monday",
-            "T": "Tuesday", 
-            "W": "Wednesday",
-            "R": "Thursday",
-            "F": "Friday",
-            "S": "Saturday",
-            "U": "Sunday",
-        }
+        logger.info(f"Found {len(selected_courses)} courses in state")
 
-        final_schedule = {}
-        
         # Get constraints from state if they exist
         constraints = tool_context.state.get("constraints", {})
-        avoided_days = constraints.get("avoided_days", [])
-        avoided_time_ranges = constraints.get("avoided_time_ranges", [])
-        logger.info(f"Using constraints - avoided days: {avoided_days}, avoided time ranges: {avoided_time_ranges}")
-
-        def is_lecture_section(schedule_type):
-            """Check if a section is a lecture section."""
-            if not schedule_type:
-                return False
-            schedule_type = str(schedule_type).upper().strip()
-            lecture_types = ['LEC', 'LECTURE', 'L']
-            return any(lec_type in schedule_type for lec_type in lecture_types)
-
-        def is_discussion_or_lab_section(schedule_type):
-            """Check if a section is a discussion or lab section."""
-            if not schedule_type:
-                return False
-            schedule_type = str(schedule_type).upper().strip()
-            discussion_lab_types = ['DIS', 'DISCUSSION', 'LAB', 'LABORATORY', 'D', 'REC', 'RECITATION']
-            return any(dl_type in schedule_type for dl_type in discussion_lab_types)
-
-        def format_section_schedule(section):
-            """Format a section's schedule information."""
-            try:
-                course_days = {day: [] for day in day_map.values()}
-                
-                days_field = section.get("MEETING_DAYS")
-                start = section.get("COURSE_START_TIME")
-                end = section.get("COURSE_END_TIME")
-
-                for abbrev in str(days_field).split(","):
-                    abbrev = abbrev.strip().upper()
-                    if abbrev in day_map:
-                        day_name = day_map[abbrev]
-                        try:
-                            # Convert to int for UI parsing
-                            start_int = int(float(str(start)))
-                            end_int = int(float(str(end)))
-                            course_days[day_name] = [start_int, end_int]
-                        except (ValueError, TypeError) as e:
-                            logger.warning(f"Time conversion error for {abbrev}: {e}")
-
-                return course_days
-            except Exception as e:
-                logger.error(f"Error in format_section_schedule: {e}")
-                return {day: [] for day in day_map.values()}
+        logger.info(
+            f"Using constraints - avoided days: {constraints.get('avoided_days', [])}, "
+            f"avoided time ranges: {constraints.get('avoided_time_ranges', [])}"
+        )
 
-        # Process each course
-        for course_id, sections in selected_courses.items():
-            try:
-                logger.info(f"Processing course {course_id} with {len(sections)} sections")
-                
-                if not sections:
-                    logger.warning(f"No sections found for course {course_id}")
-                    continue
-
-                # Separate sections by type
-                lecture_sections = []
-                discussion_lab_sections = []
-                other_sections = []
-
-                for section in sections:
-                    schedule_type = section.get("SCHEDULE_TYPE", "")
-                    logger.debug(f"Section schedule type: {schedule_type}")
-                    
-                    if is_lecture_section(schedule_type):
-                        lecture_sections.append(section)
-                    elif is_discussion_or_lab_section(schedule_type):
-                        discussion_lab_sections.append(section)
-                    else:
-                        other_sections.append(section)
-
-                logger.info(f"Course {course_id}: {len(lecture_sections)} lectures, {len(discussion_lab_sections)} discussion/labs, {len(other_sections)} other")
-
-                # Select best sections
-                selected_lecture = None
-                selected_discussion_lab = None
-
-                # Select lecture section (prefer first available)
-                if lecture_sections:
-                    selected_lecture = lecture_sections[0]
-                elif other_sections:
-                    # Fallback to first section if no clear lecture
-                    selected_lecture = other_sections[0]
-
-                # Select discussion/lab section
-                if discussion_lab_sections:
-                    selected_discussion_lab = discussion_lab_sections[0]
-
-                # Build the schedule entry for this course
-                course_schedule_entry = {
-                    "course_id": course_id,
-                    "sections": []
-                }
+        # Re-check only the domains affected by the latest change and warm-start from
+        # the previous solution kept in the session
+        solver_state = dict(tool_context.state.get("solver_state", {}))
+        result = solve_schedules(selected_courses, constraints, solver_state=solver_state)
+        tool_context.state["solver_state"] = solver_state
+        if result["status"] != "success":
+            return {"status": "error", "message": result["message"], "schedule": {}}
 
-                # Add lecture section
-                if selected_lecture:
-                    lecture_entry = {
-                        "type": "lecture",
-                        "crn": selected_lecture.get("COURSE_REFERENCE_NUMBER"),
-                        "schedule_type": selected_lecture.get("SCHEDULE_TYPE"),
-                        "days": format_section_schedule(selected_lecture)
-                    }
-                    course_schedule_entry["sections"].append(lecture_entry)
-                    logger.debug(f"Added lecture section for {course_id}")
-
-                # Add discussion/lab section
-                if selected_discussion_lab:
-                    disc_lab_entry = {
-                        "type": "discussion_lab",
-                        "crn": selected_discussion_lab.get("COURSE_REFERENCE_NUMBER"),
-                        "schedule_type": selected_discussion_lab.get("SCHEDULE_TYPE"),
-                        "days": format_section_schedule(selected_discussion_lab)
-                    }
-                    course_schedule_entry["sections"].append(disc_lab_entry)
-                    logger.debug(f"Added discussion/lab section for {course_id}")
-
-                final_schedule[course_id] = course_schedule_entry
-                
-            except Exception as e:
-                logger.error(f"Error processing course {course_id}: {e}")
-                # Continue with other courses even if one fails
-                continue
+        best, *alternatives = result["schedules"]
+        final_schedule = best["detailed_schedule"]
 
         # Store the schedule in state
         tool_context.state["final_schedule"] = final_schedule
+        invalidate_selection(tool_context)
         logger.info(f"Stored final schedule with {len(final_schedule)} courses")
 
         # CREATE BACKWARD-COMPATIBLE FORMAT FOR UI
-        legacy_schedule = {}
-        for course_id, course_data in final_schedule.items():
-            sections = course_data.get("sections", [])
-            
-            # Combine all sections into a single entry for UI compatibility
-            combined_days = {}
-            combined_crns = []
-            combined_types = []
-            
-            for section in sections:
-                section_days = section.get("days", {})
-                section_crn = section.get("crn")
-                section_type = section.get("schedule_type", "")
-                
-                # Merge days from all sections
-                for day, times in section_days.items():
-                    if times: 
-                        if day not in combined_days:
-                            combined_days[day] = times
-                
-                if section_crn:
-                    combined_crns.append(str(section_crn))
-                if section_type:
-                    combined_types.append(section_type)
-            
-            # Create legacy format entry
-            legacy_schedule[course_id] = {
-                "Name": course_id,
-                "CRN": "/".join(combined_crns) if combined_crns else "",
-                "Schedule_Type": "/".join(combined_types) if combined_types else "",
-                "Days": combined_days
-            }
-
-        import json
-        try:
-            json_test = json.dumps(legacy_schedule, default=str)
-            logger.info(f"JSON serialization test passed for legacy_schedule")
-        except Exception as e:
-            logger.error(f"JSON serialization failed: {e}")
+        legacy_schedule = to_legacy_schedule(final_schedule)
 
         # Create a summary for the response
         total_sections = sum(len(course.get("sections", [])) for course in final_schedule.values())
-        
+
         return {
             "status": "success",
             "message": f"📅 Final schedule constructed with {len(final_schedule)} courses and {total_sections} sections.",
-            "schedule": legacy_schedule, 
+            "schedule": legacy_schedule,
             "detailed_schedule": final_schedule,
             "summary": {
                 "total_courses": len(final_schedule),
                 "total_sections": total_sections,
-                "courses_with_lecture": sum(1 for course in final_schedule.values() 
+                "courses_with_lecture": sum(1 for course in final_schedule.values()
                                           if any(section.get("type") == "lecture" for section in course.get("sections", []))),
-                "courses_with_discussion_lab": sum(1 for course in final_schedule.values() 
-                                                 if any(section.get("type") == "discussion_lab" for section in course.get("sections", [])))
-            }
+                "courses_with_discussion_lab": sum(1 for course in final_schedule.values()
+                                                 if any(section.get("type") == "discussion_lab" for section in course.get("sections", []))),
+                "score": best["score"],
+                "metrics": best["metrics"],
+            },
+            "alternatives": [
+                {
+                    "schedule": to_legacy_schedule(alt["detailed_schedule"]),
+                    "score": alt["score"],
+                    "metrics": alt["metrics"],
+                }
+                for alt in alternatives
+            ],
         }
-        
+
     except Exception as e:
         logger.error(f"Critical error in finalize_schedule: {e}")
         return {
@@ -471,8 +605,8 @@ def get_student_details(tool_context: ToolContext) -> dict:
 
 
 # === Agent Configuration ===
-MODEL = "gemini-2.0-flash"
 NAME = "scheduler"
+MODEL = resolve_model(NAME)
 DESCRIPTION = load_instructions_file("agents/scheduler/description.txt")
 INSTRUCTIONS = load_instructions_file("agents/scheduler/instructions.txt")
 
@@ -481,19 +615,33 @@ logger.info(f"Entered {NAME} agent.")
 logger.info(f"Using Description: {DESCRIPTION[:50]}...")
 logger.info(f"Using Instructions: {INSTRUCTIONS[:50]}...")
 
+# === Parallel Tool Calls ===
+TOOLS = [
+    get_enrollable_courses,
+    plan_degree,
+    search_courses,
+    get_course_details,
+    find_courses_that_fit,
+    get_student_details,
+    select_desired_courses,
+    set_schedule_constraints,
+    finalize_schedule,
+]
+
+# Read-only lookups that depend only on their arguments; everything else stays serialized
+prefetcher = ParallelToolPrefetcher(TOOLS, parallel_safe={"get_course_details", "search_courses"})
+
 # === Instantiate Agent ===
 scheduler = Agent(
     name=NAME,
     model=MODEL,
     description=DESCRIPTION,
     instruction=INSTRUCTIONS,
-    tools=[
-        get_enrollable_courses,
-        get_course_details,
-        get_student_details,
-        select_desired_courses,
-        finalize_schedule,
-    ],
+    # Tools query the database, so they run off the event loop
+    tools=[run_in_thread(tool) for tool in TOOLS],
+    before_model_callback=make_history_compactor(NAME),
+    after_model_callback=[make_usage_logger(NAME), prefetcher.after_model_callback],
+    before_tool_callback=prefetcher.before_tool_callback,
 )
 
 root_agent = scheduler
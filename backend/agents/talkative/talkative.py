@@ -6,13 +6,16 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".
 
 from google.adk.agents import Agent
 from utils import load_instructions_file, setup_logger
+from utils.history import make_history_compactor
+from utils.models import resolve_model
+from utils.usage import make_usage_logger
 
 # === Logging Setup ===
 logger = setup_logger(__name__)
 
 # === Agent Configuration ===
-MODEL = "gemini-2.0-flash"
 NAME = "talkative"
+MODEL = resolve_model(NAME)
 DESCRIPTION = load_instructions_file(filename="agents/talkative/description.txt")
 INSTRUCTIONS = load_instructions_file(filename="agents/talkative/instructions.txt")
 
@@ -27,6 +30,8 @@ talkative = Agent(
     model=MODEL,
     description=DESCRIPTION,
     instruction=INSTRUCTIONS,
+    before_model_callback=make_history_compactor(NAME),
+    after_model_callback=make_usage_logger(NAME),
 )
 
 root_agent = talkative
@@ -0,0 +1,121 @@
+"""
+Micro-benchmark for /run response serialization.
+
+Compares the previous path (FastAPI's jsonable_encoder + json.dumps, plus the extra json.dumps
+finalize_schedule used to run) with common.responses (orjson, br/gzip) on a
+synthetic session state shaped like a real one, and reports bytes and CPU per response.
+
+Usage:
+    python -m benchmarks.response_serialization --courses 6 --sections 15 --iterations 200
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+from decimal import Decimal
+
+# Add the project root (1 level up from this file) to Python's module search path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from common.responses import compress, dumps
+
+try:
+    from fastapi.encoders import jsonable_encoder
+except ImportError:  # Fall back to the stdlib encoder alone when FastAPI is not installed
+    jsonable_encoder = None
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Benchmark agent server response serialization")
+    parser.add_argument("--courses", type=int, default=6)
+    parser.add_argument("--sections", type=int, default=15, help="Sections per course")
+    parser.add_argument("--iterations", type=int, default=200)
+    return parser.parse_args()
+
+
+def synthetic_payload(courses: int, sections: int) -> dict:
+    """A /run response with student details, selected course sections and a final schedule."""
+    now = datetime(2025, 1, 6, 9, 30, tzinfo=timezone.utc)
+    student = {f"Field_{i}": f"value {i}" for i in range(30)}
+    student.update({"Student_ID": "abc123", "GPA": Decimal("3.47"), "Last_Updated": now})
+
+    selected = {}
+    for c in range(courses):
+        course_id = f"CS{100 + c}"
+        selected[course_id] = [
+            {
+                "COURSE_ID": course_id,
+                "COURSE_REFERENCE_NUMBER": 10000 + c * 100 + s,
+                "SCHEDULE_TYPE": "LEC" if s % 3 == 0 else "DIS",
+                "MEETING_DAYS": "M,W,F",
+                "COURSE_START_TIME": 900 + s * 10,
+                "COURSE_END_TIME": 950 + s * 10,
+                "UNITS": Decimal("4.0"),
+                "BUILDING": "Engineering",
+                "ROOM": f"{s}A",
+                "INSTRUCTOR": f"Instructor {s}",
+                "CREATED_AT": now,
+            }
+            for s in range(sections)
+        ]
+
+    final_schedule = {
+        course_id: {
+            "course_id": course_id,
+            "sections": [
+                {"type": "lecture", "crn": rows[0]["COURSE_REFERENCE_NUMBER"], "schedule_type": "LEC",
+                 "days": {"Monday": [900, 950], "Wednesday": [900, 950]}},
+            ],
+        }
+        for course_id, rows in selected.items()
+    }
+
+    return {
+        "session_id": "session-1",
+        "status": "success",
+        "message": "Here is your schedule.",
+        "state": {
+            "student_details": student,
+            "selected_courses": selected,
+            "final_schedule": final_schedule,
+        },
+    }
+
+
+def legacy_serialize(payload: dict) -> bytes:
+    """The previous path: a throwaway json.dumps of the schedule, then FastAPI's encoder."""
+    json.dumps(payload["state"]["final_schedule"], default=str)
+    if jsonable_encoder is not None:
+        return json.dumps(jsonable_encoder(payload)).encode()
+    return json.dumps(payload, default=str).encode()
+
+
+def measure(label: str, fn, iterations: int) -> tuple[float, int]:
+    size = len(fn())
+    started = time.process_time()
+    for _ in range(iterations):
+        fn()
+    cpu_us = (time.process_time() - started) / iterations * 1e6
+    print(f"{label:<28} {size:>9} bytes {cpu_us:>10.1f} us CPU/response")
+    return cpu_us, size
+
+
+def main():
+    args = parse_args()
+    payload = synthetic_payload(args.courses, args.sections)
+
+    encoder = "jsonable_encoder + json" if jsonable_encoder is not None else "json (default=str)"
+    print(f"Payload: {args.courses} courses x {args.sections} sections; baseline: {encoder}")
+    before, _ = measure("before", lambda: legacy_serialize(payload), args.iterations)
+    after, _ = measure("orjson", lambda: dumps(payload), args.iterations)
+    measure("orjson + gzip", lambda: compress(dumps(payload), "gzip"), args.iterations)
+    measure("orjson + br", lambda: compress(dumps(payload), "br"), args.iterations)
+    print(f"Serialization speedup: {before / max(after, 1e-9):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
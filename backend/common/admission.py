@@ -0,0 +1,182 @@
+import asyncio
+import heapq
+import itertools
+import os
+import sys
+from contextlib import asynccontextmanager
+from typing import Optional
+
+# Add the root directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from utils import setup_logger
+
+logger = setup_logger(__name__)
+
+# Waiters from in-progress conversations are served before new conversations
+PRIORITY_CONTINUING = 0
+PRIORITY_NEW = 1
+
+# Placeholder user IDs shared by every client (the frontend and callers that omit one); they
+# identify nobody, so the per-user limit never applies to them directly
+SHARED_USER_IDS = {
+    user_id.strip()
+    for user_id in os.getenv("RUN_SHARED_USER_IDS", "default_user,current_user").split(",")
+    if user_id.strip()
+}
+
+
+def admission_key(user_id: Optional[str], session_id: Optional[str]) -> Optional[str]:
+    """
+    Identity the per-user limit is counted against.
+
+    A real user ID is used as is. For a shared placeholder ID the session stands in for the user,
+    and a new conversation without a session has no identity, so only the global limit applies.
+    """
+    if user_id and user_id not in SHARED_USER_IDS:
+        return f"user:{user_id}"
+    if session_id:
+        return f"session:{session_id}"
+    return None
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request is turned away instead of being queued."""
+
+    def __init__(self, status_code: int, reason: str, retry_after: int = 1):
+        super().__init__(reason)
+        self.status_code = status_code
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Concurrency governor in front of TaskManager.process_task.
+
+    Limits the number of requests running at once globally and per user. Requests over the
+    global limit wait in a bounded priority queue (in-progress conversations first); anything
+    that cannot be queued is rejected straight away with 429 (per-user limit) or 503 (overloaded).
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = 32,
+        max_per_user: int = 2,
+        max_queue: int = 64,
+        queue_timeout: float = 10.0,
+    ):
+        self.max_concurrent = max_concurrent
+        self.max_per_user = max_per_user
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+
+        self.running = 0
+        self.per_user = {}
+        self._waiters = []  # heap of (priority, sequence, future)
+        self._sequence = itertools.count()
+
+    @classmethod
+    def from_env(cls) -> "AdmissionController":
+        """Build a controller from RUN_MAX_CONCURRENT, RUN_MAX_PER_USER, RUN_MAX_QUEUE and RUN_QUEUE_TIMEOUT."""
+        return cls(
+            max_concurrent=int(os.getenv("RUN_MAX_CONCURRENT", "32")),
+            max_per_user=int(os.getenv("RUN_MAX_PER_USER", "2")),
+            max_queue=int(os.getenv("RUN_MAX_QUEUE", "64")),
+            queue_timeout=float(os.getenv("RUN_QUEUE_TIMEOUT", "10")),
+        )
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for *_, future in self._waiters if not future.done())
+
+    @asynccontextmanager
+    async def admit(self, key: Optional[str], continuing: bool = False):
+        """
+        Hold a slot for the duration of the block, waiting in the queue if necessary.
+
+        Args:
+            key (str | None): Identity the per-user limit is counted against (see admission_key);
+                None skips the per-user limit.
+            continuing (bool): Whether the request continues an existing conversation.
+
+        Raises:
+            AdmissionRejected: 429 when the user is over their limit, 503 when the queue is full
+                or the wait exceeds queue_timeout.
+        """
+        if key is not None:
+            if self.per_user.get(key, 0) >= self.max_per_user:
+                logger.warning(f"Rejecting request from {key}: per-user limit reached")
+                raise AdmissionRejected(429, "Too many concurrent requests for this user.")
+            self.per_user[key] = self.per_user.get(key, 0) + 1
+
+        try:
+            await self._acquire(PRIORITY_CONTINUING if continuing else PRIORITY_NEW)
+        except BaseException:
+            self._release_user(key)
+            raise
+
+        try:
+            yield
+        finally:
+            self._release_user(key)
+            self._release_slot()
+
+    # === Internals ===
+    async def _acquire(self, priority: int):
+        if self.running < self.max_concurrent and not self.queued:
+            self.running += 1
+            return
+
+        if self.queued >= self.max_queue:
+            if not self._evict_lower_priority(priority):
+                logger.warning(f"Rejecting request: {self.running} running, {self.queued} queued")
+                raise AdmissionRejected(503, "Server is at capacity, please retry shortly.")
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+        try:
+            # _release_slot hands its slot straight to the next waiter, so running is unchanged
+            await asyncio.wait_for(asyncio.shield(future), self.queue_timeout)
+        except asyncio.TimeoutError:
+            if _granted(future):
+                # Granted at the same moment the wait timed out; give the slot back
+                self._release_slot()
+            future.cancel()
+            raise AdmissionRejected(503, "Timed out waiting for capacity, please retry shortly.")
+        except asyncio.CancelledError:
+            if _granted(future):
+                self._release_slot()
+            future.cancel()
+            raise
+        if isinstance(future.result(), AdmissionRejected):
+            raise future.result()
+
+    def _evict_lower_priority(self, priority: int) -> bool:
+        """Reject the newest waiter with a lower priority to make room; False if there is none."""
+        candidates = [w for w in self._waiters if w[0] > priority and not w[2].done()]
+        if not candidates:
+            return False
+        victim = max(candidates, key=lambda w: (w[0], w[1]))
+        victim[2].set_result(AdmissionRejected(503, "Displaced by an in-progress conversation."))
+        return True
+
+    def _release_slot(self):
+        while self._waiters:
+            *_, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self.running -= 1
+
+    def _release_user(self, key: Optional[str]):
+        if key is None:
+            return
+        self.per_user[key] -= 1
+        if not self.per_user[key]:
+            del self.per_user[key]
+
+
+def _granted(future: asyncio.Future) -> bool:
+    """Whether a waiter's future was handed a slot (as opposed to cancelled or displaced)."""
+    return future.done() and not future.cancelled() and future.result() is None
@@ -6,9 +6,13 @@ import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from fastapi import FastAPI, Request, Body
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 from typing import Any, Dict, List, Optional
+import asyncio
+import contextlib
 import uuid
+from collections import defaultdict
 
 from google.adk.sessions import InMemorySessionService
 from google.adk.artifacts.in_memory_artifact_service import InMemoryArtifactService
@@ -16,6 +20,8 @@ from google.adk.runners import Runner
 from google.genai import types as adk_types
 
 from agents.coordinator import coordinator  # your agent instance
+from common.admission import AdmissionController, AdmissionRejected, admission_key
+from common.responses import dumps, json_response
 
 # Middleware for CORS support
 from fastapi.middleware.cors import CORSMiddleware
@@ -43,12 +49,64 @@ class AgentResponse(BaseModel):
     )
 
 
+class BatchRequest(BaseModel):
+    requests: List[AgentRequest] = Field(
+        ..., description="Requests to run; those sharing a session_id run one after another in order"
+    )
+    max_parallel: Optional[int] = Field(
+        None, description="How many requests of the batch run at once (capped by the server)"
+    )
+    stream: bool = Field(
+        False, description="Stream results as NDJSON lines as they finish instead of in order"
+    )
+
+
+class BatchItemResponse(AgentResponse):
+    index: int = Field(..., description="Position of the request in the batch")
+    status_code: int = Field(200, description="HTTP status the request would have had on /run")
+
+
+class BatchResponse(BaseModel):
+    results: List[BatchItemResponse] = Field(default_factory=list)
+
+
+# Session state the agents keep for themselves; never sent back to clients
+INTERNAL_STATE_KEYS = {"tool_cache", "solver_state"}
+
+
+def client_state(state: Optional[dict]) -> dict:
+    """Session state as returned to clients, without the agents' internal caches."""
+    return {k: v for k, v in (state or {}).items() if k not in INTERNAL_STATE_KEYS}
+
+
+# === Batch Configuration ===
+BATCH_MAX_ITEMS = int(os.getenv("RUN_BATCH_MAX_ITEMS", "100"))
+BATCH_MAX_PARALLEL = int(os.getenv("RUN_BATCH_MAX_PARALLEL", "8"))
+
+
 # === Helper Function to Create Agent Server ===
-def create_agent_server(name: str, description: str, task_manager: any) -> FastAPI:
+def create_agent_server(
+    name: str,
+    description: str,
+    task_manager: any,
+    admission: Optional[AdmissionController] = None,
+) -> FastAPI:
     """
     Create a FastAPI server for the agent with the given name and description.
     This function is used to set up the agent server with the provided task manager.
+
+    Every /run call goes through the admission controller (configured from the environment
+    unless one is passed in), which caps concurrent runs globally and per user (or per session
+    for the shared placeholder user IDs, see admission_key) and rejects
+    overflow with 429/503 instead of letting it pile up.
+
+    Responses are serialized with orjson and compressed with br/gzip when the client accepts it
+    (see common.responses); AgentResponse documents their shape.
+
+    /run/batch runs a list of requests concurrently, each admitted like a /run call; requests
+    that share a session run one after another in batch order.
     """
+    admission = admission or AdmissionController.from_env()
     app = FastAPI(title=f"{name} agent server", description=description)
     app.add_middleware(
         CORSMiddleware,
@@ -58,26 +116,88 @@ def create_agent_server(name: str, description: str, task_manager: any) -> FastA
         allow_headers=["*"],
     )
 
+    async def execute(request: AgentRequest) -> tuple[int, dict, dict]:
+        """Run one request through admission and the task manager: (status code, body, headers)."""
+        key = admission_key(request.context.get("user_id"), request.session_id)
+        try:
+            # Requests that continue an existing session are admitted ahead of new ones
+            async with admission.admit(key, continuing=bool(request.session_id)):
+                result = await task_manager.process_task(
+                    request.message, request.context, request.session_id
+                )
+            return 200, {
+                "session_id": result.get("session_id"),
+                "status": result.get("status"),
+                "message": result.get("message", "Task Completed"),
+                "state": client_state(result.get("state")),
+            }, {}
+        except AdmissionRejected as e:
+            return e.status_code, {
+                "session_id": request.session_id,
+                "status": "error",
+                "message": e.reason,
+                "state": {},
+            }, {"Retry-After": str(e.retry_after)}
+        except Exception as e:
+            return 200, {
+                "session_id": request.session_id,
+                "status": "error",
+                "message": f"Error processing task: {str(e)}",
+                "state": {},
+            }, {}
+
     # Post endpoint to handle agent requests
     @app.post("/run", response_model=AgentResponse)
-    async def run(request: AgentRequest = Body(...)):
-        try:
-            result = await task_manager.process_task(
-                request.message, request.context, request.session_id
-            )
-            return AgentResponse(
-                message=result.get("message", "Task Completed"),
-                session_id=result.get("session_id"),
-                status=result.get("status"),
-                state=result.get("state"),
+    async def run(http_request: Request, request: AgentRequest = Body(...)):
+        status_code, body, headers = await execute(request)
+        return json_response(http_request, body, status_code=status_code, headers=headers)
+
+    # Post endpoint to handle several independent agent requests in one call
+    @app.post("/run/batch", response_model=BatchResponse)
+    async def run_batch(http_request: Request, batch: BatchRequest = Body(...)):
+        if len(batch.requests) > BATCH_MAX_ITEMS:
+            return json_response(
+                http_request,
+                {"detail": f"Batches are limited to {BATCH_MAX_ITEMS} requests."},
+                status_code=413,
             )
-        except Exception as e:
-            return AgentResponse(
-                message=f"Error processing task: {str(e)}",
-                status="error",
-                state={},
-                raw_events=[{"error_type": type(e).__name__}],
-                session_id=request.session_id,
+
+        parallel = asyncio.Semaphore(
+            max(1, min(batch.max_parallel or BATCH_MAX_PARALLEL, BATCH_MAX_PARALLEL))
+        )
+        # Items of one user wait for each other here rather than hitting the per-user limit
+        per_user = defaultdict(lambda: asyncio.Semaphore(admission.max_per_user))
+        # Items of one session run one at a time, in batch order, so turns do not interleave
+        per_session = defaultdict(asyncio.Lock)
+
+        async def execute_item(index: int, request: AgentRequest) -> dict:
+            key = admission_key(request.context.get("user_id"), request.session_id)
+            session_lock = (
+                per_session[request.session_id] if request.session_id else contextlib.nullcontext()
             )
+            user_limit = per_user[key] if key is not None else contextlib.nullcontext()
+            # Take a batch slot last, so items waiting on their session or user do not hold one
+            async with session_lock, user_limit, parallel:
+                status_code, body, _ = await execute(request)
+            return {"index": index, "status_code": status_code, **body}
+
+        tasks = [
+            asyncio.create_task(execute_item(i, request))
+            for i, request in enumerate(batch.requests)
+        ]
+
+        if not batch.stream:
+            return json_response(http_request, {"results": await asyncio.gather(*tasks)})
+
+        async def stream_results():
+            try:
+                for next_done in asyncio.as_completed(tasks):
+                    yield dumps(await next_done) + b"\n"
+            finally:
+                # The client went away; do not keep running the rest of the batch
+                for task in tasks:
+                    task.cancel()
+
+        return StreamingResponse(stream_results(), media_type="application/x-ndjson")
 
     return app
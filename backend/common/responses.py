@@ -0,0 +1,85 @@
+import base64
+import gzip
+import os
+from decimal import Decimal
+from typing import Any, Optional
+
+import brotli
+import orjson
+from fastapi import Request
+from fastapi.responses import Response
+
+# === Configuration ===
+# Below this size compression costs more CPU than it saves on the wire
+COMPRESS_MIN_BYTES = int(os.getenv("RESPONSE_COMPRESS_MIN_BYTES", "1024"))
+GZIP_LEVEL = 5
+BROTLI_QUALITY = 4
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _default(obj):
+    """Types orjson does not handle natively (datetime, date, UUID and numpy are native)."""
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return sorted(obj, key=str)
+    if isinstance(obj, bytes):
+        return base64.b64encode(obj).decode()
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump()
+    return str(obj)
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize to JSON bytes, converting database values such as Decimal on the way."""
+    return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick 'br' or 'gzip' from an Accept-Encoding header, honouring q=0; None for identity."""
+    accepted = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding.strip().lower()] = q
+
+    candidates = [c for c in ("br", "gzip") if accepted.get(c, accepted.get("*", 0)) > 0]
+    return max(candidates, key=lambda c: accepted.get(c, accepted.get("*", 0)), default=None)
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+def json_response(
+    request: Request,
+    content: Any,
+    status_code: int = 200,
+    headers: Optional[dict] = None,
+) -> Response:
+    """
+    Serialize content with orjson and compress it when the client accepts br/gzip.
+
+    Returning this Response from an endpoint also skips FastAPI's response_model validation and
+    jsonable_encoder pass, which dominate the cost for large session states.
+    """
+    body = dumps(content)
+    headers = {**(headers or {}), "Vary": "Accept-Encoding"}
+
+    if len(body) >= COMPRESS_MIN_BYTES:
+        encoding = negotiate_encoding(request.headers.get("accept-encoding", ""))
+        if encoding:
+            body = compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+
+    return Response(
+        content=body, status_code=status_code, headers=headers, media_type="application/json"
+    )
@@ -0,0 +1,141 @@
+import os
+import sys
+
+import pandas as pd
+
+# Add the project root (1 level up from this file) to Python's module search path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from utils import setup_logger
+from scheduling import SECTION_FIELDS, CatalogSnapshot, parse_course_list
+
+# === Logging Setup ===
+logger = setup_logger(__name__)
+
+DEFAULT_CHUNK_SIZE = 5000
+
+STUDENTS_QUERY = """
+    SELECT {columns}
+    FROM student_details
+    ORDER BY Student_ID
+"""
+
+
+# === Student Sources ===
+def _read_student_pages(source, columns: list[str], chunk_size: int):
+    if isinstance(source, (str, os.PathLike)):
+        yield from pd.read_csv(
+            source, usecols=columns, dtype=str, chunksize=chunk_size, keep_default_na=False
+        )
+        return
+
+    query = STUDENTS_QUERY.format(columns=", ".join(columns))
+    rows = source.query(query).result(page_size=chunk_size)
+    for frame in rows.to_dataframe_iterable():
+        yield frame.astype({column: str for column in columns})
+
+
+def iter_student_chunks(
+    source, columns: list[str], chunk_size: int = DEFAULT_CHUNK_SIZE
+):
+    """
+    Stream the student table as pandas DataFrames of about chunk_size rows.
+
+    A chunk never splits a student: the rows of the last student of each page are carried over
+    into the next chunk, so per-student aggregates always see all of a student's rows. This
+    relies on a student's rows being adjacent, as they are in the ordered query; CSV exports
+    must be ordered by Student_ID too, and a warning is logged when they are not.
+
+    Args:
+        source: Path to a CSV export of `student_details`, or a database client, in which case
+            the table is paged straight out of the database.
+        columns (list[str]): Columns to read, including Student_ID; everything else is never
+            materialized.
+        chunk_size (int): Rows per page.
+
+    Yields:
+        pd.DataFrame: The next chunk of student rows.
+    """
+    carry = None
+    seen = set()
+    for frame in _read_student_pages(source, columns, chunk_size):
+        if carry is not None:
+            frame = pd.concat([carry, frame], ignore_index=True)
+        if frame.empty:
+            continue
+
+        # Hold back the trailing run of rows of the page's last student
+        student_ids = frame["Student_ID"].to_numpy()
+        split = len(student_ids)
+        while split and student_ids[split - 1] == student_ids[-1]:
+            split -= 1
+        carry = frame.iloc[split:]
+        chunk = frame.iloc[:split]
+        if chunk.empty:
+            continue
+
+        chunk_ids = set(student_ids[:split])
+        repeated = chunk_ids & seen
+        if repeated:
+            logger.warning(
+                f"{len(repeated)} students appear in more than one chunk; "
+                "order the student export by Student_ID"
+            )
+        seen |= chunk_ids
+        yield chunk
+
+    if carry is not None and not carry.empty:
+        yield carry
+
+
+def needed_courses_by_student(chunk: pd.DataFrame) -> dict[str, list[str]]:
+    """Aggregate the 'courses_still_needed' cells of a chunk into one sorted list per student."""
+    needed = {}
+    for student_id, cell in zip(chunk["Student_ID"], chunk["courses_still_needed"]):
+        needed.setdefault(student_id, set()).update(parse_course_list(cell))
+    return {student_id: sorted(courses) for student_id, courses in needed.items()}
+
+
+# === Catalog Exports ===
+def load_catalog_exports(offerings_path: str, prerequisites_path: str | None = None) -> CatalogSnapshot:
+    """
+    Build a catalog snapshot from CSV exports, for jobs that run without database access.
+
+    Args:
+        offerings_path (str): Export of course_offerings_table joined with course_meetings_table.
+        prerequisites_path (str | None): Export of course_prerequisites_table
+            (COURSE_ID, PREREQUISITE_COURSE_ID).
+    """
+    offerings = pd.read_csv(offerings_path, dtype=str, keep_default_na=False)
+    fields = [f for f in SECTION_FIELDS if f in offerings.columns]
+    sections = {
+        course_id: group[fields].to_dict("records")
+        for course_id, group in offerings.groupby("COURSE_ID", sort=True)
+        if course_id
+    }
+
+    course_text = {}
+    if "COURSE_TITLE" in offerings.columns:
+        for row in offerings.drop_duplicates("COURSE_ID").to_dict("records"):
+            if row["COURSE_ID"] in sections:
+                course_text[row["COURSE_ID"]] = {
+                    "title": row["COURSE_TITLE"],
+                    "description": row.get("COURSE_DESCRIPTION", ""),
+                }
+
+    edges = []
+    if prerequisites_path:
+        prerequisites = pd.read_csv(prerequisites_path, dtype=str, keep_default_na=False)
+        edges = [
+            (course, prereq)
+            for course, prereq in zip(
+                prerequisites["COURSE_ID"], prerequisites["PREREQUISITE_COURSE_ID"]
+            )
+            if course and prereq
+        ]
+
+    snapshot = CatalogSnapshot(list(sections), edges, sections=sections, course_text=course_text)
+    logger.info(
+        f"Loaded catalog export {snapshot.version}: {len(sections)} courses, {len(edges)} prerequisite edges"
+    )
+    return snapshot
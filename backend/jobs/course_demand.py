@@ -0,0 +1,202 @@
+"""
+Course demand aggregation.
+
+Counts how many students still need each course, per course and per major, by streaming a
+`student_details` export in chunks. Counts are joined against the offerings to flag courses whose
+demand exceeds the seats currently offered.
+
+Usage:
+    python -m jobs.course_demand --students students.csv --offerings offerings.csv \
+        --output demand.csv --by-major-output demand_by_major.csv
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# Add the project root (1 level up from this file) to Python's module search path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from utils import setup_logger
+from scheduling.sections import is_discussion_or_lab_section
+from jobs.common import iter_student_chunks
+
+# === Logging Setup ===
+logger = setup_logger(__name__)
+
+MAJOR_COLUMN = "Major_1_Desc"
+CAPACITY_COLUMN = "MAXIMUM_ENROLLMENT"
+DEFAULT_SEATS_PER_SECTION = 40
+EMPTY_TOKENS = ["", "nan", "NaN", "NAN", "None"]
+# Tokenizing is vectorized per chunk, so larger chunks amortize pandas overhead
+DEMAND_CHUNK_SIZE = 50000
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Aggregate course demand from student_details")
+    parser.add_argument(
+        "--students", required=True, help="CSV export of student_details, ordered by Student_ID"
+    )
+    parser.add_argument("--offerings", required=True, help="CSV export of course_offerings_table")
+    parser.add_argument("--output", required=True, help="CSV file for per-course demand")
+    parser.add_argument("--by-major-output", help="CSV file for per-course, per-major demand")
+    parser.add_argument("--chunk-size", type=int, default=DEMAND_CHUNK_SIZE)
+    parser.add_argument(
+        "--seats-per-section",
+        type=int,
+        default=DEFAULT_SEATS_PER_SECTION,
+        help=f"Seats assumed per lecture section when the offerings have no {CAPACITY_COLUMN} column",
+    )
+    return parser.parse_args()
+
+
+# === Aggregation ===
+def empty_demand() -> pd.Series:
+    """Demand series with no rows and the (course, major) index."""
+    return pd.Series(
+        dtype="int64",
+        index=pd.MultiIndex.from_tuples([], names=["COURSE_ID", MAJOR_COLUMN]),
+    )
+
+
+def chunk_demand(chunk: pd.DataFrame) -> pd.Series:
+    """
+    Tokenize 'courses_still_needed' for a whole chunk at once and count students per (course, major).
+
+    All cells are split in one pass over the joined column, tokens and majors are factorized to
+    integer codes, and the counting is done with numpy on those codes. A student listed on several
+    rows is counted once per course.
+    """
+    if chunk.empty:
+        return empty_demand()
+
+    cells = chunk["courses_still_needed"].str.strip()
+    tokens = pd.Series(re.split(r"\s*,\s*", ",".join(cells)))
+    rows = np.repeat(np.arange(len(chunk)), cells.str.count(",").to_numpy() + 1)
+
+    keep = ~tokens.isin(EMPTY_TOKENS).to_numpy()
+    course_codes, course_ids = pd.factorize(tokens[keep])
+    rows = rows[keep]
+    student_codes, _ = pd.factorize(chunk["Student_ID"])
+    major_codes, majors = pd.factorize(chunk[MAJOR_COLUMN])
+
+    # Count each (student, course) pair once
+    pairs = student_codes[rows].astype(np.int64) * len(course_ids) + course_codes
+    _, first = np.unique(pairs, return_index=True)
+
+    cells_index = course_codes[first].astype(np.int64) * len(majors) + major_codes[rows[first]]
+    counts = np.bincount(cells_index, minlength=len(course_ids) * len(majors))
+    nonzero = np.flatnonzero(counts)
+    return pd.Series(
+        counts[nonzero],
+        index=pd.MultiIndex.from_arrays(
+            [course_ids[nonzero // len(majors)], majors[nonzero % len(majors)]],
+            names=["COURSE_ID", MAJOR_COLUMN],
+        ),
+    )
+
+
+def aggregate_demand(students_source, chunk_size: int = DEMAND_CHUNK_SIZE) -> pd.Series:
+    """
+    Stream the student table and accumulate demand per (course, major).
+
+    Memory is bounded by the number of distinct (course, major) pairs, not by the table size.
+    """
+    totals = empty_demand()
+    rows = 0
+    started = time.perf_counter()
+
+    for chunk in iter_student_chunks(
+        students_source, ["Student_ID", MAJOR_COLUMN, "courses_still_needed"], chunk_size
+    ):
+        totals = totals.add(chunk_demand(chunk), fill_value=0)
+        rows += len(chunk)
+        logger.info(f"Aggregated {rows} student rows in {time.perf_counter() - started:.2f}s")
+
+    return totals.astype("int64")
+
+
+def offered_capacity(offerings_path: str, seats_per_section: int) -> pd.DataFrame:
+    """
+    Seats and lecture sections offered per course.
+
+    Uses the offerings' capacity column when present; otherwise assumes seats_per_section seats
+    per lecture section. Discussion/lab rows are not counted, since they duplicate lecture seats.
+    """
+    columns = pd.read_csv(offerings_path, nrows=0).columns
+    usecols = ["COURSE_ID", "COURSE_REFERENCE_NUMBER", "SCHEDULE_TYPE"]
+    if CAPACITY_COLUMN in columns:
+        usecols.append(CAPACITY_COLUMN)
+
+    offerings = pd.read_csv(offerings_path, usecols=usecols, dtype={"COURSE_ID": str})
+    offerings = offerings.drop_duplicates("COURSE_REFERENCE_NUMBER")
+    offerings = offerings[~offerings["SCHEDULE_TYPE"].map(is_discussion_or_lab_section)]
+
+    if CAPACITY_COLUMN in offerings:
+        seats = pd.to_numeric(offerings[CAPACITY_COLUMN], errors="coerce").fillna(seats_per_section)
+    else:
+        seats = pd.Series(seats_per_section, index=offerings.index)
+
+    return (
+        offerings.assign(seats=seats)
+        .groupby("COURSE_ID")
+        .agg(sections=("COURSE_REFERENCE_NUMBER", "count"), seats=("seats", "sum"))
+    )
+
+
+def course_report(demand: pd.Series, capacity: pd.DataFrame) -> pd.DataFrame:
+    """Join per-course demand with offered seats and flag under-supplied courses."""
+    report = (
+        demand.groupby(level="COURSE_ID")
+        .sum()
+        .rename("students_needing")
+        .to_frame()
+        .join(capacity, how="left")
+        .fillna({"sections": 0, "seats": 0})
+    )
+    report["shortfall"] = (report["students_needing"] - report["seats"]).clip(lower=0)
+    report["under_supplied"] = report["shortfall"] > 0
+    return report.sort_values(["shortfall", "students_needing"], ascending=False)
+
+
+# === Driver ===
+def run(
+    students_source,
+    offerings_path: str,
+    output_path: str,
+    by_major_output_path: str | None = None,
+    chunk_size: int = DEMAND_CHUNK_SIZE,
+    seats_per_section: int = DEFAULT_SEATS_PER_SECTION,
+) -> pd.DataFrame:
+    """Aggregate demand, write the reports and return the per-course report."""
+    started = time.perf_counter()
+    demand = aggregate_demand(students_source, chunk_size)
+    report = course_report(demand, offered_capacity(offerings_path, seats_per_section))
+
+    report.to_csv(output_path)
+    if by_major_output_path:
+        demand.rename("students_needing").to_csv(by_major_output_path)
+
+    logger.info(
+        f"Course demand for {len(report)} courses written to {output_path} in "
+        f"{time.perf_counter() - started:.2f}s; {int(report['under_supplied'].sum())} under-supplied"
+    )
+    return report
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    run(
+        args.students,
+        args.offerings,
+        args.output,
+        args.by_major_output,
+        args.chunk_size,
+        args.seats_per_section,
+    )
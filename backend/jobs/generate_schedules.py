@@ -0,0 +1,217 @@
+"""
+Bulk offline schedule generation.
+
+Precomputes a recommended schedule for every student in a `student_details` export, running
+eligibility and the schedule solver across a process pool. Results are appended to a JSON Lines
+file that doubles as the checkpoint: rerunning the command skips students already written.
+
+Usage:
+    python -m jobs.generate_schedules --students students.csv --offerings offerings.csv \
+        --prerequisites prerequisites.csv --output schedules.jsonl --workers 8
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+# Add the project root (1 level up from this file) to Python's module search path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from utils import setup_logger
+from scheduling import solve_schedules, to_legacy_schedule
+from scheduling.prerequisites import iter_bits
+from jobs.common import (
+    DEFAULT_CHUNK_SIZE,
+    iter_student_chunks,
+    load_catalog_exports,
+    needed_courses_by_student,
+)
+
+# === Logging Setup ===
+logger = setup_logger(__name__)
+
+DEFAULT_MAX_COURSES = 4
+
+# Catalog snapshot loaded once per worker process by _init_worker
+_catalog = None
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Precompute recommended schedules for a cohort")
+    parser.add_argument(
+        "--students", required=True, help="CSV export of student_details, ordered by Student_ID"
+    )
+    parser.add_argument(
+        "--offerings",
+        required=True,
+        help="CSV export of course offerings joined with meetings",
+    )
+    parser.add_argument("--prerequisites", help="CSV export of course_prerequisites_table")
+    parser.add_argument("--output", required=True, help="JSON Lines file to append results to")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--max-courses", type=int, default=DEFAULT_MAX_COURSES)
+    return parser.parse_args()
+
+
+# === Worker ===
+def _init_worker(offerings_path: str, prerequisites_path: str | None):
+    global _catalog
+    _catalog = load_catalog_exports(offerings_path, prerequisites_path)
+
+
+def pick_courses(catalog, eligible: list[str], needed: list[str], max_courses: int) -> list[str]:
+    """
+    Choose which eligible courses to schedule: those that unlock the most needed courses first.
+    """
+    index = catalog.prerequisites
+    needed_mask = index.encode(needed)
+
+    def unlocks(course_id: str) -> int:
+        bit = 1 << index.index[course_id]
+        return sum(1 for i in iter_bits(needed_mask) if index.ancestor_masks[i] & bit)
+
+    return sorted(eligible, key=lambda c: (-unlocks(c), c))[:max_courses]
+
+
+def schedule_student(catalog, student_id: str, needed: list[str], max_courses: int) -> dict:
+    """Compute eligibility and the best schedule for one student."""
+    eligible = catalog.eligible_courses(needed)
+    courses = pick_courses(catalog, eligible, needed, max_courses)
+
+    # Drop the lowest-priority course until the rest fit together without conflicts
+    while courses:
+        selected = {course_id: catalog.sections[course_id] for course_id in courses}
+        result = solve_schedules(selected, {}, top_k=1)
+        if result["status"] == "success":
+            best = result["schedules"][0]
+            return {
+                "Student_ID": student_id,
+                "status": "success",
+                "courses": courses,
+                "schedule": to_legacy_schedule(best["detailed_schedule"]),
+                "score": best["score"],
+                "metrics": best["metrics"],
+            }
+        courses = courses[:-1]
+
+    return {
+        "Student_ID": student_id,
+        "status": "error",
+        "message": "No eligible courses could be scheduled.",
+        "courses": [],
+    }
+
+
+def process_chunk(students: dict[str, list[str]], max_courses: int) -> list[dict]:
+    """Worker entry point: schedule every student of a chunk against the worker's catalog."""
+    results = []
+    for student_id, needed in students.items():
+        try:
+            results.append(schedule_student(_catalog, student_id, needed, max_courses))
+        except Exception as e:
+            results.append({"Student_ID": student_id, "status": "error", "message": str(e)})
+    return results
+
+
+# === Checkpointing ===
+def load_completed(output_path: str) -> set[str]:
+    """Student IDs already written to the output file by a previous run."""
+    completed = set()
+    if not os.path.exists(output_path):
+        return completed
+    with open(output_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                completed.add(json.loads(line)["Student_ID"])
+            except (ValueError, KeyError):
+                # A partially written last line from an interrupted run
+                continue
+    return completed
+
+
+# === Driver ===
+def run(
+    students_source,
+    offerings_path: str,
+    prerequisites_path: str | None,
+    output_path: str,
+    workers: int,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    max_courses: int = DEFAULT_MAX_COURSES,
+) -> dict:
+    """
+    Stream students in chunks through a process pool and append results to output_path.
+
+    Returns:
+        dict: Counts of processed, skipped and failed students and the throughput.
+    """
+    completed = load_completed(output_path)
+    logger.info(f"Resuming with {len(completed)} students already done")
+
+    stats = {"processed": 0, "skipped": 0, "failed": 0}
+    started = time.perf_counter()
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(offerings_path, prerequisites_path),
+    ) as pool, open(output_path, "a", encoding="utf-8") as out:
+        pending = set()
+
+        def drain(return_when):
+            nonlocal pending
+            done, pending = wait(pending, return_when=return_when)
+            for future in done:
+                results = future.result()
+                for result in results:
+                    out.write(json.dumps(result, default=str) + "\n")
+                    stats["failed"] += result["status"] != "success"
+                out.flush()
+                stats["processed"] += len(results)
+            elapsed = time.perf_counter() - started
+            logger.info(
+                f"{stats['processed']} students in {elapsed:.1f}s "
+                f"({stats['processed'] / max(elapsed, 1e-9):.1f} students/s)"
+            )
+
+        for chunk in iter_student_chunks(
+            students_source, ["Student_ID", "courses_still_needed"], chunk_size
+        ):
+            students = needed_courses_by_student(chunk)
+            todo = {s: needed for s, needed in students.items() if s not in completed}
+            stats["skipped"] += len(students) - len(todo)
+            if not todo:
+                continue
+
+            completed.update(todo)
+            pending.add(pool.submit(process_chunk, todo, max_courses))
+            # Keep a bounded number of chunks in flight so memory stays flat
+            if len(pending) >= 2 * workers:
+                drain(FIRST_COMPLETED)
+
+        while pending:
+            drain(FIRST_COMPLETED)
+
+    elapsed = time.perf_counter() - started
+    stats["seconds"] = round(elapsed, 3)
+    stats["students_per_second"] = round(stats["processed"] / max(elapsed, 1e-9), 1)
+    logger.info(f"Finished bulk schedule generation: {stats}")
+    return stats
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    run(
+        args.students,
+        args.offerings,
+        args.prerequisites,
+        args.output,
+        args.workers,
+        args.chunk_size,
+        args.max_courses,
+    )
@@ -0,0 +1,102 @@
+"""
+Nightly eligibility refresh.
+
+Materializes the enrollable courses of every student in a `student_details` export for their
+upcoming term into the local eligibility store read by `get_enrollable_courses`. Rows are tagged
+with the catalog's eligibility version, and rows from other versions are pruned at the end.
+
+Usage:
+    python -m jobs.refresh_eligibility --students students.csv --offerings offerings.csv \
+        --prerequisites prerequisites.csv --store data/eligibility.sqlite3
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Add the project root (1 level up from this file) to Python's module search path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from utils import next_term, setup_logger
+from scheduling import EligibilityStore
+from scheduling.eligibility_store import ELIGIBILITY_STORE_PATH
+from jobs.common import (
+    DEFAULT_CHUNK_SIZE,
+    iter_student_chunks,
+    load_catalog_exports,
+    needed_courses_by_student,
+)
+
+# === Logging Setup ===
+logger = setup_logger(__name__)
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Precompute enrollable courses per student")
+    parser.add_argument(
+        "--students", required=True, help="CSV export of student_details, ordered by Student_ID"
+    )
+    parser.add_argument(
+        "--offerings",
+        required=True,
+        help="CSV export of course offerings joined with meetings",
+    )
+    parser.add_argument("--prerequisites", help="CSV export of course_prerequisites_table")
+    parser.add_argument("--store", default=ELIGIBILITY_STORE_PATH, help="SQLite eligibility store")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    return parser.parse_args()
+
+
+def upcoming_terms(chunk) -> dict[str, str]:
+    """The term after each student's most recent term."""
+    latest = {}
+    for student_id, term in zip(chunk["Student_ID"], chunk["Term"]):
+        if term and term > latest.get(student_id, ""):
+            latest[student_id] = term
+    return {student_id: next_term(term) for student_id, term in latest.items()}
+
+
+def run(
+    students_source,
+    offerings_path: str,
+    prerequisites_path: str | None,
+    store_path: str = ELIGIBILITY_STORE_PATH,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> dict:
+    """
+    Compute and store eligibility for every student, one transaction per chunk.
+
+    Returns:
+        dict: Counts of stored and skipped students, pruned rows and the elapsed time.
+    """
+    started = time.perf_counter()
+    catalog = load_catalog_exports(offerings_path, prerequisites_path)
+    store = EligibilityStore(store_path)
+    stats = {"stored": 0, "skipped": 0}
+
+    for chunk in iter_student_chunks(
+        students_source, ["Student_ID", "Term", "courses_still_needed"], chunk_size
+    ):
+        terms = upcoming_terms(chunk)
+        needed = needed_courses_by_student(chunk)
+        entries = [
+            (student_id, terms[student_id], catalog.eligible_courses(courses))
+            for student_id, courses in needed.items()
+            if student_id in terms
+        ]
+        stats["skipped"] += len(needed) - len(entries)
+        stats["stored"] += store.write_many(entries, catalog.eligibility_version)
+        logger.info(f"Stored eligibility for {stats['stored']} students")
+
+    stats["pruned"] = store.prune(catalog.eligibility_version)
+    store.close()
+    stats["seconds"] = round(time.perf_counter() - started, 3)
+    logger.info(f"Eligibility refresh for catalog {catalog.eligibility_version} done: {stats}")
+    return stats
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    run(args.students, args.offerings, args.prerequisites, args.store, args.chunk_size)
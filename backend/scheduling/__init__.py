@@ -0,0 +1,9 @@
+from scheduling.sections import SECTION_FIELDS
+from scheduling.scoring import DEFAULT_WEIGHTS, score_candidates
+from scheduling.solver import solve_schedules, to_legacy_schedule
+from scheduling.prerequisites import PrerequisiteIndex
+from scheduling.catalog import CatalogSnapshot, get_catalog, parse_course_list
+from scheduling.planner import plan_terms
+from scheduling.search import CourseSearchIndex, get_search_index
+from scheduling.eligibility_store import EligibilityStore, get_eligibility_store
+from scheduling.free_slots import FreeSlotIndex, get_free_slot_index
@@ -0,0 +1,248 @@
+import hashlib
+import os
+import sys
+import threading
+import time
+
+# Add the project root (1 level up from this file) to Python's module search path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from utils import run_query, setup_logger
+from utils.terms import TERM_MAP
+from scheduling.prerequisites import PrerequisiteIndex
+from scheduling.sections import meeting_key
+
+# === Logging Setup ===
+logger = setup_logger(__name__)
+
+# === Configuration ===
+CATALOG_TTL_SECONDS = int(os.getenv("CATALOG_TTL_SECONDS", "900"))
+# Catalog queries scan whole tables, so they get a longer deadline than per-turn lookups
+CATALOG_QUERY_DEADLINE_SECONDS = float(os.getenv("CATALOG_QUERY_DEADLINE_SECONDS", "30"))
+# Wait this long before retrying a failed background refresh
+CATALOG_RETRY_SECONDS = float(os.getenv("CATALOG_RETRY_SECONDS", "60"))
+
+OFFERINGS_QUERY = """
+    SELECT DISTINCT COURSE_ID
+    FROM course_offerings_table
+"""
+PREREQUISITES_QUERY = """
+    SELECT COURSE_ID, PREREQUISITE_COURSE_ID
+    FROM course_prerequisites_table
+"""
+OFFERING_PATTERNS_QUERY = """
+    SELECT COURSE_ID, SUBSTR(CAST(TERM AS STRING), 5, 2) AS TERM_SUFFIX, MAX(UNITS) AS UNITS
+    FROM course_offerings_table
+    GROUP BY COURSE_ID, TERM_SUFFIX
+"""
+COURSE_TEXT_QUERY = """
+    SELECT COURSE_ID, ANY_VALUE(COURSE_TITLE) AS COURSE_TITLE,
+        ANY_VALUE(COURSE_DESCRIPTION) AS COURSE_DESCRIPTION
+    FROM course_offerings_table
+    GROUP BY COURSE_ID
+"""
+SECTIONS_QUERY = """
+    SELECT o.COURSE_REFERENCE_NUMBER, o.COURSE_ID, o.SCHEDULE_TYPE, m.COURSE_TIME,
+        m.MEETING_DAYS, m.COURSE_START_TIME, m.COURSE_END_TIME
+    FROM course_offerings_table o
+    LEFT JOIN course_meetings_table m
+    ON o.COURSE_REFERENCE_NUMBER = m.COURSE_REFERENCE_NUMBER
+"""
+
+
+def parse_course_list(cell) -> list[str]:
+    """
+    Parse a comma-separated course list cell (e.g., 'courses_still_needed') into course IDs.
+
+    Empty cells and the pandas/database 'nan' marker yield an empty list.
+    """
+    cell = str(cell if cell is not None else "").strip()
+    if not cell or cell.lower() == "nan":
+        return []
+    return [c.strip() for c in cell.split(",") if c.strip()]
+
+
+class CatalogSnapshot:
+    """
+    Immutable view of the offerings catalog and the prerequisite DAG built from it.
+
+    The version is a content hash, so consumers can tag derived data with it and detect staleness.
+    """
+
+    def __init__(
+        self,
+        offered_course_ids,
+        prerequisite_edges,
+        offering_terms=None,
+        course_units=None,
+        sections=None,
+        course_text=None,
+    ):
+        """
+        Args:
+            offered_course_ids (Iterable[str]): Courses in the offerings table.
+            prerequisite_edges (Iterable[tuple[str, str]]): (course_id, prerequisite_course_id) pairs.
+            offering_terms (dict[str, set[str]] | None): course_id -> term suffixes (10/20/30/40)
+                the course is offered in.
+            course_units (dict[str, float] | None): course_id -> units.
+            sections (dict[str, list[dict]] | None): course_id -> section rows (with meeting
+                times), for consumers that schedule against the whole catalog.
+            course_text (dict[str, dict] | None): course_id -> {"title", "description"}, for
+                course search.
+        """
+        offered_course_ids = sorted(set(offered_course_ids))
+        prerequisite_edges = sorted(set(prerequisite_edges))
+        self.offering_terms = offering_terms or {}
+        self.course_units = course_units or {}
+        self.sections = sections or {}
+        self.course_text = course_text or {}
+
+        self.prerequisites = PrerequisiteIndex(prerequisite_edges, offered_course_ids)
+        self.offered_course_ids = set(offered_course_ids)
+        self.offered_mask = self.prerequisites.encode(offered_course_ids)
+        self.loaded_at = time.time()
+
+        digest = hashlib.sha1()
+        for course_id in offered_course_ids:
+            digest.update(f"O:{course_id}\n".encode())
+        for course, prereq in prerequisite_edges:
+            digest.update(f"P:{course}>{prereq}\n".encode())
+        # Eligibility only depends on what is offered and the prerequisite graph, so data
+        # derived from it stays valid across changes to sections, terms or titles
+        self.eligibility_version = digest.hexdigest()[:12]
+        for course_id in sorted(self.sections):
+            # Meeting times are part of the version so time changes rebuild the free-slot index
+            meetings = sorted(meeting_key(s) for s in self.sections[course_id])
+            digest.update(f"S:{course_id}:{meetings}\n".encode())
+        for course_id in sorted(self.offering_terms):
+            digest.update(f"T:{course_id}:{sorted(self.offering_terms[course_id])}\n".encode())
+        for course_id in sorted(self.course_text):
+            text = self.course_text[course_id]
+            digest.update(f"D:{course_id}:{text.get('title')}:{text.get('description')}\n".encode())
+        self.version = digest.hexdigest()[:12]
+
+    def eligible_courses(self, courses_still_needed) -> list[str]:
+        """Needed courses that are offered and have no prerequisite still outstanding."""
+        index = self.prerequisites
+        needed_mask = index.encode(courses_still_needed)
+        return index.decode(index.eligible(needed_mask, self.offered_mask))
+
+
+def _query(client, query: str, name: str) -> list:
+    return run_query(client, query, name=name, deadline=CATALOG_QUERY_DEADLINE_SECONDS)
+
+
+def load_catalog(client) -> CatalogSnapshot:
+    """Query the offerings and prerequisite tables and build a catalog snapshot."""
+    offered = [
+        row["COURSE_ID"]
+        for row in _query(client, OFFERINGS_QUERY, "catalog_offerings")
+        if row["COURSE_ID"]
+    ]
+    try:
+        edges = [
+            (row["COURSE_ID"], row["PREREQUISITE_COURSE_ID"])
+            for row in _query(client, PREREQUISITES_QUERY, "catalog_prerequisites")
+            if row["COURSE_ID"] and row["PREREQUISITE_COURSE_ID"]
+        ]
+    except Exception as e:
+        # Eligibility degrades to "needed and offered" without a prerequisite table
+        logger.warning(f"Could not load prerequisites, continuing without them: {e}")
+        edges = []
+
+    offering_terms, course_units = {}, {}
+    try:
+        for row in _query(client, OFFERING_PATTERNS_QUERY, "catalog_offering_patterns"):
+            if not row["COURSE_ID"] or not row["TERM_SUFFIX"]:
+                continue
+            offering_terms.setdefault(row["COURSE_ID"], set()).add(row["TERM_SUFFIX"])
+            if row["UNITS"] is not None:
+                course_units[row["COURSE_ID"]] = float(row["UNITS"])
+        # The offerings table may only cover some terms (usually just the upcoming one). A course
+        # missing from a term that is in the data is not offered then; for terms absent from the
+        # data the pattern is unknown, so every course is assumed offered in them.
+        unobserved = set(TERM_MAP) - set().union(*offering_terms.values())
+        for terms in offering_terms.values():
+            terms |= unobserved
+    except Exception as e:
+        # The planner assumes every course is offered every term with default units
+        logger.warning(f"Could not load offering patterns, continuing without them: {e}")
+
+    course_text = {}
+    try:
+        for row in _query(client, COURSE_TEXT_QUERY, "catalog_course_text"):
+            if row["COURSE_ID"]:
+                course_text[row["COURSE_ID"]] = {
+                    "title": row["COURSE_TITLE"],
+                    "description": row["COURSE_DESCRIPTION"],
+                }
+    except Exception as e:
+        # Course search falls back to matching course IDs only
+        logger.warning(f"Could not load course titles, continuing without them: {e}")
+
+    sections = {}
+    try:
+        for row in _query(client, SECTIONS_QUERY, "catalog_sections"):
+            if row["COURSE_ID"]:
+                sections.setdefault(row["COURSE_ID"], []).append(dict(row))
+    except Exception as e:
+        # find_courses_that_fit reports no fitting courses without meeting times
+        logger.warning(f"Could not load section meetings, continuing without them: {e}")
+
+    snapshot = CatalogSnapshot(
+        offered,
+        edges,
+        offering_terms,
+        course_units,
+        sections=sections,
+        course_text=course_text,
+    )
+    logger.info(
+        f"Loaded catalog {snapshot.version}: {len(snapshot.offered_course_ids)} offered courses, "
+        f"{len(edges)} prerequisite edges"
+    )
+    return snapshot
+
+
+# === Process-wide Cache ===
+_catalog = None
+_catalog_lock = threading.Lock()
+_refreshing = False
+_next_refresh = 0.0
+
+
+def _refresh_catalog(client):
+    """Load a new snapshot in the background and swap it in; keep the old one on failure."""
+    global _catalog, _refreshing, _next_refresh
+    try:
+        snapshot = load_catalog(client)
+        with _catalog_lock:
+            _catalog = snapshot
+    except Exception as e:
+        _next_refresh = time.time() + CATALOG_RETRY_SECONDS
+        logger.warning(f"Catalog refresh failed, still serving {_catalog.version}: {e}")
+    finally:
+        _refreshing = False
+
+
+def get_catalog(client, max_age: float = CATALOG_TTL_SECONDS) -> CatalogSnapshot:
+    """
+    Return the cached catalog snapshot.
+
+    Only the first call loads the catalog synchronously. Once the snapshot is older than max_age
+    seconds, callers keep getting it while a single background thread loads its replacement.
+    """
+    global _catalog, _refreshing
+    with _catalog_lock:
+        if _catalog is None:
+            _catalog = load_catalog(client)
+        elif (
+            time.time() - _catalog.loaded_at > max_age
+            and time.time() >= _next_refresh
+            and not _refreshing
+        ):
+            _refreshing = True
+            threading.Thread(
+                target=_refresh_catalog, args=(client,), name="catalog-refresh", daemon=True
+            ).start()
+        return _catalog
@@ -0,0 +1,128 @@
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from typing import Optional
+
+# Add the project root (1 level up from this file) to Python's module search path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from utils import setup_logger
+
+# === Logging Setup ===
+logger = setup_logger(__name__)
+
+# === Configuration ===
+# Local data files live under DATA_DIR (backend/data by default, ignored by git)
+DATA_DIR = os.getenv(
+    "DATA_DIR", os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "data"))
+)
+ELIGIBILITY_STORE_PATH = os.getenv(
+    "ELIGIBILITY_STORE_PATH", os.path.join(DATA_DIR, "eligibility.sqlite3")
+)
+# The refresh job runs nightly; entries older than this are treated as missing
+ELIGIBILITY_MAX_AGE_SECONDS = float(os.getenv("ELIGIBILITY_MAX_AGE_SECONDS", str(36 * 3600)))
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS eligibility (
+        student_id TEXT NOT NULL,
+        term_code TEXT NOT NULL,
+        catalog_version TEXT NOT NULL,
+        courses TEXT NOT NULL,
+        computed_at REAL NOT NULL,
+        PRIMARY KEY (student_id, term_code)
+    ) WITHOUT ROWID
+"""
+
+
+class EligibilityStore:
+    """
+    Local SQLite table of precomputed enrollable courses per (student, upcoming term).
+
+    Each row is tagged with the catalog's eligibility_version, so rows computed against an older
+    offerings list or prerequisite graph are ignored rather than served.
+    """
+
+    def __init__(self, path: str = ELIGIBILITY_STORE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        # WAL lets the refresh job write while the agent server keeps reading
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(SCHEMA)
+        self._conn.commit()
+
+    def lookup(
+        self,
+        student_id: str,
+        term_code: str,
+        catalog_version: str,
+        max_age: float = ELIGIBILITY_MAX_AGE_SECONDS,
+    ) -> Optional[list[str]]:
+        """Enrollable courses for the student, or None if the entry is missing or stale."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT catalog_version, courses, computed_at FROM eligibility "
+                "WHERE student_id = ? AND term_code = ?",
+                (str(student_id), str(term_code)),
+            ).fetchone()
+        if row is None:
+            return None
+        version, courses, computed_at = row
+        if version != catalog_version or time.time() - computed_at > max_age:
+            return None
+        return json.loads(courses)
+
+    def write_many(self, entries, catalog_version: str) -> int:
+        """
+        Upsert entries in one transaction.
+
+        Args:
+            entries (Iterable[tuple[str, str, list[str]]]): (student_id, term_code, courses).
+            catalog_version (str): Eligibility version of the catalog they were computed from.
+
+        Returns:
+            int: Number of rows written.
+        """
+        now = time.time()
+        rows = [
+            (str(student_id), str(term_code), catalog_version, json.dumps(courses), now)
+            for student_id, term_code, courses in entries
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO eligibility "
+                "(student_id, term_code, catalog_version, courses, computed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+        return len(rows)
+
+    def prune(self, catalog_version: str) -> int:
+        """Delete rows computed against any other catalog version."""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "DELETE FROM eligibility WHERE catalog_version != ?", (catalog_version,)
+            )
+        return cursor.rowcount
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# === Process-wide Store ===
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_eligibility_store() -> EligibilityStore:
+    """Return the process-wide store at ELIGIBILITY_STORE_PATH, opening it on first use."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = EligibilityStore()
+        return _store
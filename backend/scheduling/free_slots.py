@@ -0,0 +1,175 @@
+import os
+import sys
+import threading
+
+import numpy as np
+
+# Add the project root (1 level up from this file) to Python's module search path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from utils import setup_logger
+from scheduling.sections import DAY_NAMES, group_sections, parse_hhmm, section_meetings
+from scheduling.scoring import DAYS_PER_WEEK, SLOTS_PER_DAY, meetings_mask
+from scheduling.solver import build_course_options, format_option, parse_constraints
+
+# === Logging Setup ===
+logger = setup_logger(__name__)
+
+# A week of 5-minute slots packed into 64-bit words
+WORDS_PER_WEEK = -(-DAYS_PER_WEEK * SLOTS_PER_DAY // 64)
+
+
+def pack_mask(mask: np.ndarray) -> np.ndarray:
+    """Pack a (7, SLOTS_PER_DAY) occupancy grid into WORDS_PER_WEEK uint64 words."""
+    packed = np.zeros(WORDS_PER_WEEK * 8, dtype=np.uint8)
+    bits = np.packbits(mask.ravel(), bitorder="little")
+    packed[: len(bits)] = bits
+    return packed.view(np.uint64)
+
+
+def schedule_meetings(
+    final_schedule: dict, meetings_by_crn: dict | None = None
+) -> list[tuple[int, int, int]]:
+    """
+    Meetings of every section of a detailed schedule (as stored in state['final_schedule']).
+
+    Sections are looked up by CRN in meetings_by_crn. The 'days' dict of a section holds only one
+    meeting per day, so it is used only for sections missing from meetings_by_crn.
+    """
+    meetings_by_crn = meetings_by_crn or {}
+    meetings = []
+    for course in (final_schedule or {}).values():
+        for section in course.get("sections", []):
+            crn = str(section.get("crn"))
+            if crn in meetings_by_crn:
+                meetings.extend(meetings_by_crn[crn])
+                continue
+            for day_name, times in (section.get("days") or {}).items():
+                if day_name not in DAY_NAMES or not times:
+                    continue
+                start, end = parse_hhmm(times[0]), parse_hhmm(times[-1])
+                if start is not None and end is not None and end > start:
+                    meetings.append((DAY_NAMES.index(day_name), start, end))
+    return meetings
+
+
+def busy_mask(
+    final_schedule: dict | None = None,
+    constraints: dict | None = None,
+    meetings_by_crn: dict | None = None,
+) -> np.ndarray:
+    """Packed mask of the slots taken by the current schedule or excluded by the constraints."""
+    mask = meetings_mask(schedule_meetings(final_schedule, meetings_by_crn))
+    avoided_days, avoided_ranges = parse_constraints(constraints or {})
+    for day in avoided_days:
+        mask[day, :] = True
+    for start, end in avoided_ranges:
+        mask |= meetings_mask([(day, start, end) for day in range(DAYS_PER_WEEK)])
+    return pack_mask(mask)
+
+
+class FreeSlotIndex:
+    """
+    Slot bitmap index over every lecture + discussion/lab combination in the catalog.
+
+    Each combination is stored as one row of packed weekly occupancy bits; combinations whose own
+    sections overlap are left out by build_course_options. A "what fits" query is then a single AND of the
+    candidate rows against the busy mask, so checking every needed course takes milliseconds.
+    """
+
+    def __init__(self, sections_by_course: dict[str, list[dict]], version: str | None = None):
+        """
+        Args:
+            sections_by_course (dict[str, list[dict]]): course_id -> section rows with meeting times.
+            version (str | None): Version of the catalog the index was built from.
+        """
+        self.version = version
+        self.options = {}  # course_id -> list of options, aligned with its rows in masks
+        self.offsets = {}  # course_id -> (first row, end row)
+        # CRN -> every meeting of that section, to rebuild the busy mask of a scheduled section
+        self.meetings_by_crn = {
+            str(section.get("COURSE_REFERENCE_NUMBER")): section_meetings(section)
+            for sections in sections_by_course.values()
+            for section in group_sections(sections)
+            if section.get("COURSE_REFERENCE_NUMBER") is not None
+        }
+        rows = []
+
+        for course_id, sections in sorted(sections_by_course.items()):
+            options = build_course_options(sections, set(), [])
+            for option in options:
+                meetings = [
+                    meeting
+                    for section in (option["lecture"], option["discussion_lab"])
+                    if section
+                    for meeting in section_meetings(section)
+                ]
+                rows.append(pack_mask(meetings_mask(meetings)))
+            self.offsets[course_id] = (len(rows) - len(options), len(rows))
+            self.options[course_id] = options
+
+        self.masks = np.stack(rows) if rows else np.zeros((0, WORDS_PER_WEEK), dtype=np.uint64)
+
+    def fitting_courses(
+        self,
+        course_ids,
+        final_schedule: dict | None = None,
+        constraints: dict | None = None,
+    ) -> list[dict]:
+        """
+        Courses with at least one conflict-free lecture + discussion/lab combination.
+
+        Args:
+            course_ids (Iterable[str]): Candidate courses, e.g. the student's enrollable courses.
+            final_schedule (dict | None): The current detailed schedule; its courses are skipped.
+            constraints (dict | None): 'avoided_days' and 'avoided_time_ranges' as kept in state.
+
+        Returns:
+            list[dict]: One entry per fitting course with 'course_id', 'fitting_options' (how
+                many combinations fit) and 'example' (one such combination, formatted like a
+                final_schedule entry), in course order.
+        """
+        scheduled = set(final_schedule or {})
+        candidates = [
+            c for c in sorted(set(course_ids)) if c in self.offsets and c not in scheduled
+        ]
+        if not candidates:
+            return []
+
+        rows = np.concatenate([np.arange(*self.offsets[c]) for c in candidates])
+        conflicts = (self.masks[rows] & busy_mask(final_schedule, constraints, self.meetings_by_crn)).any(axis=1)
+
+        results, position = [], 0
+        for course_id in candidates:
+            first, end = self.offsets[course_id]
+            fits = np.flatnonzero(~conflicts[position : position + end - first])
+            position += end - first
+            if len(fits):
+                results.append(
+                    {
+                        "course_id": course_id,
+                        "fitting_options": int(len(fits)),
+                        "example": format_option(course_id, self.options[course_id][fits[0]]),
+                    }
+                )
+        return results
+
+
+# === Process-wide Cache ===
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_free_slot_index(catalog) -> FreeSlotIndex:
+    """
+    Return the free-slot index for a catalog snapshot, rebuilding it when the catalog version changes.
+    """
+    global _index
+    with _index_lock:
+        if _index is None or _index.version != catalog.version:
+            _index = FreeSlotIndex(catalog.sections, catalog.version)
+            logger.info(
+                f"Built free-slot index for catalog {catalog.version}: "
+                f"{len(_index.options)} courses, {len(_index.masks)} section combinations"
+            )
+        return _index
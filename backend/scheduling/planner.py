@@ -0,0 +1,198 @@
+import math
+import os
+import sys
+import time
+
+# Add the project root (1 level up from this file) to Python's module search path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from utils import next_term, setup_logger, term_label
+from scheduling.prerequisites import PrerequisiteIndex, iter_bits
+
+# === Logging Setup ===
+logger = setup_logger(__name__)
+
+# === Configuration ===
+DEFAULT_UNITS = 4.0
+DEFAULT_TIME_BUDGET_SECONDS = 2.0
+# Alternative course subsets explored per term besides the greedy one
+BRANCHING = 3
+
+
+def _critical_path_lengths(index: PrerequisiteIndex, remaining_mask: int) -> dict[int, int]:
+    """
+    Number of terms needed to finish each remaining course and everything that depends on it,
+    counting only remaining courses (longest path in the remaining sub-DAG).
+    """
+    lengths = {}
+    for i in reversed(index.order):
+        if not remaining_mask >> i & 1:
+            continue
+        dependents = index.dependent_masks[i] & remaining_mask
+        lengths[i] = 1 + max((lengths.get(j, 0) for j in iter_bits(dependents)), default=0)
+    return lengths
+
+
+def _term_subsets(available: list[int], units: list[float], max_units: float) -> list[int]:
+    """
+    Course subsets worth trying for one term: the greedy fill in priority order, plus fills that
+    leave out one of the top-priority courses to make room for others.
+    """
+    subsets = []
+    for skip in range(min(len(available), BRANCHING) + 1):
+        mask, total = 0, 0.0
+        for position, i in enumerate(available):
+            if skip and position == skip - 1:
+                continue
+            if total + units[i] <= max_units:
+                mask |= 1 << i
+                total += units[i]
+        if mask and mask not in subsets:
+            subsets.append(mask)
+    return subsets
+
+
+def plan_terms(
+    index: PrerequisiteIndex,
+    remaining_courses: list[str],
+    start_term: str,
+    offering_terms: dict[str, set[str]],
+    course_units: dict[str, float],
+    max_units_per_term: float,
+    max_terms: int,
+    include_summer: bool = False,
+    time_budget: float = DEFAULT_TIME_BUDGET_SECONDS,
+) -> dict:
+    """
+    Build a multi-term plan that finishes the remaining courses in as few terms as possible.
+
+    Runs a depth-first branch-and-bound over (term, remaining-courses) states: each term takes
+    courses whose prerequisites are done and that are offered in that term's pattern (10/20/30/40),
+    within the units cap. The greedy plan is found first, so a plan is always returned even if the
+    time budget runs out before the search proves it optimal.
+
+    Args:
+        index (PrerequisiteIndex): Prerequisite DAG.
+        remaining_courses (list[str]): Courses the student still needs.
+        start_term (str): 6-digit code of the first term to plan (e.g., "202610").
+        offering_terms (dict[str, set[str]]): course_id -> term suffixes it is offered in;
+            courses missing from it are assumed offered every term.
+        course_units (dict[str, float]): course_id -> units; missing courses use DEFAULT_UNITS.
+        max_units_per_term (float): Units cap per term.
+        max_terms (int): Planning horizon.
+        include_summer (bool): Whether summer terms (30) can be used.
+        time_budget (float): Seconds to spend searching for a shorter plan.
+
+    Returns:
+        dict: {"terms": [{"term_code", "term", "courses", "units"}], "unplaced": [...],
+               "search_completed": bool, "explored": int}
+    """
+    if max_terms <= 0:
+        return {
+            "terms": [],
+            "unplaced": sorted(set(remaining_courses)),
+            "search_completed": True,
+            "explored": 0,
+        }
+
+    deadline = time.monotonic() + time_budget
+
+    # Courses unknown to the DAG get their own indices so they can be planned too
+    extra = [c for c in remaining_courses if c not in index.index]
+    if extra:
+        index = PrerequisiteIndex(
+            [(c, p) for c in index.course_ids for p in index.prerequisites(c)],
+            index.course_ids + extra,
+        )
+
+    n = len(index.course_ids)
+    units = [float(course_units.get(c) or DEFAULT_UNITS) for c in index.course_ids]
+    remaining_mask = index.encode(remaining_courses)
+
+    terms = [start_term]
+    while len(terms) < max_terms:
+        terms.append(next_term(terms[-1], include_summer))
+    offered_masks = []
+    for term_code in terms:
+        suffix = term_code[4:]
+        offered_masks.append(
+            sum(
+                1 << i
+                for i, c in enumerate(index.course_ids)
+                if c not in offering_terms or suffix in offering_terms[c]
+            )
+        )
+
+    lengths = _critical_path_lengths(index, remaining_mask)
+    # Long dependency chains first, then more units, then course ID for determinism
+    priority = sorted(range(n), key=lambda i: (-lengths.get(i, 0), -units[i], index.course_ids[i]))
+    rank = {i: r for r, i in enumerate(priority)}
+
+    # Plans compare by (courses left unplaced, terms used)
+    best = {"plan": None, "key": (math.inf, math.inf), "left": remaining_mask}
+    seen = {}
+    explored = 0
+    timed_out = False
+
+    def lower_bound(mask: int) -> int:
+        if not mask:
+            return 0
+        chain = max(lengths.get(i, 1) for i in iter_bits(mask))
+        load = math.ceil(sum(units[i] for i in iter_bits(mask)) / max_units_per_term)
+        return max(chain, load)
+
+    def search(term_index: int, mask: int, plan: list[int]):
+        nonlocal explored, timed_out
+        explored += 1
+
+        if not mask or term_index == len(terms):
+            key = (bin(mask).count("1"), len(plan))
+            if key < best["key"]:
+                best.update(plan=list(plan), key=key, left=mask)
+            return
+        if best["key"][0] == 0 and term_index + lower_bound(mask) >= best["key"][1]:
+            return
+        if best["plan"] is not None and time.monotonic() > deadline:
+            timed_out = True
+            return
+
+        key = (terms[term_index][4:], mask)
+        if seen.get(key, math.inf) <= term_index:
+            return
+        seen[key] = term_index
+
+        ready = mask & offered_masks[term_index] & ~index.blocked_mask(mask)
+        available = sorted(iter_bits(ready), key=rank.get)
+        subsets = _term_subsets(available, units, max_units_per_term) or [0]
+        for subset in subsets:
+            plan.append(subset)
+            search(term_index + 1, mask & ~subset, plan)
+            plan.pop()
+
+    search(0, remaining_mask, [])
+
+    planned_terms = []
+    for term_code, subset in zip(terms, best["plan"] or []):
+        courses = index.decode(subset)
+        planned_terms.append(
+            {
+                "term_code": term_code,
+                "term": term_label(term_code),
+                "courses": courses,
+                "units": sum(units[index.index[c]] for c in courses),
+            }
+        )
+    # Drop trailing empty terms
+    while planned_terms and not planned_terms[-1]["courses"]:
+        planned_terms.pop()
+
+    logger.info(
+        f"Planned {bin(remaining_mask).count('1')} courses over {len(planned_terms)} terms "
+        f"({explored} states explored, timed out: {timed_out})"
+    )
+    return {
+        "terms": planned_terms,
+        "unplaced": index.decode(best["left"]),
+        "search_completed": not timed_out,
+        "explored": explored,
+    }
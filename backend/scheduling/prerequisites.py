@@ -0,0 +1,127 @@
+import os
+import sys
+from collections import deque
+
+# Add the project root (1 level up from this file) to Python's module search path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from utils import setup_logger
+
+# === Logging Setup ===
+logger = setup_logger(__name__)
+
+
+class PrerequisiteIndex:
+    """
+    Course prerequisite DAG with integer course IDs and bitset-encoded course sets.
+
+    Every known course gets a bit position; a set of courses is a Python int with those bits set,
+    so eligibility checks are a handful of AND/OR operations instead of per-row string parsing.
+    """
+
+    def __init__(self, edges, course_ids=()):
+        """
+        Args:
+            edges (Iterable[tuple[str, str]]): (course_id, prerequisite_course_id) pairs.
+            course_ids (Iterable[str]): Additional courses with no prerequisite edges.
+        """
+        edges = [(str(c).strip(), str(p).strip()) for c, p in edges if c and p]
+        names = set(str(c).strip() for c in course_ids if c)
+        for course, prereq in edges:
+            names.update((course, prereq))
+
+        self.course_ids = sorted(names)
+        self.index = {course_id: i for i, course_id in enumerate(self.course_ids)}
+
+        n = len(self.course_ids)
+        self.prereq_masks = [0] * n  # direct prerequisites of each course
+        self.dependent_masks = [0] * n  # courses that directly require each course
+        for course, prereq in edges:
+            c, p = self.index[course], self.index[prereq]
+            if c == p:
+                continue
+            self.prereq_masks[c] |= 1 << p
+            self.dependent_masks[p] |= 1 << c
+
+        self.order = self._topological_order()
+        self.ancestor_masks = self._transitive_closure()
+
+    # === Construction Helpers ===
+    def _topological_order(self) -> list[int]:
+        """Kahn's algorithm; courses on a cycle are appended last and logged."""
+        n = len(self.course_ids)
+        in_degree = [bin(mask).count("1") for mask in self.prereq_masks]
+        queue = deque(i for i in range(n) if in_degree[i] == 0)
+        order = []
+        while queue:
+            i = queue.popleft()
+            order.append(i)
+            for j in iter_bits(self.dependent_masks[i]):
+                in_degree[j] -= 1
+                if in_degree[j] == 0:
+                    queue.append(j)
+
+        if len(order) < n:
+            seen = set(order)
+            cyclic = [i for i in range(n) if i not in seen]
+            logger.warning(
+                f"Prerequisite cycle among {len(cyclic)} courses: "
+                f"{[self.course_ids[i] for i in cyclic[:10]]}"
+            )
+            order.extend(cyclic)
+        return order
+
+    def _transitive_closure(self) -> list[int]:
+        """All (direct and indirect) prerequisites of every course."""
+        ancestors = [0] * len(self.course_ids)
+        for i in self.order:
+            mask = self.prereq_masks[i]
+            for p in iter_bits(self.prereq_masks[i]):
+                mask |= ancestors[p]
+            ancestors[i] = mask & ~(1 << i)
+        return ancestors
+
+    # === Encoding ===
+    def encode(self, course_ids) -> int:
+        """Encode course IDs as a bitset; unknown courses are ignored."""
+        mask = 0
+        for course_id in course_ids:
+            i = self.index.get(course_id)
+            if i is not None:
+                mask |= 1 << i
+        return mask
+
+    def decode(self, mask: int) -> list[str]:
+        """Decode a bitset into sorted course IDs."""
+        return [self.course_ids[i] for i in iter_bits(mask)]
+
+    def prerequisites(self, course_id: str, transitive: bool = False) -> list[str]:
+        """Prerequisites of a course, optionally including indirect ones."""
+        i = self.index.get(course_id)
+        if i is None:
+            return []
+        return self.decode(self.ancestor_masks[i] if transitive else self.prereq_masks[i])
+
+    # === Eligibility ===
+    def blocked_mask(self, needed_mask: int) -> int:
+        """Courses that still have at least one unmet (still needed) prerequisite."""
+        blocked = 0
+        for p in iter_bits(needed_mask):
+            blocked |= self.dependent_masks[p]
+        return blocked
+
+    def eligible(self, needed_mask: int, offered_mask: int) -> int:
+        """
+        Needed courses that are offered and whose prerequisites are all satisfied.
+
+        A prerequisite counts as satisfied once it is no longer in the student's needed set.
+        """
+        return needed_mask & offered_mask & ~self.blocked_mask(needed_mask)
+
+
+def iter_bits(mask: int):
+    """Yield the positions of the set bits of a bitset, lowest first."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
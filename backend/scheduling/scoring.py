@@ -0,0 +1,180 @@
+import os
+import sys
+
+import numpy as np
+
+# Add the project root (1 level up from this file) to Python's module search path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from utils import setup_logger
+
+# === Logging Setup ===
+logger = setup_logger(__name__)
+
+# === Slot Grid ===
+# A week is encoded as 7 days x 288 five-minute slots; a schedule is a boolean occupancy grid.
+SLOT_MINUTES = 5
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+DAYS_PER_WEEK = 7
+
+# Gaps of 0 up to this many minutes between two classes count as back-to-back
+BACK_TO_BACK_MINUTES = 15
+
+# Lower scores are better. Weights are expressed in "minutes of gap" equivalents,
+# and a negative weight rewards larger values (e.g. a later earliest start).
+DEFAULT_WEIGHTS = {
+    "gap_minutes": 1.0,
+    "days_on_campus": 60.0,
+    "earliest_start": -0.25,
+    "latest_end": 0.25,
+    "back_to_back": 10.0,
+}
+METRICS = list(DEFAULT_WEIGHTS)
+
+# Number of candidates scored at once; bounds the size of the occupancy tensor
+BATCH_SIZE = 2048
+
+
+def meetings_mask(meetings: list[tuple[int, int, int]]) -> np.ndarray:
+    """
+    Encode weekly meetings as a (7, SLOTS_PER_DAY) boolean occupancy grid.
+
+    Args:
+        meetings (list[tuple[int, int, int]]): (day_index, start_minutes, end_minutes) tuples.
+
+    Returns:
+        np.ndarray: Boolean grid with True where the slot is occupied.
+    """
+    mask = np.zeros((DAYS_PER_WEEK, SLOTS_PER_DAY), dtype=bool)
+    for day, start, end in meetings:
+        first = start // SLOT_MINUTES
+        last = -(-end // SLOT_MINUTES)  # ceil so partial slots count as occupied
+        mask[day, first:last] = True
+    return mask
+
+
+def meeting_starts(masks: np.ndarray) -> np.ndarray:
+    """Slots where a meeting begins in occupancy grids of shape (..., n_slots)."""
+    starts = masks.copy()
+    starts[..., 1:] &= ~masks[..., :-1]
+    return starts
+
+
+def resolve_weights(overrides: dict | None = None) -> dict:
+    """Merge user-provided weight overrides onto the defaults, ignoring unknown or invalid entries."""
+    weights = dict(DEFAULT_WEIGHTS)
+    for name, value in (overrides or {}).items():
+        if name not in weights:
+            logger.warning(f"Ignoring unknown score weight '{name}'")
+            continue
+        try:
+            weights[name] = float(value)
+        except (TypeError, ValueError):
+            logger.warning(f"Ignoring non-numeric score weight {name}={value!r}")
+    return weights
+
+
+def compute_metrics(
+    occupancy: np.ndarray,
+    slot_counts: np.ndarray | None = None,
+    first_slot: int = 0,
+    start_counts: np.ndarray | None = None,
+) -> dict:
+    """
+    Compute quality metrics for a batch of weekly occupancy grids.
+
+    Args:
+        occupancy (np.ndarray): Boolean array of shape (N, 7, n_slots).
+        slot_counts (np.ndarray | None): Number of sections per slot, used to detect conflicts.
+        first_slot (int): Slot index of the first column when the grid has been cropped.
+        start_counts (np.ndarray | None): Number of meetings starting in each slot. Classes that
+            meet end to end merge into one run of occupied slots, so they only count as
+            back-to-back when this is given.
+
+    Returns:
+        dict: Metric name -> array of shape (N,), plus a boolean 'conflict' array.
+    """
+    n, _, n_slots = occupancy.shape
+    has_class = occupancy.any(axis=2)
+    occupied = occupancy.sum(axis=2)
+
+    first = occupancy.argmax(axis=2)
+    last = n_slots - 1 - occupancy[:, :, ::-1].argmax(axis=2)
+    span = np.where(has_class, last - first + 1, 0)
+    gap_minutes = (span - occupied).sum(axis=1) * SLOT_MINUTES
+
+    no_class = ~has_class.any(axis=1)
+    earliest = (np.where(has_class, first, n_slots).min(axis=1) + first_slot) * SLOT_MINUTES
+    latest = (np.where(has_class, last + 1, 0).max(axis=1) + first_slot) * SLOT_MINUTES
+    earliest[no_class] = 0
+
+    # A back-to-back pair is a short run of free slots with classes on both sides, or a class
+    # starting right as the previous one ends
+    back_to_back = np.zeros(n, dtype=np.int64)
+    if start_counts is not None:
+        back_to_back += (occupancy[:, :, :-1] & (start_counts[:, :, 1:] > 0)).sum(axis=(1, 2))
+    for g in range(1, BACK_TO_BACK_MINUTES // SLOT_MINUTES + 1):
+        match = occupancy[:, :, : -g - 1] & occupancy[:, :, g + 1 :]
+        for j in range(1, g + 1):
+            match &= ~occupancy[:, :, j : n_slots - g - 1 + j]
+        back_to_back += match.sum(axis=(1, 2))
+
+    if slot_counts is None:
+        conflict = np.zeros(n, dtype=bool)
+    else:
+        conflict = (slot_counts > 1).any(axis=(1, 2))
+
+    return {
+        "gap_minutes": gap_minutes,
+        "days_on_campus": has_class.sum(axis=1),
+        "earliest_start": earliest,
+        "latest_end": latest,
+        "back_to_back": back_to_back,
+        "conflict": conflict,
+    }
+
+
+def score_candidates(
+    option_masks: list[np.ndarray], choices: np.ndarray, weights: dict | None = None
+) -> tuple[np.ndarray, dict]:
+    """
+    Score candidate schedules in batch.
+
+    Args:
+        option_masks (list[np.ndarray]): One array per course of shape (n_options, 7, SLOTS_PER_DAY),
+            holding the occupancy grid of every lecture + discussion/lab combination.
+        choices (np.ndarray): Integer array of shape (N, n_courses); row i picks one option per course.
+        weights (dict | None): Metric weights; defaults to DEFAULT_WEIGHTS.
+
+    Returns:
+        tuple[np.ndarray, dict]: Scores of shape (N,) (lower is better, conflicting candidates
+            score +inf) and the per-metric arrays.
+    """
+    weights = resolve_weights(weights)
+    n = choices.shape[0]
+
+    # Crop the grid to the slots any option occupies; nothing outside it affects the metrics
+    used = np.flatnonzero(np.any([masks.any(axis=(0, 1)) for masks in option_masks], axis=0))
+    first_slot, last_slot = (used[0], used[-1] + 1) if len(used) else (0, 1)
+    option_masks = [masks[:, :, first_slot:last_slot] for masks in option_masks]
+    option_starts = [meeting_starts(masks) for masks in option_masks]
+
+    metrics = {name: np.zeros(n) for name in METRICS}
+    metrics["conflict"] = np.zeros(n, dtype=bool)
+
+    for begin in range(0, n, BATCH_SIZE):
+        batch = choices[begin : begin + BATCH_SIZE]
+        counts = np.zeros((len(batch), DAYS_PER_WEEK, last_slot - first_slot), dtype=np.uint8)
+        starts = np.zeros_like(counts)
+        for course_index, masks in enumerate(option_masks):
+            counts += masks[batch[:, course_index]]
+            starts += option_starts[course_index][batch[:, course_index]]
+        batch_metrics = compute_metrics(counts > 0, counts, first_slot, starts)
+        for name, values in batch_metrics.items():
+            metrics[name][begin : begin + len(batch)] = values
+
+    scores = np.zeros(n)
+    for name in METRICS:
+        scores += weights[name] * metrics[name]
+    scores[metrics["conflict"]] = np.inf
+    return scores, metrics
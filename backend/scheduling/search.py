@@ -0,0 +1,183 @@
+import math
+import os
+import re
+import sys
+import threading
+
+import numpy as np
+
+# Add the project root (1 level up from this file) to Python's module search path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from utils import setup_logger
+
+# === Logging Setup ===
+logger = setup_logger(__name__)
+
+# === Configuration ===
+# A trigram found in the course ID counts more than one in the title, which counts more than
+# one only found in the title's initials ("ml" for Machine Learning) or the description
+FIELD_WEIGHTS = {"id": 3.0, "title": 2.0, "acronym": 1.5, "description": 1.0}
+# For a course-code query ("CSE 158"), courses whose ID does not contain the queried number
+# keep this fraction of their score, so the course itself ranks well above its subject's others
+OTHER_NUMBER_FACTOR = 0.5
+MIN_SCORE = 0.3
+DEFAULT_LIMIT = 5
+STOPWORDS = {
+    "a", "an", "and", "class", "course", "for", "in", "of", "on", "that", "the", "this", "to", "with",
+}
+
+
+def normalize(text) -> list[str]:
+    """Lowercase words of a text, without punctuation or stopwords."""
+    words = re.sub(r"[^a-z0-9]+", " ", str(text or "").lower()).split()
+    return [w for w in words if w not in STOPWORDS]
+
+
+def compact_id(course_id) -> str:
+    """Course ID without spaces or punctuation, so 'CSE 101', 'cse101' and 'CSE-101' compare equal."""
+    return re.sub(r"[^a-z0-9]+", "", str(course_id).lower())
+
+
+def acronyms(words) -> list[str]:
+    """Runs of two or more initials of consecutive words ("machine learning" -> "ml")."""
+    initials = "".join(w[0] for w in words if not w.isdigit())
+    return [
+        initials[i:j] for i in range(len(initials)) for j in range(i + 2, len(initials) + 1)
+    ]
+
+
+def trigrams(words) -> set[str]:
+    """Character trigrams of each word, padded so short words and word starts still match."""
+    grams = set()
+    for word in words:
+        padded = f" {word} "
+        grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class CourseSearchIndex:
+    """
+    In-memory trigram index over course IDs, titles and descriptions.
+
+    Each trigram maps to the array of courses containing it and the weight of the best field it
+    appears in. A query is scored by summing the IDF-weighted postings of its trigrams with
+    numpy, so lookups stay well under a millisecond for a full catalog and tolerate typos,
+    partial words and title initials ("intro stats", "machine lerning", "ml").
+    """
+
+    def __init__(self, documents: dict[str, dict], version: str | None = None):
+        """
+        Args:
+            documents (dict[str, dict]): course_id -> {"title": ..., "description": ...}; both
+                fields are optional.
+            version (str | None): Version of the catalog the index was built from.
+        """
+        self.version = version
+        self.course_ids = sorted(documents)
+        self.titles = [documents[c].get("title") or "" for c in self.course_ids]
+        self.compact_ids = {compact_id(c): i for i, c in enumerate(self.course_ids)}
+        self.compact_id_array = np.array(list(self.compact_ids) or [""])
+
+        postings = {}
+        for i, course_id in enumerate(self.course_ids):
+            doc = documents[course_id]
+            fields = {
+                "id": normalize(course_id) + [compact_id(course_id)],
+                "title": normalize(doc.get("title")),
+                "acronym": acronyms(normalize(doc.get("title"))),
+                "description": normalize(doc.get("description")),
+            }
+            for field, words in fields.items():
+                weight = FIELD_WEIGHTS[field]
+                for gram in trigrams(words):
+                    docs = postings.setdefault(gram, {})
+                    docs[i] = max(docs.get(i, 0.0), weight)
+
+        n = max(len(self.course_ids), 1)
+        self.postings = {}
+        for gram, docs in postings.items():
+            idf = math.log(1 + n / len(docs))
+            self.postings[gram] = (
+                idf,
+                np.fromiter(docs.keys(), dtype=np.int32, count=len(docs)),
+                np.fromiter(docs.values(), dtype=np.float32, count=len(docs)) * idf,
+            )
+
+    def search(self, query: str, limit: int = DEFAULT_LIMIT, min_score: float = MIN_SCORE) -> list[dict]:
+        """
+        Rank courses for a free-text query.
+
+        Returns:
+            list[dict]: Up to `limit` results with 'course_id', 'title' and 'score' (capped at 1
+                for a full title or exact course ID match), best first.
+        """
+        words = normalize(query)
+        numbers = re.findall(r"[0-9]+", query) if len(words) <= 2 else []
+        if numbers:
+            # Looks like a course ID: also match it written without a space ("cse158")
+            words.append(compact_id(query))
+        grams = trigrams(words)
+        if not grams or not self.course_ids or limit < 1:
+            return []
+
+        possible, indices, weights = 0.0, [], []
+        for gram in grams:
+            posting = self.postings.get(gram)
+            if posting is None:
+                # Unknown trigrams still count against the query, as with a typo
+                possible += math.log(1 + len(self.course_ids))
+                continue
+            idf, docs, weighted = posting
+            possible += idf
+            indices.append(docs)
+            weights.append(weighted)
+
+        scores = np.zeros(len(self.course_ids), dtype=np.float32)
+        if indices:
+            scores = np.bincount(
+                np.concatenate(indices),
+                weights=np.concatenate(weights),
+                minlength=len(self.course_ids),
+            ).astype(np.float32)
+        # Matching every query trigram in the title scores 1; ID and description hits add to that
+        scores /= possible * FIELD_WEIGHTS["title"]
+        for number in numbers:
+            scores[np.char.find(self.compact_id_array, number) < 0] *= OTHER_NUMBER_FACTOR
+        exact = self.compact_ids.get(compact_id(query))
+        if exact is not None:
+            scores[exact] = np.inf
+
+        limit = min(limit, len(scores))
+        top = np.argpartition(-scores, limit - 1)[:limit]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [
+            {
+                "course_id": self.course_ids[i],
+                "title": self.titles[i],
+                "score": round(min(float(scores[i]), 1.0), 2),
+            }
+            for i in top
+            if scores[i] >= min_score
+        ]
+
+
+# === Process-wide Cache ===
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_search_index(catalog) -> CourseSearchIndex:
+    """
+    Return the search index for a catalog snapshot, rebuilding it when the catalog version changes.
+    """
+    global _index
+    with _index_lock:
+        if _index is None or _index.version != catalog.version:
+            documents = {course_id: {} for course_id in catalog.offered_course_ids}
+            documents.update(
+                {c: text for c, text in catalog.course_text.items() if c in documents}
+            )
+            _index = CourseSearchIndex(documents, catalog.version)
+            logger.info(f"Built course search index for catalog {catalog.version}: {len(documents)} courses")
+        return _index
@@ -0,0 +1,204 @@
+import os
+import sys
+
+# Add the project root (1 level up from this file) to Python's module search path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from utils import setup_logger
+
+# === Logging Setup ===
+logger = setup_logger(__name__)
+
+# === Constants ===
+DAY_MAP = {
+    "M": "Monday",
+    "T": "Tuesday",
+    "W": "Wednesday",
+    "R": "Thursday",
+    "F": "Friday",
+    "S": "Saturday",
+    "U": "Sunday",
+}
+DAY_NAMES = list(DAY_MAP.values())
+DAY_INDEX = {abbrev: i for i, abbrev in enumerate(DAY_MAP)}
+
+LECTURE_TYPES = ["LEC", "LECTURE", "L"]
+DISCUSSION_LAB_TYPES = ["DIS", "DISCUSSION", "LAB", "LABORATORY", "D", "REC", "RECITATION"]
+
+
+# Fields kept in state for each selected section
+SECTION_FIELDS = {
+    "COURSE_REFERENCE_NUMBER",
+    "COURSE_ID",
+    "SCHEDULE_TYPE",
+    "COURSE_TIME",
+    "MEETING_DAYS",
+    "COURSE_START_TIME",
+    "COURSE_END_TIME",
+}
+# Fields that identify a section row and when it meets
+MEETING_KEY_FIELDS = ("COURSE_REFERENCE_NUMBER", "MEETING_DAYS", "COURSE_START_TIME", "COURSE_END_TIME")
+
+
+def meeting_key(record: dict) -> list[str]:
+    """A section row's CRN and meeting days and times, to detect changes to either."""
+    return [str(record.get(field)) for field in MEETING_KEY_FIELDS]
+
+
+# === Section Classification ===
+def _matches_type(schedule_type, known_types: list[str]) -> bool:
+    # Single-letter codes must match exactly, otherwise "L" would match "LAB"
+    schedule_type = str(schedule_type).upper().strip()
+    return any(
+        schedule_type == known if len(known) == 1 else known in schedule_type
+        for known in known_types
+    )
+
+
+def is_lecture_section(schedule_type) -> bool:
+    """Check if a section is a lecture section."""
+    if not schedule_type:
+        return False
+    return _matches_type(schedule_type, LECTURE_TYPES)
+
+
+def is_discussion_or_lab_section(schedule_type) -> bool:
+    """Check if a section is a discussion or lab section."""
+    if not schedule_type:
+        return False
+    return _matches_type(schedule_type, DISCUSSION_LAB_TYPES)
+
+
+# === Time & Day Parsing ===
+def parse_hhmm(value) -> int | None:
+    """
+    Convert a 24-hour HHMM value (e.g., 930, "1400", 1050.0) into minutes after midnight.
+
+    Returns:
+        int | None: Minutes after midnight, or None if the value cannot be parsed.
+    """
+    try:
+        hhmm = int(float(str(value).strip()))
+    except (ValueError, TypeError):
+        return None
+    hours, minutes = divmod(hhmm, 100)
+    if not (0 <= hours <= 24 and 0 <= minutes < 60):
+        return None
+    return hours * 60 + minutes
+
+
+def parse_meeting_days(days_field) -> list[str]:
+    """
+    Parse a MEETING_DAYS cell into a list of day abbreviations.
+
+    Accepts both comma-separated values ("M,W,F") and packed values ("MWF").
+    """
+    if days_field is None:
+        return []
+    days = []
+    for token in str(days_field).split(","):
+        token = token.strip().upper()
+        if token in DAY_MAP:
+            days.append(token)
+        elif token and all(ch in DAY_MAP for ch in token):
+            days.extend(token)
+    return days
+
+
+def parse_day(value) -> str | None:
+    """Normalize a day given as an abbreviation ("F") or a name ("friday") to its abbreviation."""
+    value = str(value).strip()
+    if value.upper() in DAY_MAP:
+        return value.upper()
+    for abbrev, name in DAY_MAP.items():
+        if name.lower() == value.lower() or name[:3].lower() == value.lower():
+            return abbrev
+    return None
+
+
+def parse_time_range(value) -> tuple[int, int] | None:
+    """
+    Parse an avoided time range given as [start, end] or "start-end" in HHMM into minutes.
+
+    Returns:
+        tuple[int, int] | None: (start_minutes, end_minutes), or None if invalid.
+    """
+    if isinstance(value, str):
+        value = value.split("-")
+    try:
+        start, end = value
+    except (TypeError, ValueError):
+        return None
+    start, end = parse_hhmm(start), parse_hhmm(end)
+    if start is None or end is None or end <= start:
+        return None
+    return start, end
+
+
+# === Section Helpers ===
+def section_meetings(section: dict) -> list[tuple[int, int, int]]:
+    """
+    Expand a section into its weekly meetings.
+
+    Returns:
+        list[tuple[int, int, int]]: (day_index, start_minutes, end_minutes) for every meeting.
+    """
+    meetings = []
+    for row in section.get("meetings", [section]):
+        start = parse_hhmm(row.get("COURSE_START_TIME"))
+        end = parse_hhmm(row.get("COURSE_END_TIME"))
+        if start is None or end is None or end <= start:
+            continue
+        for abbrev in parse_meeting_days(row.get("MEETING_DAYS")):
+            meetings.append((DAY_INDEX[abbrev], start, end))
+    return meetings
+
+
+def group_sections(records: list[dict]) -> list[dict]:
+    """
+    Group offering rows by CRN so a section meeting on several rows is treated as one section.
+
+    Each grouped section keeps the fields of its first row plus a 'meetings' list holding every row.
+    """
+    sections = {}
+    for record in records:
+        crn = record.get("COURSE_REFERENCE_NUMBER")
+        key = crn if crn is not None else id(record)
+        if key not in sections:
+            sections[key] = {**record, "meetings": []}
+        sections[key]["meetings"].append(record)
+    return list(sections.values())
+
+
+def format_section_schedule(section: dict) -> dict:
+    """
+    Format a section's meetings as {day_name: [start_hhmm, end_hhmm]} for the UI.
+    """
+    course_days = {day: [] for day in DAY_NAMES}
+    try:
+        for row in section.get("meetings", [section]):
+            start, end = row.get("COURSE_START_TIME"), row.get("COURSE_END_TIME")
+            for abbrev in parse_meeting_days(row.get("MEETING_DAYS")):
+                try:
+                    # Convert to int for UI parsing
+                    course_days[DAY_MAP[abbrev]] = [
+                        int(float(str(start))),
+                        int(float(str(end))),
+                    ]
+                except (ValueError, TypeError) as e:
+                    logger.warning(f"Time conversion error for {abbrev}: {e}")
+    except Exception as e:
+        logger.error(f"Error in format_section_schedule: {e}")
+    return course_days
+
+
+def violates_constraints(
+    section: dict, avoided_days: set[int], avoided_ranges: list[tuple[int, int]]
+) -> bool:
+    """Check whether any meeting of a section falls on an avoided day or overlaps an avoided time range."""
+    for day, start, end in section_meetings(section):
+        if day in avoided_days:
+            return True
+        if any(start < r_end and r_start < end for r_start, r_end in avoided_ranges):
+            return True
+    return False
@@ -0,0 +1,490 @@
+import os
+import sys
+
+import numpy as np
+
+# Add the project root (1 level up from this file) to Python's module search path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from utils import setup_logger
+from scheduling.sections import (
+    DAY_INDEX,
+    format_section_schedule,
+    group_sections,
+    is_discussion_or_lab_section,
+    is_lecture_section,
+    meeting_key,
+    parse_day,
+    parse_time_range,
+    section_meetings,
+    violates_constraints,
+)
+from scheduling.scoring import meetings_mask, score_candidates
+
+# === Logging Setup ===
+logger = setup_logger(__name__)
+
+# Upper bound on the number of candidate schedules scored per request
+MAX_CANDIDATES = 20000
+# Upper bound on the partial assignments visited while searching for conflict-free candidates
+MAX_SEARCH_NODES = 500000
+DEFAULT_TOP_K = 3
+
+
+# === Constraints ===
+def parse_constraints(constraints: dict) -> tuple[set[int], list[tuple[int, int]]]:
+    """
+    Normalize the 'constraints' state into avoided day indices and avoided minute ranges.
+    """
+    avoided_days = set()
+    for day in constraints.get("avoided_days", []) or []:
+        abbrev = parse_day(day)
+        if abbrev:
+            avoided_days.add(DAY_INDEX[abbrev])
+        else:
+            logger.warning(f"Ignoring unrecognized avoided day: {day!r}")
+
+    avoided_ranges = []
+    for time_range in constraints.get("avoided_time_ranges", []) or []:
+        parsed = parse_time_range(time_range)
+        if parsed:
+            avoided_ranges.append(parsed)
+        else:
+            logger.warning(f"Ignoring unrecognized avoided time range: {time_range!r}")
+
+    return avoided_days, avoided_ranges
+
+
+# === Course Options ===
+def build_course_options(
+    sections: list[dict], avoided_days: set[int], avoided_ranges: list[tuple[int, int]]
+) -> list[dict]:
+    """
+    Build every lecture + discussion/lab combination of a course that satisfies the constraints.
+    Combinations whose lecture and discussion/lab overlap each other are left out.
+
+    Returns:
+        list[dict]: Options with 'lecture' and 'discussion_lab' sections (either may be None).
+    """
+    lectures, discussion_labs, others = [], [], []
+    requires_lecture = requires_discussion_lab = False
+    for section in group_sections(sections):
+        schedule_type = section.get("SCHEDULE_TYPE", "")
+        feasible = not violates_constraints(section, avoided_days, avoided_ranges)
+        if is_lecture_section(schedule_type):
+            requires_lecture = True
+            bucket = lectures
+        elif is_discussion_or_lab_section(schedule_type):
+            requires_discussion_lab = True
+            bucket = discussion_labs
+        else:
+            requires_lecture = True
+            bucket = others
+        if feasible:
+            bucket.append(section)
+
+    # Fallback to other sections if no clear lecture
+    lecture_choices = (lectures or others) if requires_lecture else [None]
+    discussion_lab_choices = discussion_labs if requires_discussion_lab else [None]
+
+    meetings = {
+        id(section): meetings_mask(section_meetings(section))
+        for section in lecture_choices + discussion_lab_choices
+        if section
+    }
+    return [
+        {"lecture": lec, "discussion_lab": dis}
+        for lec in lecture_choices
+        for dis in discussion_lab_choices
+        if not (lec and dis and (meetings[id(lec)] & meetings[id(dis)]).any())
+    ]
+
+
+def option_mask(option: dict) -> np.ndarray:
+    """Occupancy grid of a lecture + discussion/lab option."""
+    meetings = []
+    for section in (option["lecture"], option["discussion_lab"]):
+        if section:
+            meetings.extend(section_meetings(section))
+    return meetings_mask(meetings)
+
+
+def option_bits(option: dict) -> int:
+    """Occupancy grid of an option as an integer bitset, so two options conflict iff a & b."""
+    return int.from_bytes(np.packbits(option_mask(option).ravel()).tobytes(), "big")
+
+
+# === Candidate Search ===
+def search_choices(
+    course_bits: list[list[int]],
+    max_candidates: int = MAX_CANDIDATES,
+    max_nodes: int = MAX_SEARCH_NODES,
+) -> tuple[np.ndarray, bool]:
+    """
+    Enumerate conflict-free candidate schedules as rows of option indices, one column per course.
+
+    Runs a depth-first search over partial assignments, placing the courses with the fewest
+    options first. An option that overlaps the sections placed so far is never extended, and a
+    partial assignment is abandoned as soon as some unplaced course has no option left that fits
+    (forward checking), so conflicting regions of the product are pruned instead of enumerated.
+
+    Args:
+        course_bits (list[list[int]]): Per course, the occupancy bitset of each option.
+        max_candidates (int): Stop after this many conflict-free candidates.
+        max_nodes (int): Stop after visiting this many partial assignments.
+
+    Returns:
+        tuple[np.ndarray, bool]: Candidates of shape (N, n_courses), and whether the search space
+            was fully explored. Only an empty, fully explored result proves there is no
+            conflict-free schedule.
+    """
+    n_courses = len(course_bits)
+    order = sorted(range(n_courses), key=lambda c: len(course_bits[c]))
+    current = [0] * n_courses
+    found = []
+    nodes = 0
+
+    def visit(depth: int, occupied: int) -> bool:
+        """Extend the partial assignment; returns False once a limit is reached."""
+        nonlocal nodes
+        if depth == n_courses:
+            found.append(list(current))
+            return len(found) < max_candidates
+
+        course = order[depth]
+        for index, bits in enumerate(course_bits[course]):
+            if bits & occupied:
+                continue
+            nodes += 1
+            if nodes > max_nodes:
+                return False
+            placed = occupied | bits
+            if any(
+                all(other & placed for other in course_bits[later])
+                for later in order[depth + 1 :]
+            ):
+                continue
+            current[course] = index
+            if not visit(depth + 1, placed):
+                return False
+        return True
+
+    complete = visit(0, 0)
+    if not complete and len(found) < max_candidates:
+        logger.warning(f"Candidate search stopped after {max_nodes} nodes")
+    return np.array(found, dtype=np.int64).reshape(-1, n_courses), complete
+
+
+# === Formatting ===
+def format_option(course_id: str, option: dict) -> dict:
+    """Format a chosen option as a detailed schedule entry."""
+    entry = {"course_id": course_id, "sections": []}
+    for kind, section in (("lecture", option["lecture"]), ("discussion_lab", option["discussion_lab"])):
+        if section:
+            entry["sections"].append(
+                {
+                    "type": kind,
+                    "crn": section.get("COURSE_REFERENCE_NUMBER"),
+                    "schedule_type": section.get("SCHEDULE_TYPE"),
+                    "days": format_section_schedule(section),
+                }
+            )
+    return entry
+
+
+def to_legacy_schedule(final_schedule: dict) -> dict:
+    """Combine all sections of each course into the single-entry format the UI expects."""
+    legacy_schedule = {}
+    for course_id, course_data in final_schedule.items():
+        combined_days = {}
+        combined_crns = []
+        combined_types = []
+
+        for section in course_data.get("sections", []):
+            for day, times in section.get("days", {}).items():
+                if times and day not in combined_days:
+                    combined_days[day] = times
+            if section.get("crn"):
+                combined_crns.append(str(section["crn"]))
+            if section.get("schedule_type"):
+                combined_types.append(section["schedule_type"])
+
+        legacy_schedule[course_id] = {
+            "Name": course_id,
+            "CRN": "/".join(combined_crns),
+            "Schedule_Type": "/".join(combined_types),
+            "Days": combined_days,
+        }
+    return legacy_schedule
+
+
+# === Incremental Solver State ===
+# solver_state is a JSON-serializable dict kept in session state between turns:
+#   "constraints": normalized constraints the domains were computed under
+#   "domains": course_id -> {"sections_key": [[crn, days, start, end], ...],
+#                            "options": [[lecture_crn, discussion_crn], ...]}
+#   "last_solution": course_id -> option key of the best schedule found last time
+#   "signature" / "ranked": inputs and option keys of the last ranking, reused when nothing changed
+def _sections_key(sections: list[dict]) -> list[list[str]]:
+    # Meeting times are part of the key, so a catalog change that keeps the CRNs still counts
+    return [list(key) for key in sorted({tuple(meeting_key(s)) for s in sections})]
+
+
+def _option_key(option: dict) -> list:
+    return [
+        str(option[kind]["COURSE_REFERENCE_NUMBER"]) if option[kind] else None
+        for kind in ("lecture", "discussion_lab")
+    ]
+
+
+def _resolve_options(keys: list[list], sections: list[dict]) -> list[dict] | None:
+    """Map stored option keys back to grouped sections; None if any key no longer resolves."""
+    by_crn = {str(s.get("COURSE_REFERENCE_NUMBER")): s for s in group_sections(sections)}
+    options = []
+    for lecture_crn, discussion_crn in keys:
+        if (lecture_crn and lecture_crn not in by_crn) or (
+            discussion_crn and discussion_crn not in by_crn
+        ):
+            return None
+        options.append(
+            {
+                "lecture": by_crn.get(lecture_crn) if lecture_crn else None,
+                "discussion_lab": by_crn.get(discussion_crn) if discussion_crn else None,
+            }
+        )
+    return options
+
+
+def update_domains(
+    selected_courses: dict,
+    avoided_days: set[int],
+    avoided_ranges: list[tuple[int, int]],
+    solver_state: dict,
+) -> tuple[dict, set[str]]:
+    """
+    Bring the feasible domain of every selected course up to date.
+
+    A course whose sections are unchanged keeps its previous domain when the constraints are the
+    same, and only has that domain re-checked when the constraints became strictly tighter.
+    Anything else (a new course, loosened constraints) is rebuilt from its sections.
+
+    Returns:
+        tuple[dict, set[str]]: course_id -> feasible options, and the courses whose domain changed.
+    """
+    constraints = {
+        "avoided_days": sorted(avoided_days),
+        "avoided_ranges": sorted([list(r) for r in avoided_ranges]),
+    }
+    previous_constraints = solver_state.get("constraints")
+    same = previous_constraints == constraints
+    tighter = previous_constraints is not None and (
+        set(previous_constraints["avoided_days"]) <= avoided_days
+        and all(tuple(r) in set(avoided_ranges) for r in previous_constraints["avoided_ranges"])
+    )
+
+    previous_domains = solver_state.get("domains", {})
+    domains, options, changed = {}, {}, set()
+    for course_id, sections in selected_courses.items():
+        sections_key = _sections_key(sections)
+        cached = previous_domains.get(course_id)
+        course_options = None
+
+        if cached and cached["sections_key"] == sections_key and (same or tighter):
+            course_options = _resolve_options(cached["options"], sections)
+            if course_options is not None and not same:
+                course_options = [
+                    option
+                    for option in course_options
+                    if not any(
+                        section and violates_constraints(section, avoided_days, avoided_ranges)
+                        for section in (option["lecture"], option["discussion_lab"])
+                    )
+                ]
+
+        if course_options is None:
+            course_options = build_course_options(sections, avoided_days, avoided_ranges)
+
+        keys = [_option_key(option) for option in course_options]
+        if not cached or cached["options"] != keys or cached["sections_key"] != sections_key:
+            changed.add(course_id)
+        domains[course_id] = {"sections_key": sections_key, "options": keys}
+        options[course_id] = course_options
+        logger.info(f"Course {course_id}: {len(course_options)} feasible section combinations")
+
+    solver_state["constraints"] = constraints
+    solver_state["domains"] = domains
+    return options, changed
+
+
+def warm_start_choices(
+    course_ids: list[str],
+    options: dict,
+    course_bits: list[list[int]],
+    changed: set[str],
+    last_solution: dict,
+    max_candidates: int = MAX_CANDIDATES,
+) -> np.ndarray:
+    """
+    Candidates seeded from the previous solution: courses whose domain did not change keep their
+    previous section choice, and only the changed courses are searched.
+
+    Returns:
+        np.ndarray: Conflict-free candidates; empty when no course can keep its previous choice,
+            when nothing changed, or when the kept choices leave no room for the changed courses.
+    """
+    fixed = {}
+    for index, course_id in enumerate(course_ids):
+        keys = [_option_key(o) for o in options[course_id]]
+        previous = last_solution.get(course_id)
+        if course_id not in changed and previous in keys:
+            fixed[index] = keys.index(previous)
+
+    if not fixed or len(fixed) == len(course_ids):
+        return np.empty((0, len(course_ids)), dtype=np.int64)
+
+    restricted = [
+        [bits[fixed[index]]] if index in fixed else bits
+        for index, bits in enumerate(course_bits)
+    ]
+    rows, _ = search_choices(restricted, max_candidates)
+    for index, choice in fixed.items():
+        rows[:, index] = choice
+    return rows
+
+
+# === Solver ===
+def solve_schedules(
+    selected_courses: dict,
+    constraints: dict,
+    top_k: int = DEFAULT_TOP_K,
+    solver_state: dict | None = None,
+) -> dict:
+    """
+    Find the best conflict-free schedules for the selected courses.
+
+    Args:
+        selected_courses (dict): course_id -> list of section rows.
+        constraints (dict): 'avoided_days', 'avoided_time_ranges', optional 'score_weights' and 'top_k'.
+        top_k (int): Number of schedules to return when constraints do not specify one.
+        solver_state (dict | None): Per-session solver state, updated in place. When given, domains
+            are re-checked incrementally, and when only some courses changed, the others keep
+            their previous sections while only the changed ones are searched.
+
+    Returns:
+        dict: {
+            "status": "success" | "error",
+            "message": str,
+            "schedules": [{"detailed_schedule": dict, "score": float, "metrics": dict}, ...]
+        }
+    """
+    solver_state = {} if solver_state is None else solver_state
+    avoided_days, avoided_ranges = parse_constraints(constraints)
+    top_k = int(constraints.get("top_k", top_k) or top_k)
+
+    course_ids = list(selected_courses)
+    options, changed = update_domains(
+        selected_courses, avoided_days, avoided_ranges, solver_state
+    )
+
+    infeasible = [course_id for course_id in course_ids if not options[course_id]]
+    if infeasible:
+        return {
+            "status": "error",
+            "message": f"No sections of {', '.join(infeasible)} satisfy the current constraints.",
+            "schedules": [],
+        }
+
+    signature = {
+        "courses": course_ids,
+        "weights": constraints.get("score_weights") or {},
+        "top_k": top_k,
+    }
+    if not changed and solver_state.get("signature") == signature and solver_state.get("ranked"):
+        logger.info("Selections and constraints unchanged; reusing previous ranking")
+        schedules = []
+        for entry in solver_state["ranked"]:
+            detailed = {}
+            for course_id in course_ids:
+                (option,) = _resolve_options([entry["choice"][course_id]], selected_courses[course_id])
+                detailed[course_id] = format_option(course_id, option)
+            schedules.append(
+                {"detailed_schedule": detailed, "score": entry["score"], "metrics": entry["metrics"]}
+            )
+        return {
+            "status": "success",
+            "message": "Reused the previous ranking; nothing changed.",
+            "schedules": schedules,
+        }
+
+    option_masks = [
+        np.stack([option_mask(option) for option in options[course_id]])
+        for course_id in course_ids
+    ]
+    course_bits = [[option_bits(option) for option in options[c]] for c in course_ids]
+
+    # With the same weights, only the changed courses are re-searched around the previous choices
+    choices, complete = np.empty((0, len(course_ids)), dtype=np.int64), False
+    previous_signature = solver_state.get("signature") or {}
+    if {k: previous_signature.get(k) for k in ("weights", "top_k")} == {
+        k: signature[k] for k in ("weights", "top_k")
+    }:
+        choices = warm_start_choices(
+            course_ids, options, course_bits, changed, solver_state.get("last_solution", {})
+        )
+    warm_started = len(choices) > 0
+    if not warm_started:
+        choices, complete = search_choices(course_bits)
+
+    scores, metrics = score_candidates(
+        option_masks, choices, constraints.get("score_weights")
+    )
+    logger.info(
+        f"Scored {len(choices)} candidate schedules"
+        + (f" (re-searched {len(changed)} changed courses)" if warm_started else "")
+    )
+
+    ranked = np.argsort(scores, kind="stable")[:top_k]
+    ranked = [i for i in ranked if np.isfinite(scores[i])]
+    if not ranked:
+        # Only a fully explored search proves infeasibility
+        message = (
+            "Every combination of sections has a time conflict."
+            if complete
+            else "Could not find a conflict-free schedule within the search limit. "
+            "Try removing a course or loosening the constraints."
+        )
+        return {"status": "error", "message": message, "schedules": []}
+
+    schedules, ranked_state = [], []
+    for i in ranked:
+        chosen = {course_id: options[course_id][choices[i, c]] for c, course_id in enumerate(course_ids)}
+        entry_metrics = {
+            name: int(values[i]) for name, values in metrics.items() if name != "conflict"
+        }
+        schedules.append(
+            {
+                "detailed_schedule": {
+                    course_id: format_option(course_id, option)
+                    for course_id, option in chosen.items()
+                },
+                "score": float(scores[i]),
+                "metrics": entry_metrics,
+            }
+        )
+        ranked_state.append(
+            {
+                "choice": {course_id: _option_key(option) for course_id, option in chosen.items()},
+                "score": float(scores[i]),
+                "metrics": entry_metrics,
+            }
+        )
+
+    solver_state["last_solution"] = ranked_state[0]["choice"]
+    solver_state["signature"] = signature
+    solver_state["ranked"] = ranked_state
+
+    return {
+        "status": "success",
+        "message": f"Ranked {len(choices)} candidate schedules.",
+        "schedules": schedules,
+    }
@@ -0,0 +1,10 @@
+def section(crn, course_id, schedule_type, days, start, end):
+    """A section row as returned by the offerings query."""
+    return {
+        "COURSE_REFERENCE_NUMBER": crn,
+        "COURSE_ID": course_id,
+        "SCHEDULE_TYPE": schedule_type,
+        "MEETING_DAYS": days,
+        "COURSE_START_TIME": start,
+        "COURSE_END_TIME": end,
+    }
@@ -0,0 +1,40 @@
+import asyncio
+
+import pytest
+
+from common.admission import AdmissionController, AdmissionRejected, admission_key
+
+
+def test_admission_key_falls_back_to_the_session_for_shared_ids():
+    assert admission_key("student-42", "s1") == "user:student-42"
+    assert admission_key("current_user", "s1") == "session:s1"
+    assert admission_key("default_user", "s1") == "session:s1"
+    assert admission_key(None, "s1") == "session:s1"
+    assert admission_key("current_user", None) is None
+
+
+def test_per_user_limit_applies_per_key_only():
+    async def scenario():
+        admission = AdmissionController(max_concurrent=10, max_per_user=1)
+        release = asyncio.Event()
+
+        async def hold(key):
+            async with admission.admit(key):
+                await release.wait()
+
+        # Many new conversations from the shared frontend user run side by side
+        holders = [asyncio.create_task(hold(admission_key("current_user", None))) for _ in range(5)]
+        holders.append(asyncio.create_task(hold("session:a")))
+        await asyncio.sleep(0)
+        assert admission.running == 6
+
+        with pytest.raises(AdmissionRejected) as rejected:
+            async with admission.admit("session:a"):
+                pass
+        assert rejected.value.status_code == 429
+
+        release.set()
+        await asyncio.gather(*holders)
+        assert admission.running == 0 and admission.per_user == {}
+
+    asyncio.run(scenario())
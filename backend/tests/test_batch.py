@@ -0,0 +1,95 @@
+import asyncio
+import json
+import sys
+import types
+
+import pytest
+
+pytest.importorskip("google.adk")
+pytest.importorskip("fastapi")
+
+from fastapi.testclient import TestClient
+
+# The real coordinator connects to the database at import time; the server only needs a task manager
+sys.modules.setdefault("agents.coordinator", types.SimpleNamespace(coordinator=None))
+
+import common.app as app_module
+from common.admission import AdmissionController
+
+
+class RecordingTaskManager:
+    """Task manager that records which messages run at the same time."""
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.running = {}  # session_id -> messages in progress
+        self.order = []
+        self.peak = 0
+
+    async def process_task(self, message, context, session_id):
+        active = self.running.setdefault(session_id, [])
+        assert not active, f"{message} overlapped {active} in session {session_id}"
+        active.append(message)
+        self.order.append(message)
+        self.peak = max(self.peak, sum(len(m) for m in self.running.values()))
+        await asyncio.sleep(self.delay)
+        active.remove(message)
+        if message == "fail":
+            raise RuntimeError("agent crashed")
+        return {"session_id": session_id, "status": "success", "message": message, "state": {}}
+
+
+def client(task_manager):
+    admission = AdmissionController(max_concurrent=16, max_per_user=4)
+    return TestClient(app_module.create_agent_server("test", "test", task_manager, admission))
+
+
+def item(message, session_id):
+    return {"message": message, "session_id": session_id}
+
+
+def test_items_of_one_session_run_in_order():
+    task_manager = RecordingTaskManager()
+    batch = [item(f"s1-{i}", "s1") for i in range(4)]
+
+    response = client(task_manager).post("/run/batch", json={"requests": batch})
+
+    assert response.status_code == 200
+    assert task_manager.order == [f"s1-{i}" for i in range(4)]
+    assert [r["message"] for r in response.json()["results"]] == task_manager.order
+
+
+def test_different_sessions_overlap():
+    task_manager = RecordingTaskManager()
+    batch = [item(f"s{i}", f"s{i}") for i in range(4)]
+
+    response = client(task_manager).post("/run/batch", json={"requests": batch})
+
+    assert response.status_code == 200
+    assert task_manager.peak == 4
+
+
+def test_oversized_batch_is_rejected(monkeypatch):
+    monkeypatch.setattr(app_module, "BATCH_MAX_ITEMS", 2)
+    task_manager = RecordingTaskManager()
+    batch = [item(f"s{i}", f"s{i}") for i in range(3)]
+
+    response = client(task_manager).post("/run/batch", json={"requests": batch})
+
+    assert response.status_code == 413
+    assert task_manager.order == []
+
+
+def test_stream_sends_one_line_per_item():
+    task_manager = RecordingTaskManager(delay=0.01)
+    batch = [item("ok-0", "s1"), item("fail", "s2"), item("ok-1", "s1"), item("ok-2", None)]
+
+    response = client(task_manager).post("/run/batch", json={"requests": batch, "stream": True})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(line["index"] for line in lines) == [0, 1, 2, 3]
+    failed = next(line for line in lines if line["index"] == 1)
+    assert failed["status"] == "error"
+    assert "agent crashed" in failed["message"]
@@ -0,0 +1,92 @@
+import random
+
+from scheduling.catalog import CatalogSnapshot
+from scheduling.free_slots import FreeSlotIndex
+from scheduling.sections import section_meetings
+from scheduling.solver import build_course_options, format_option
+from helpers import section
+
+
+def random_catalog(rng, n_courses=12):
+    """Courses with a few lectures and discussions; some sections meet twice on the same day."""
+    catalog, crn = {}, 0
+    for i in range(n_courses):
+        course_id = f"C{i}"
+        rows = []
+        for schedule_type in ["LEC"] * rng.randint(1, 3) + ["DIS"] * rng.randint(0, 3):
+            crn += 1
+            for _ in range(rng.randint(1, 2)):
+                start = rng.randrange(8, 18) * 100 + rng.choice([0, 30])
+                end = start + rng.choice([50, 120])
+                rows.append(section(crn, course_id, schedule_type, rng.choice("MTWRF"), start, end))
+        catalog[course_id] = rows
+    return catalog
+
+
+def overlaps(first, second):
+    return any(
+        d1 == d2 and s1 < e2 and s2 < e1 for d1, s1, e1 in first for d2, s2, e2 in second
+    )
+
+
+def option_meetings(option):
+    return [
+        meeting
+        for part in (option["lecture"], option["discussion_lab"])
+        if part
+        for meeting in section_meetings(part)
+    ]
+
+
+def test_fitting_courses_matches_brute_force():
+    rng = random.Random(7)
+    for _ in range(20):
+        catalog = random_catalog(rng)
+        index = FreeSlotIndex(catalog)
+        scheduled = rng.sample(sorted(catalog), 2)
+        final_schedule, busy = {}, []
+        for course_id in scheduled:
+            options = build_course_options(catalog[course_id], set(), [])
+            if options:
+                option = rng.choice(options)
+                final_schedule[course_id] = format_option(course_id, option)
+                busy += option_meetings(option)
+
+        expected = {}
+        for course_id in sorted(set(catalog) - set(final_schedule)):
+            fits = [
+                option
+                for option in build_course_options(catalog[course_id], set(), [])
+                if not overlaps(option_meetings(option), busy)
+            ]
+            if fits:
+                expected[course_id] = len(fits)
+
+        results = index.fitting_courses(catalog, final_schedule)
+        assert {r["course_id"]: r["fitting_options"] for r in results} == expected
+
+
+def test_second_meeting_on_the_same_day_is_busy():
+    catalog = {
+        "A": [section(1, "A", "LEC", "M", 900, 950), section(1, "A", "LEC", "M", 1400, 1450)],
+        "B": [section(2, "B", "LEC", "M", 900, 950)],
+    }
+    index = FreeSlotIndex(catalog)
+    option = build_course_options(catalog["A"], set(), [])[0]
+    # The UI format keeps only the last Monday meeting of section 1
+    assert len(option_meetings(option)) == 2
+    final_schedule = {"A": format_option("A", option)}
+    assert index.fitting_courses(["B"], final_schedule) == []
+
+
+def test_catalog_version_covers_meeting_times():
+    rows = [section(1, "A", "LEC", "MW", 900, 950)]
+    moved = [section(1, "A", "LEC", "MW", 1000, 1050)]
+    assert (
+        CatalogSnapshot(["A"], [], sections={"A": rows}).version
+        != CatalogSnapshot(["A"], [], sections={"A": moved}).version
+    )
+    assert (
+        CatalogSnapshot(["A"], [], sections={"A": rows}).eligibility_version
+        == CatalogSnapshot(["A"], [], sections={"A": moved}).eligibility_version
+    )
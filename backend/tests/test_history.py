@@ -0,0 +1,88 @@
+import json
+
+import pytest
+
+pytest.importorskip("google.adk")
+
+from google.genai import types
+
+from utils.history import compact_history
+
+
+def text(role, message):
+    return types.Content(role=role, parts=[types.Part(text=message)])
+
+
+def call(i):
+    return types.Content(
+        role="model",
+        parts=[
+            types.Part(
+                function_call=types.FunctionCall(
+                    name="get_course_details", args={"course_id": f"C{i}"}
+                )
+            )
+        ],
+    )
+
+
+def response(i):
+    return types.Content(
+        role="user",
+        parts=[
+            types.Part(
+                function_response=types.FunctionResponse(
+                    name="get_course_details",
+                    response={"status": "success", "course_details": [f"C{i}" + "x" * 300] * 10},
+                )
+            )
+        ],
+    )
+
+
+def kind(content):
+    part = content.parts[0]
+    if part.function_call:
+        return "call"
+    if part.function_response:
+        return "response"
+    return content.role
+
+
+def compacted(content):
+    response = content.parts[0].function_response
+    return response is not None and "compacted" in json.dumps(response.response)
+
+
+def current_turn(n_calls=5):
+    contents = [text("user", "plan my week")]
+    for i in range(n_calls):
+        contents += [call(i), response(i)]
+    return contents
+
+
+def test_history_starts_at_a_user_turn():
+    history = [text("user", "hi " * 50), text("model", "hello " * 50)] + current_turn()
+    for budget in (100, 1000, 3000, 100000):
+        contents, _ = compact_history(history, budget, keep_recent=6)
+        assert kind(contents[0]) == "user"
+        assert contents[0].parts[0].text
+        assert any(c.parts[0].text == "plan my week" for c in contents)
+
+
+def test_older_turns_are_dropped_before_the_current_one():
+    history = [text("user", "old " * 400), text("model", "ok " * 400)] + current_turn()
+    contents, stats = compact_history(history, 3000, keep_recent=6)
+    assert stats["dropped"] == 2
+    assert contents[0].parts[0].text == "plan my week"
+
+
+def test_current_turn_over_budget_is_compacted_not_dropped():
+    history = current_turn()
+    contents, stats = compact_history(history, 500, keep_recent=6)
+    assert stats["dropped"] == 0
+    assert len(contents) == len(history)
+    responses = [c for c in contents if kind(c) == "response"]
+    # Every tool result is summarized except the newest one, which the model is answering
+    assert all(compacted(c) for c in responses[:-1])
+    assert not compacted(responses[-1])
@@ -0,0 +1,74 @@
+import pandas as pd
+
+from jobs.common import iter_student_chunks, load_catalog_exports, needed_courses_by_student
+from jobs.refresh_eligibility import run
+from scheduling import EligibilityStore
+
+
+def write_students(path, rows):
+    pd.DataFrame(rows, columns=["Student_ID", "Term", "courses_still_needed"]).to_csv(
+        path, index=False
+    )
+
+
+def test_chunks_never_split_a_student(tmp_path):
+    path = tmp_path / "students.csv"
+    write_students(
+        path,
+        [
+            ("1", "202540", "CS100"),
+            ("2", "202540", "CS200"),
+            ("2", "202540", "CS201"),
+            ("2", "202540", "CS202"),
+            ("3", "202540", "CS300"),
+        ],
+    )
+    chunks = list(iter_student_chunks(str(path), ["Student_ID", "courses_still_needed"], 2))
+
+    assert sum(len(chunk) for chunk in chunks) == 5
+    owners = {}
+    for position, chunk in enumerate(chunks):
+        for student_id in chunk["Student_ID"]:
+            assert owners.setdefault(student_id, position) == position
+
+    needed = {}
+    for chunk in chunks:
+        needed.update(needed_courses_by_student(chunk))
+    assert needed["2"] == ["CS200", "CS201", "CS202"]
+
+
+def test_refresh_eligibility_keeps_students_split_across_pages(tmp_path):
+    students = tmp_path / "students.csv"
+    write_students(
+        students,
+        [
+            ("1", "202540", "CS100"),
+            ("2", "202540", "CS100"),
+            ("2", "202540", "CS200"),
+            ("3", "202540", "CS200"),
+        ],
+    )
+    offerings = tmp_path / "offerings.csv"
+    pd.DataFrame(
+        [
+            (1, "CS100", "LEC", "M,W", 900, 950),
+            (2, "CS200", "LEC", "T,R", 900, 950),
+        ],
+        columns=[
+            "COURSE_REFERENCE_NUMBER",
+            "COURSE_ID",
+            "SCHEDULE_TYPE",
+            "MEETING_DAYS",
+            "COURSE_START_TIME",
+            "COURSE_END_TIME",
+        ],
+    ).to_csv(offerings, index=False)
+
+    store_path = str(tmp_path / "data" / "eligibility.sqlite3")
+    stats = run(str(students), str(offerings), None, store_path, chunk_size=2)
+    assert stats["stored"] == 3
+
+    store = EligibilityStore(store_path)
+    version = load_catalog_exports(str(offerings)).eligibility_version
+    assert store.lookup("2", "202610", version) == ["CS100", "CS200"]
+    store.close()
@@ -0,0 +1,72 @@
+import asyncio
+import time
+from typing import ClassVar
+
+import pytest
+
+pytest.importorskip("google.adk")
+
+from google.adk.models import LlmRequest
+
+from utils.models import FakeLlm, LLMRegistry, TieredLlm, resolve_model
+
+
+class SwitchableLlm(FakeLlm):
+    """Fake model whose latency the test controls."""
+
+    delay: ClassVar[float] = 0.03
+
+    @classmethod
+    def supported_models(cls) -> list[str]:
+        return [r"switchable"]
+
+    async def generate_content_async(self, llm_request, stream=False):
+        await asyncio.sleep(SwitchableLlm.delay)
+        async for response in super().generate_content_async(LlmRequest(model="fake"), stream):
+            yield response
+
+
+LLMRegistry.register(SwitchableLlm)
+
+
+async def models_used(llm: TieredLlm, calls: int) -> list[str]:
+    used = []
+    for _ in range(calls):
+        request = LlmRequest(model=llm.model)
+        async for _ in llm.generate_content_async(request):
+            pass
+        used.append(request.model)
+    return used
+
+
+def test_primary_recovers_after_cooldown():
+    async def scenario():
+        llm = TieredLlm(model="switchable", fallback="fake", p95_threshold=0.02, cooldown=0.1)
+
+        SwitchableLlm.delay = 0.03
+        await models_used(llm, 25)
+        assert time.monotonic() < llm._degraded_until
+
+        # A slow probe after the cooldown degrades the primary again straight away
+        await asyncio.sleep(0.15)
+        assert (await models_used(llm, 3)).count("switchable") == 1
+
+        SwitchableLlm.delay = 0.001
+        await asyncio.sleep(0.15)
+        assert await models_used(llm, 30) == ["switchable"] * 30
+
+    asyncio.run(scenario())
+
+
+def test_resolve_model_reads_tiering_from_the_environment(monkeypatch):
+    monkeypatch.setenv("TESTAGENT_MODEL", "switchable")
+    monkeypatch.setenv("TESTAGENT_FALLBACK_MODEL", "fake")
+    monkeypatch.setenv("TESTAGENT_P95_THRESHOLD", "3")
+    monkeypatch.setenv("TESTAGENT_FALLBACK_COOLDOWN", "15")
+
+    llm = resolve_model("testagent")
+
+    assert isinstance(llm, TieredLlm)
+    assert (llm.model, llm.fallback) == ("switchable", "fake")
+    assert llm.p95_threshold == 3.0
+    assert llm.cooldown == 15.0
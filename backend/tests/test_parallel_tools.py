@@ -0,0 +1,148 @@
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("google.adk")
+
+from google.adk.models import LlmResponse
+from google.genai import types
+
+from utils.parallel_tools import ParallelToolPrefetcher
+from utils.tool_cache import session_memoize
+
+
+def model_response(*calls):
+    """A model response carrying the given (name, args) function calls."""
+    return LlmResponse(
+        content=types.Content(
+            role="model",
+            parts=[
+                types.Part(function_call=types.FunctionCall(name=name, args=args))
+                for name, args in calls
+            ],
+        )
+    )
+
+
+def context(state=None):
+    return SimpleNamespace(invocation_id="inv-1", state=state if state is not None else {})
+
+
+class RecordingTools:
+    """Tool functions that record how many of them run at once."""
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.running = self.peak = 0
+        self.calls = []
+        self.threads = set()
+        self.lock = threading.Lock()
+
+    def _run(self, name, course_id):
+        with self.lock:
+            self.calls.append((name, course_id))
+            self.threads.add(threading.get_ident())
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        # Later calls finish first, so the order of results comes from the callbacks
+        time.sleep(self.delay / (1 + int(course_id[1:])))
+        with self.lock:
+            self.running -= 1
+        if course_id == "FAIL":
+            raise RuntimeError("database unavailable")
+        return {"status": "success", "course_id": course_id}
+
+    def all(self):
+        def get_course_details(course_id: str, tool_context) -> dict:
+            return self._run("get_course_details", course_id)
+
+        def select_desired_courses(selected_course_ids: list[str], tool_context) -> dict:
+            self.calls.append(("select_desired_courses", selected_course_ids))
+            return {"status": "success"}
+
+        def finalize_schedule(tool_context) -> dict:
+            self.calls.append(("finalize_schedule", None))
+            return {"status": "success"}
+
+        return [get_course_details, select_desired_courses, finalize_schedule]
+
+
+def run_turn(prefetcher, calls, state=None):
+    """Run one model turn the way the agent framework does: callbacks, then each call in order."""
+    callback_context = context(state)
+    prefetcher.after_model_callback(callback_context, model_response(*calls))
+
+    async def execute():
+        results = []
+        for name, args in calls:
+            tool = SimpleNamespace(name=name)
+            results.append(await prefetcher.before_tool_callback(tool, args, callback_context))
+        return results
+
+    return asyncio.run(execute())
+
+
+def test_results_keep_call_order_and_respect_the_turn_cap():
+    recorder = RecordingTools()
+    prefetcher = ParallelToolPrefetcher(
+        recorder.all(), parallel_safe={"get_course_details"}, max_per_turn=2
+    )
+    calls = [("get_course_details", {"course_id": f"C{i}"}) for i in range(6)]
+
+    results = run_turn(prefetcher, calls)
+
+    assert [r["course_id"] for r in results] == [f"C{i}" for i in range(6)]
+    assert recorder.peak == 2
+    # Queued calls wait for a free turn worker instead of holding pool workers of their own
+    assert len(recorder.threads) <= 2
+    assert len(recorder.calls) == 6
+
+
+def test_failed_prefetch_falls_back_to_the_tool():
+    recorder = RecordingTools(delay=0)
+    prefetcher = ParallelToolPrefetcher(recorder.all(), parallel_safe={"get_course_details"})
+    calls = [
+        ("get_course_details", {"course_id": "C1"}),
+        ("get_course_details", {"course_id": "FAIL"}),
+    ]
+
+    results = run_turn(prefetcher, calls)
+
+    # None makes the framework run the tool itself, which reports the error as usual
+    assert results == [{"status": "success", "course_id": "C1"}, None]
+
+
+def test_cached_and_single_calls_are_not_prefetched():
+    recorder = RecordingTools(delay=0)
+    tools = recorder.all()
+    tools[0] = session_memoize(version=lambda: "v1")(tools[0])
+    prefetcher = ParallelToolPrefetcher(tools, parallel_safe={"get_course_details"})
+    cached_key = tools[0].cache_key(course_id="C1")
+    state = {"tool_cache": {cached_key: {"status": "success", "course_id": "C1"}}}
+
+    # A single call gains nothing from a prefetch
+    assert run_turn(prefetcher, [("get_course_details", {"course_id": "C2"})]) == [None]
+    # C1 is answered by the session cache, which leaves a single call to prefetch
+    calls = [
+        ("get_course_details", {"course_id": "C1"}),
+        ("get_course_details", {"course_id": "C3"}),
+    ]
+    assert run_turn(prefetcher, calls, state) == [None, None]
+    assert recorder.calls == []
+
+
+def test_state_mutating_tools_are_never_submitted():
+    recorder = RecordingTools(delay=0)
+    prefetcher = ParallelToolPrefetcher(recorder.all(), parallel_safe={"get_course_details"})
+    calls = [
+        ("select_desired_courses", {"selected_course_ids": ["C1"]}),
+        ("finalize_schedule", {}),
+        ("select_desired_courses", {"selected_course_ids": ["C2"]}),
+    ]
+
+    assert run_turn(prefetcher, calls) == [None, None, None]
+    assert recorder.calls == []
+    assert not prefetcher._pending
@@ -0,0 +1,83 @@
+import scheduling.catalog as catalog_module
+from scheduling.catalog import load_catalog
+from scheduling.planner import plan_terms
+from scheduling.prerequisites import PrerequisiteIndex
+
+# A -> B -> C chain plus two independent courses
+EDGES = [("B", "A"), ("C", "B")]
+COURSES = ["A", "B", "C", "D", "E"]
+
+
+def plan(offering_terms=None, max_terms=4, max_units=8.0, **kwargs):
+    return plan_terms(
+        PrerequisiteIndex(EDGES, COURSES),
+        COURSES,
+        start_term="202610",
+        offering_terms=offering_terms or {},
+        course_units={},
+        max_units_per_term=max_units,
+        max_terms=max_terms,
+        **kwargs,
+    )
+
+
+def test_respects_prerequisites_and_units():
+    result = plan()
+    assert result["unplaced"] == []
+    position = {c: i for i, term in enumerate(result["terms"]) for c in term["courses"]}
+    assert position["A"] < position["B"] < position["C"]
+    assert all(term["units"] <= 8.0 for term in result["terms"])
+    assert len(result["terms"]) == 3
+
+
+def test_offering_patterns_restrict_terms():
+    # B is only offered in Fall, so C cannot come before the following Winter
+    result = plan(offering_terms={"B": {"40"}}, max_terms=5, max_units=12.0)
+    terms = {c: term["term_code"] for term in result["terms"] for c in term["courses"]}
+    assert terms["B"] == "202640"
+    assert terms["C"] == "202710"
+
+
+def test_short_horizon_leaves_courses_unplaced():
+    result = plan(max_terms=2)
+    assert "C" in result["unplaced"]
+
+
+def test_no_terms_plans_nothing():
+    result = plan(max_terms=0)
+    assert result["terms"] == []
+    assert result["unplaced"] == COURSES
+
+
+def test_single_term_offerings_do_not_restrict_other_terms(monkeypatch):
+    # The offerings table only holds the upcoming Winter term
+    rows = {
+        "catalog_offerings": [{"COURSE_ID": c} for c in COURSES],
+        "catalog_prerequisites": [
+            {"COURSE_ID": c, "PREREQUISITE_COURSE_ID": p} for c, p in EDGES
+        ],
+        "catalog_offering_patterns": [
+            {"COURSE_ID": c, "TERM_SUFFIX": "10", "UNITS": 4} for c in COURSES
+        ],
+    }
+
+    def fake_query(client, query, name):
+        if name not in rows:
+            raise RuntimeError("not available")
+        return rows[name]
+
+    monkeypatch.setattr(catalog_module, "_query", fake_query)
+    catalog = load_catalog(client=None)
+    assert catalog.offering_terms["A"] >= {"10", "20", "40"}
+
+    result = plan_terms(
+        catalog.prerequisites,
+        COURSES,
+        start_term="202610",
+        offering_terms=catalog.offering_terms,
+        course_units=catalog.course_units,
+        max_units_per_term=8.0,
+        max_terms=3,
+    )
+    assert result["unplaced"] == []
+    assert len(result["terms"]) == 3
@@ -0,0 +1,39 @@
+from scheduling.prerequisites import PrerequisiteIndex
+
+# CSE 8A -> CSE 8B -> CSE 12 -> CSE 100, and MATH 20A -> MATH 20B
+EDGES = [
+    ("CSE 8B", "CSE 8A"),
+    ("CSE 12", "CSE 8B"),
+    ("CSE 100", "CSE 12"),
+    ("MATH 20B", "MATH 20A"),
+]
+OFFERED = ["CSE 8A", "CSE 8B", "CSE 12", "CSE 100", "MATH 20A", "MATH 20B", "CSE 11"]
+
+
+def eligible(needed, offered=OFFERED):
+    index = PrerequisiteIndex(EDGES, OFFERED)
+    return index.decode(index.eligible(index.encode(needed), index.encode(offered)))
+
+
+def test_chained_prerequisites_unlock_one_step_at_a_time():
+    chain = ["CSE 8A", "CSE 8B", "CSE 12", "CSE 100"]
+    assert eligible(chain) == ["CSE 8A"]
+    assert eligible(chain[1:]) == ["CSE 8B"]
+    assert eligible(chain[2:]) == ["CSE 12"]
+
+
+def test_course_not_offered_is_not_eligible_and_still_blocks_its_dependents():
+    offered = [c for c in OFFERED if c != "CSE 8B"]
+    assert eligible(["CSE 8B", "CSE 12", "CSE 11"], offered) == ["CSE 11"]
+
+
+def test_completed_courses_are_skipped_and_satisfy_prerequisites():
+    # MATH 20A is completed (no longer needed), so MATH 20B is open
+    assert eligible(["MATH 20B", "CSE 100"]) == ["CSE 100", "MATH 20B"]
+
+
+def test_prerequisites_follow_the_chain_when_transitive():
+    index = PrerequisiteIndex(EDGES, OFFERED)
+    assert index.prerequisites("CSE 100") == ["CSE 12"]
+    assert index.prerequisites("CSE 100", transitive=True) == ["CSE 12", "CSE 8A", "CSE 8B"]
+    assert index.prerequisites("UNKNOWN 1") == []
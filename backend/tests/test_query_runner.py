@@ -0,0 +1,97 @@
+import threading
+import time
+
+import pytest
+
+from utils import query_runner
+from utils.query_runner import QueryTimeout, metrics, run_query
+
+
+class ApiError(Exception):
+    """Client error carrying an HTTP status code, like the database client's exceptions."""
+
+    def __init__(self, code):
+        super().__init__(f"HTTP {code}")
+        self.code = code
+
+
+class FakeJob:
+    def __init__(self, delay, outcome):
+        self.delay = delay
+        self.outcome = outcome
+        self.cancelled = threading.Event()
+
+    def result(self, timeout=None):
+        if self.cancelled.wait(min(self.delay, timeout)) or self.delay > timeout:
+            raise TimeoutError("job did not finish")
+        if isinstance(self.outcome, Exception):
+            raise self.outcome
+        return self.outcome
+
+    def cancel(self):
+        self.cancelled.set()
+
+
+class FakeClient:
+    """Client whose n-th query takes delays[n] seconds and then returns or raises outcomes[n]."""
+
+    def __init__(self, *steps):
+        self.steps = list(steps)
+        self.jobs = []
+
+    def query(self, query, job_config=None):
+        delay, outcome = self.steps[min(len(self.jobs), len(self.steps) - 1)]
+        job = FakeJob(delay, outcome)
+        self.jobs.append(job)
+        return job
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(query_runner, "BACKOFF_BASE_SECONDS", 0.0)
+
+
+def test_transient_errors_are_retried():
+    client = FakeClient((0, ApiError(503)), (0, [{"id": 1}]))
+
+    assert run_query(client, "SELECT 1", name="retry-503") == [{"id": 1}]
+    assert len(client.jobs) == 2
+    assert metrics.snapshot()["retry-503"]["retries"] == 1
+
+
+def test_client_errors_are_not_retried():
+    client = FakeClient((0, ApiError(400)), (0, [{"id": 1}]))
+
+    with pytest.raises(ApiError):
+        run_query(client, "SELECT 1", name="no-retry-400")
+    assert len(client.jobs) == 1
+
+
+def test_deadline_covers_the_whole_call():
+    client = FakeClient((5, [{"id": 1}]))
+
+    started = time.monotonic()
+    with pytest.raises(QueryTimeout):
+        run_query(client, "SELECT 1", name="deadline", deadline=0.2)
+    assert time.monotonic() - started < 1
+    assert all(job.cancelled.is_set() for job in client.jobs)
+
+
+def test_slow_query_is_hedged_after_p95():
+    for _ in range(query_runner.MIN_HEDGE_SAMPLES):
+        metrics.record("hedged", 0.05)
+    client = FakeClient((5, [{"id": "slow"}]), (0, [{"id": "hedge"}]))
+
+    started = time.monotonic()
+    assert run_query(client, "SELECT 1", name="hedged", hedge=True) == [{"id": "hedge"}]
+    assert time.monotonic() - started < 1
+    assert metrics.snapshot()["hedged"]["hedged"] == 1
+    # The abandoned primary is cancelled
+    assert client.jobs[0].cancelled.is_set()
+
+
+def test_no_hedge_without_enough_samples():
+    client = FakeClient((0.1, [{"id": 1}]), (0, [{"id": 2}]))
+
+    assert run_query(client, "SELECT 1", name="cold", hedge=True) == [{"id": 1}]
+    assert len(client.jobs) == 1
@@ -0,0 +1,56 @@
+import gzip
+from datetime import date, datetime
+from decimal import Decimal
+
+import orjson
+import pytest
+
+pytest.importorskip("fastapi")
+brotli = pytest.importorskip("brotli")
+
+from common.responses import compress, dumps, negotiate_encoding
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        ("", None),
+        ("identity", None),
+        ("gzip", "gzip"),
+        ("gzip, deflate, br", "br"),
+        ("br;q=0, gzip", "gzip"),
+        ("br;q=0.5, gzip;q=0.8", "gzip"),
+        ("gzip;q=0", None),
+        ("*", "br"),
+        ("*;q=0", None),
+        ("*, br;q=0", "gzip"),
+        ("identity, *;q=0", None),
+        ("GZIP;q=1.0", "gzip"),
+        ("gzip;q=abc", None),
+    ],
+)
+def test_negotiate_encoding(header, expected):
+    assert negotiate_encoding(header) == expected
+
+
+def test_dumps_converts_database_values():
+    row = {
+        "units": Decimal("4.0"),
+        "start": date(2025, 9, 25),
+        "loaded_at": datetime(2025, 9, 25, 8, 30),
+        "terms": {"30", "10"},
+    }
+
+    assert orjson.loads(dumps(row)) == {
+        "units": 4.0,
+        "start": "2025-09-25",
+        "loaded_at": "2025-09-25T08:30:00",
+        "terms": ["10", "30"],
+    }
+
+
+def test_compress_round_trips():
+    body = dumps({"sections": [{"crn": i, "days": "MWF"} for i in range(200)]})
+
+    assert gzip.decompress(compress(body, "gzip")) == body
+    assert brotli.decompress(compress(body, "br")) == body
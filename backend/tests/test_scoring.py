@@ -0,0 +1,64 @@
+import numpy as np
+
+from scheduling.scoring import SLOT_MINUTES, meetings_mask, score_candidates
+
+
+def masks(*options):
+    """Stack the occupancy grids of a course's options, each given as a list of meetings."""
+    return np.stack([meetings_mask(meetings) for meetings in options])
+
+
+def test_meetings_mask_rounds_partial_slots_up():
+    mask = meetings_mask([(0, 8 * 60, 8 * 60 + 52)])
+    assert mask[0].sum() == -(-52 // SLOT_MINUTES)
+    assert not mask[1:].any()
+
+
+def test_conflicting_candidates_score_infinite():
+    option_masks = [masks([(0, 480, 540)]), masks([(0, 500, 560)], [(1, 480, 540)])]
+    scores, metrics = score_candidates(option_masks, np.array([[0, 0], [0, 1]]))
+    assert np.isinf(scores[0]) and metrics["conflict"][0]
+    assert np.isfinite(scores[1]) and not metrics["conflict"][1]
+
+
+def test_metrics_of_a_single_candidate():
+    # Monday 8:00-9:00 and 10:00-11:00, Tuesday 9:00-9:50
+    option_masks = [
+        masks([(0, 480, 540)]),
+        masks([(0, 600, 660)]),
+        masks([(1, 540, 590)]),
+    ]
+    _, metrics = score_candidates(option_masks, np.array([[0, 0, 0]]))
+    assert metrics["gap_minutes"][0] == 60
+    assert metrics["days_on_campus"][0] == 2
+    assert metrics["earliest_start"][0] == 480
+    assert metrics["latest_end"][0] == 660
+    assert metrics["back_to_back"][0] == 0
+
+
+def test_fewer_days_on_campus_ranks_first():
+    option_masks = [masks([(0, 480, 540)]), masks([(0, 540, 600)], [(2, 540, 600)])]
+    scores, _ = score_candidates(option_masks, np.array([[0, 0], [0, 1]]))
+    assert scores[0] < scores[1]
+
+
+def test_weights_override_defaults():
+    option_masks = [masks([(0, 480, 540)]), masks([(0, 540, 600)], [(2, 540, 600)])]
+    choices = np.array([[0, 0], [0, 1]])
+    scores, _ = score_candidates(
+        option_masks, choices, {"days_on_campus": -1000.0, "gap_minutes": 0.0}
+    )
+    assert scores[1] < scores[0]
+
+
+def test_back_to_back_counts_adjacent_and_short_gaps():
+    # Monday 9:00-9:50 then 9:50-10:40 (no gap) and 10:50-11:40 (10 minute gap);
+    # Tuesday 9:00-9:50 then 11:00-11:50 (too long a gap)
+    option_masks = [
+        masks([(0, 540, 590), (1, 540, 590)]),
+        masks([(0, 590, 640)]),
+        masks([(0, 650, 700), (1, 660, 710)]),
+    ]
+    _, metrics = score_candidates(option_masks, np.array([[0, 0, 0]]))
+    assert metrics["back_to_back"][0] == 2
+    assert metrics["gap_minutes"][0] == 10 + 70
@@ -0,0 +1,60 @@
+import pytest
+
+from scheduling.search import CourseSearchIndex
+
+DOCUMENTS = {
+    "CSE 100": {"title": "Advanced Data Structures", "description": "Trees, graphs and hashing."},
+    "CSE 120": {"title": "Principles of Computer Operating Systems", "description": "Processes and threads."},
+    "CSE 150": {"title": "Introduction to Artificial Intelligence", "description": "Search and planning."},
+    "CSE 151A": {"title": "Introduction to Machine Learning", "description": "Supervised learning."},
+    "CSE 158": {"title": "Recommender Systems and Web Mining", "description": "Predictive analytics."},
+    "COGS 118A": {"title": "Supervised Machine Learning Algorithms", "description": "Classification."},
+    "MATH 18": {"title": "Linear Algebra", "description": "Matrix algebra and vector spaces."},
+    "MATH 180A": {"title": "Introduction to Probability", "description": "Random variables."},
+}
+
+
+@pytest.fixture(scope="module")
+def index():
+    return CourseSearchIndex(DOCUMENTS)
+
+
+@pytest.mark.parametrize("query", ["CSE 158", "cse158", "cse-158", "  Cse 158 "])
+def test_exact_course_code_ranks_first(index, query):
+    results = index.search(query)
+    assert results[0] == {
+        "course_id": "CSE 158",
+        "title": "Recommender Systems and Web Mining",
+        "score": 1.0,
+    }
+
+
+def test_exact_course_code_ranks_clearly_above_its_subject(index):
+    best, *others = index.search("CSE 158")
+    assert best["course_id"] == "CSE 158"
+    assert others and all(r["course_id"].startswith("CSE") for r in others)
+    assert all(r["score"] <= 0.5 for r in others)
+
+
+def test_partial_course_number_keeps_matching_courses(index):
+    results = index.search("cse 15")
+    assert {r["course_id"] for r in results[:3]} == {"CSE 150", "CSE 151A", "CSE 158"}
+
+
+def test_typos_are_tolerated(index):
+    results = index.search("machine lerning")
+    assert {r["course_id"] for r in results} == {"CSE 151A", "COGS 118A"}
+    assert index.search("recomender sytems")[0]["course_id"] == "CSE 158"
+
+
+@pytest.mark.parametrize(
+    "query, course_id", [("ml", "CSE 151A"), ("ai", "CSE 150"), ("os", "CSE 120")]
+)
+def test_short_queries_match_title_initials(index, query, course_id):
+    assert course_id in [r["course_id"] for r in index.search(query)]
+
+
+def test_unrelated_queries_return_nothing(index):
+    assert index.search("underwater basket weaving") == []
+    assert index.search("") == []
+    assert index.search("the") == []
@@ -0,0 +1,164 @@
+import numpy as np
+
+from scheduling.solver import search_choices, solve_schedules
+from helpers import section
+
+
+def chained_courses(n_courses=8, discussions=6):
+    """
+    Courses with one lecture each (all on Saturday, never conflicting) and Monday discussions
+    placed so that exactly one discussion slot assignment is conflict-free: course i can use
+    hour slots i, i-1, ..., so course 0 must take slot 0, course 1 slot 1, and so on.
+    """
+    courses, crn = {}, 0
+    for i in range(n_courses):
+        course_id = f"C{i}"
+        crn += 1
+        rows = [section(crn, course_id, "LEC", "S", 800 + 100 * i, 850 + 100 * i)]
+        slots = [i - k for k in range(min(i + 1, discussions))]
+        slots += [0] * (discussions - len(slots))
+        for slot in slots:
+            crn += 1
+            rows.append(section(crn, course_id, "DIS", "M", 800 + 100 * slot, 850 + 100 * slot))
+        courses[course_id] = rows
+    return courses
+
+
+def assigned_crns(schedule):
+    return {
+        course_id: [s["crn"] for s in entry["sections"]]
+        for course_id, entry in schedule["detailed_schedule"].items()
+    }
+
+
+def test_search_skips_conflicts_and_finds_all_feasible():
+    # Course 0 options occupy bits 1 or 2; course 1 options occupy bits 1 or 4
+    choices, complete = search_choices([[0b001, 0b010], [0b001, 0b100]])
+    assert complete
+    assert sorted(map(tuple, choices.tolist())) == [(0, 1), (1, 0), (1, 1)]
+
+
+def test_search_proves_infeasibility():
+    choices, complete = search_choices([[0b1], [0b1], [0b10]])
+    assert complete and choices.shape == (0, 3)
+
+
+def test_search_reports_incomplete_when_limited():
+    choices, complete = search_choices([[1, 2, 4, 8]] + [[16, 32]], max_candidates=3)
+    assert len(choices) == 3 and not complete
+
+
+def test_finds_the_only_feasible_schedule_in_a_large_product():
+    # 6**8 combinations, far more than the candidate limit, with a single valid assignment
+    courses = chained_courses()
+    result = solve_schedules(courses, {})
+    assert result["status"] == "success"
+
+    for schedule in result["schedules"]:
+        monday = []
+        for entry in schedule["detailed_schedule"].values():
+            for s in entry["sections"]:
+                if s["days"]["Monday"]:
+                    monday.append(tuple(s["days"]["Monday"]))
+        assert len(monday) == len(set(monday)) == len(courses)
+
+
+def test_reports_conflict_when_no_schedule_exists():
+    courses = {
+        "A": [section(1, "A", "LEC", "M,W", 900, 950)],
+        "B": [section(2, "B", "LEC", "M", 930, 1020)],
+    }
+    result = solve_schedules(courses, {})
+    assert result["status"] == "error"
+    assert "time conflict" in result["message"]
+
+
+def test_constraints_exclude_sections():
+    courses = {
+        "A": [
+            section(1, "A", "LEC", "M,W", 800, 850),
+            section(2, "A", "LEC", "T,R", 1300, 1350),
+        ]
+    }
+    result = solve_schedules(courses, {"avoided_time_ranges": ["0000-1000"]})
+    assert assigned_crns(result["schedules"][0]) == {"A": [2]}
+
+    result = solve_schedules(courses, {"avoided_days": ["Tuesday"], "avoided_time_ranges": ["0000-1000"]})
+    assert result["status"] == "error"
+
+
+def test_pairs_lectures_with_discussions():
+    courses = {
+        "A": [
+            section(1, "A", "LEC", "M,W", 900, 950),
+            section(2, "A", "DIS", "M", 900, 950),
+            section(3, "A", "DIS", "F", 900, 950),
+        ]
+    }
+    result = solve_schedules(courses, {})
+    assert [assigned_crns(s) for s in result["schedules"]] == [{"A": [1, 3]}]
+
+
+def test_unchanged_inputs_reuse_the_previous_ranking():
+    courses = chained_courses(n_courses=3, discussions=2)
+    solver_state = {}
+    first = solve_schedules(courses, {}, solver_state=solver_state)
+    second = solve_schedules(courses, {}, solver_state=solver_state)
+    assert second["message"].startswith("Reused")
+    assert [assigned_crns(s) for s in second["schedules"]] == [
+        assigned_crns(s) for s in first["schedules"]
+    ]
+    assert np.isfinite([s["score"] for s in second["schedules"]]).all()
+
+
+def test_adding_a_course_keeps_previous_sections():
+    courses = {
+        "A": [section(1, "A", "LEC", "M,W", 900, 950), section(2, "A", "LEC", "T,R", 900, 950)],
+        "B": [section(3, "B", "LEC", "M,W", 1000, 1050), section(4, "B", "LEC", "T,R", 1000, 1050)],
+    }
+    solver_state = {}
+    first = solve_schedules(courses, {}, solver_state=solver_state)
+    kept = assigned_crns(first["schedules"][0])
+
+    courses["C"] = [section(5, "C", "LEC", "F", 900, 950), section(6, "C", "LEC", "F", 1300, 1350)]
+    second = solve_schedules(courses, {}, solver_state=solver_state)
+    # Only the new course was searched, so every candidate keeps A and B as before
+    assert len(second["schedules"]) == 2
+    for schedule in second["schedules"]:
+        crns = assigned_crns(schedule)
+        assert {k: crns[k] for k in kept} == kept
+
+
+def test_falls_back_to_a_full_search_when_previous_sections_block_a_new_course():
+    courses = {
+        "A": [section(1, "A", "LEC", "M,W", 900, 950), section(2, "A", "LEC", "T,R", 1300, 1350)],
+    }
+    # Prefer early classes, so A first takes its Monday/Wednesday 9:00 section
+    constraints = {"score_weights": {"earliest_start": 1.0}}
+    solver_state = {}
+    first = solve_schedules(courses, constraints, solver_state=solver_state)
+    assert assigned_crns(first["schedules"][0]) == {"A": [1]}
+
+    courses["B"] = [section(3, "B", "LEC", "M", 900, 950)]
+    result = solve_schedules(courses, constraints, solver_state=solver_state)
+    assert result["status"] == "success"
+    assert assigned_crns(result["schedules"][0]) == {"A": [2], "B": [3]}
+
+
+def test_moved_meeting_times_are_not_served_from_the_previous_ranking():
+    courses = {
+        "A": [section(1, "A", "LEC", "M,W", 900, 950), section(2, "A", "LEC", "T,R", 1300, 1350)],
+    }
+    constraints = {"score_weights": {"earliest_start": 1.0}}
+    solver_state = {}
+    first = solve_schedules(courses, constraints, solver_state=solver_state)
+    assert assigned_crns(first["schedules"][0]) == {"A": [1]}
+
+    # A catalog refresh moves section 1 to the afternoon without changing its CRN
+    courses["A"][0] = section(1, "A", "LEC", "M,W", 1500, 1550)
+    second = solve_schedules(courses, constraints, solver_state=solver_state)
+    assert not second["message"].startswith("Reused")
+    best = second["schedules"][0]
+    assert assigned_crns(best) == {"A": [2]}
+    moved = second["schedules"][1]["detailed_schedule"]["A"]["sections"][0]
+    assert moved["days"]["Monday"] == [1500, 1550]
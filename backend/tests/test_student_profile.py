@@ -0,0 +1,41 @@
+from utils.student_profile import DEFAULT_PROMPT_FIELDS, profile_savings, render_student_profile
+
+STUDENT = {
+    "Student_ID": "A12345678",
+    "First_Name": "Alex",
+    "Last_Name": "Doe",
+    "Email": "adoe@example.edu",
+    "Major_1_Desc": "Computer Science",
+    "Term": "Fall 2025",
+    "Term_Code": "202510",
+    "courses_still_needed": ["CSE 100", "CSE 101", "MATH 183"],
+    "Advisor_Notes": "Met on 2025-05-02 to review the degree audit. " * 20,
+    "GPA": 3.6,
+    "Minor_Desc": "",
+}
+
+
+def test_empty_record_renders_a_placeholder():
+    profile = render_student_profile({}, DEFAULT_PROMPT_FIELDS)
+    assert profile == "No student details available."
+
+
+def test_full_record_keeps_only_prompt_fields():
+    profile = render_student_profile(STUDENT, DEFAULT_PROMPT_FIELDS)
+    assert profile.splitlines() == [
+        "Major_1_Desc: Computer Science",
+        "Term: Fall 2025",
+        "Term_Code: 202510",
+        "courses_still_needed: CSE 100, CSE 101, MATH 183",
+    ]
+
+
+def test_missing_and_empty_fields_are_skipped():
+    profile = render_student_profile(STUDENT, ["Minor_Desc", "Unknown", "GPA"])
+    assert profile == "GPA: 3.6"
+
+
+def test_rendered_profile_is_smaller_than_the_record():
+    profile = render_student_profile(STUDENT, DEFAULT_PROMPT_FIELDS)
+    full, rendered = profile_savings(STUDENT, profile)
+    assert 0 < rendered < full
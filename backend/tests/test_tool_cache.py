@@ -0,0 +1,55 @@
+from types import SimpleNamespace
+
+from utils.tool_cache import invalidate_selection, session_memoize
+
+
+def test_memoized_tool_runs_uncached_when_the_version_fails():
+    calls = []
+
+    def broken_version():
+        raise TimeoutError("catalog unavailable")
+
+    @session_memoize(version=broken_version)
+    def lookup(course_id: str, tool_context) -> dict:
+        calls.append(course_id)
+        return {"status": "success", "course_id": course_id}
+
+    context = SimpleNamespace(state={})
+    assert lookup("CS 101", tool_context=context) == {"status": "success", "course_id": "CS 101"}
+    assert lookup("CS 101", tool_context=context)["status"] == "success"
+    assert calls == ["CS 101", "CS 101"]
+    assert lookup.cache_key("CS 101") is None
+    assert "tool_cache" not in context.state
+
+
+def test_invalidate_selection_keeps_selection_independent_tools():
+    @session_memoize(version=lambda: "v1")
+    def catalog_lookup(course_id: str, tool_context) -> dict:
+        return {"status": "success", "course_id": course_id}
+
+    @session_memoize(version=lambda: "v1", depends_on_selection=True)
+    def selection_lookup(course_id: str, tool_context) -> dict:
+        return {"status": "success", "course_id": course_id}
+
+    context = SimpleNamespace(state={})
+    catalog_lookup("CS 101", tool_context=context)
+    selection_lookup("CS 101", tool_context=context)
+
+    assert invalidate_selection(context) == 1
+    assert list(context.state["tool_cache"]) == [catalog_lookup.cache_key("CS 101")]
+
+
+def test_selection_change_misses_the_cache():
+    @session_memoize(version=lambda: "v1", depends_on_selection=True)
+    def scheduled_courses(tool_context) -> dict:
+        return {"status": "success", "courses": sorted(tool_context.state["final_schedule"])}
+
+    context = SimpleNamespace(state={"final_schedule": {"CS 101": {}}})
+    assert scheduled_courses(tool_context=context)["courses"] == ["CS 101"]
+
+    # Without invalidation the stale result is served from the cache
+    context.state["final_schedule"] = {"CS 101": {}, "MATH 20A": {}}
+    assert scheduled_courses(tool_context=context)["courses"] == ["CS 101"]
+
+    invalidate_selection(context)
+    assert scheduled_courses(tool_context=context)["courses"] == ["CS 101", "MATH 20A"]
@@ -1,2 +1,5 @@
 from utils.file_loader import load_instructions_file
 from utils.logging_config import setup_logger
+from utils.terms import next_term, term_label
+from utils.singleflight import SingleFlight, singleflight
+from utils.query_runner import QueryTimeout, run_query
@@ -0,0 +1,159 @@
+import json
+import os
+from typing import Optional
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+from google.genai import types
+
+from utils.logging_config import setup_logger
+from utils.tokens import estimate_tokens
+
+logger = setup_logger(__name__)
+
+# === Configuration ===
+DEFAULT_TOKEN_BUDGET = int(os.getenv("HISTORY_TOKEN_BUDGET", "8000"))
+DEFAULT_KEEP_RECENT = int(os.getenv("HISTORY_KEEP_RECENT", "6"))
+
+# Tool results longer than this (in characters of JSON) are summarized once out of the window
+MAX_VERBATIM_VALUE_CHARS = 200
+
+# Tools whose full result is also kept in session state, so the summary can point there
+STATE_REFERENCES = {
+    "get_student_details": "student_details",
+    "select_desired_courses": "selected_courses",
+    "finalize_schedule": "final_schedule",
+}
+
+
+def summarize_tool_response(name: str, response: dict) -> dict:
+    """
+    Compact a tool result: keep status, message and short fields, replace bulky ones with a size note.
+    """
+    summary = {"compacted": True}
+    for key, value in (response or {}).items():
+        if key in ("status", "message") or len(json.dumps(value, default=str)) <= MAX_VERBATIM_VALUE_CHARS:
+            summary[key] = value
+        elif isinstance(value, (list, dict)):
+            summary[key] = f"<{len(value)} items omitted>"
+        else:
+            summary[key] = "<omitted>"
+    if name in STATE_REFERENCES:
+        summary["full_result_in_state"] = STATE_REFERENCES[name]
+    return summary
+
+
+def _compact_content(content: types.Content) -> tuple[types.Content, int]:
+    """Return a copy of the content with function responses summarized, and how many were."""
+    parts, compacted = [], 0
+    for part in content.parts or []:
+        response = part.function_response
+        if response is not None and not (response.response or {}).get("compacted"):
+            part = types.Part(
+                function_response=types.FunctionResponse(
+                    id=response.id,
+                    name=response.name,
+                    response=summarize_tool_response(response.name, response.response),
+                )
+            )
+            compacted += 1
+        parts.append(part)
+    return types.Content(role=content.role, parts=parts), compacted
+
+
+def _starts_turn(content: types.Content) -> bool:
+    """A user message with text, i.e. a safe place for the history to begin."""
+    return content.role == "user" and any(
+        part.text and part.function_response is None for part in content.parts or []
+    )
+
+
+def compact_history(
+    contents: list[types.Content], token_budget: int, keep_recent: int
+) -> tuple[list[types.Content], dict]:
+    """
+    Keep the most recent contents verbatim, summarize older tool results and, if the history is
+    still over budget, drop the oldest turns.
+
+    History is only ever cut where a user turn starts, and never past the start of the latest
+    one, so function calls stay paired with their responses and the current message is kept.
+    If the current turn alone is over budget, its tool results are summarized as well, except
+    for the newest content, which the model is about to act on.
+
+    Returns:
+        tuple[list[types.Content], dict]: The new contents and size statistics.
+    """
+    before = sum(estimate_tokens(c) for c in contents)
+    cutoff = max(len(contents) - keep_recent, 0)
+    turn_starts = [i for i, content in enumerate(contents) if _starts_turn(content)]
+    latest_turn = turn_starts[-1] if turn_starts else 0
+
+    compacted_total = 0
+    new_contents = []
+    for i, content in enumerate(contents):
+        if i < cutoff:
+            content, compacted = _compact_content(content)
+            compacted_total += compacted
+        new_contents.append(content)
+
+    sizes = [estimate_tokens(c) for c in new_contents]
+    total = sum(sizes)
+    dropped = 0
+    # Drop whole turns from the front, up to the start of the latest one
+    for start in turn_starts:
+        if total <= token_budget or start > latest_turn:
+            break
+        if start > dropped:
+            total -= sum(sizes[dropped:start])
+            dropped = start
+
+    # Still over budget: summarize the tool results of what is left, newest content excluded
+    for i in range(dropped, len(new_contents) - 1):
+        if total <= token_budget:
+            break
+        content, compacted = _compact_content(new_contents[i])
+        if compacted:
+            new_contents[i] = content
+            compacted_total += compacted
+            total += estimate_tokens(content) - sizes[i]
+
+    return new_contents[dropped:], {
+        "contents": len(contents) - dropped,
+        "dropped": dropped,
+        "compacted_tool_results": compacted_total,
+        "tokens_before": before,
+        "tokens_after": total,
+    }
+
+
+def make_history_compactor(
+    agent_name: str,
+    token_budget: Optional[int] = None,
+    keep_recent: Optional[int] = None,
+):
+    """
+    Build a before_model_callback that windows and compacts the conversation history.
+
+    The budget can be set per agent with HISTORY_TOKEN_BUDGET_<AGENT_NAME> (e.g.
+    HISTORY_TOKEN_BUDGET_SCHEDULER), falling back to HISTORY_TOKEN_BUDGET.
+    """
+    token_budget = token_budget or int(
+        os.getenv(f"HISTORY_TOKEN_BUDGET_{agent_name.upper()}", DEFAULT_TOKEN_BUDGET)
+    )
+    keep_recent = keep_recent or DEFAULT_KEEP_RECENT
+
+    def before_model_callback(
+        callback_context: CallbackContext, llm_request: LlmRequest
+    ) -> Optional[LlmResponse]:
+        llm_request.contents, stats = compact_history(
+            llm_request.contents, token_budget, keep_recent
+        )
+        logger.info(
+            f"[{agent_name}] history: {stats['contents']} contents, "
+            f"~{stats['tokens_before']} -> ~{stats['tokens_after']} tokens "
+            f"({stats['compacted_tool_results']} tool results compacted, "
+            f"{stats['dropped']} contents dropped)"
+        )
+        return None
+
+    return before_model_callback
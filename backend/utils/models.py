@@ -0,0 +1,229 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import AsyncGenerator, Optional, Union
+
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from google.adk.models.registry import LLMRegistry
+from google.genai import types
+from pydantic import PrivateAttr
+
+from utils.logging_config import setup_logger
+
+logger = setup_logger(__name__)
+
+# === Configuration ===
+DEFAULT_MODEL = os.getenv("DEFAULT_MODEL", "gemini-2.0-flash")
+DEFAULT_P95_THRESHOLD = float(os.getenv("MODEL_P95_THRESHOLD", "8"))
+DEFAULT_COOLDOWN_SECONDS = float(os.getenv("MODEL_FALLBACK_COOLDOWN", "60"))
+
+# Latencies kept per model, and how many are needed before p95 is trusted
+LATENCY_WINDOW = 100
+MIN_LATENCY_SAMPLES = 20
+
+
+class LatencyTracker:
+    """Rolling latency samples and error counts for one model, shared by every agent using it."""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self._samples = deque(maxlen=window)  # (time.monotonic() when recorded, seconds)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append((time.monotonic(), seconds))
+            self.calls += 1
+
+    def record_error(self):
+        with self._lock:
+            self.calls += 1
+            self.errors += 1
+
+    def count(self, since: float = 0.0) -> int:
+        """Number of samples recorded at or after since (a time.monotonic() value)."""
+        with self._lock:
+            return sum(1 for recorded, _ in self._samples if recorded >= since)
+
+    def p95(self, since: float = 0.0) -> Optional[float]:
+        """
+        95th percentile latency of the samples recorded at or after since, or None until
+        MIN_LATENCY_SAMPLES of them have completed.
+        """
+        with self._lock:
+            ordered = sorted(seconds for recorded, seconds in self._samples if recorded >= since)
+        if len(ordered) < MIN_LATENCY_SAMPLES:
+            return None
+        return ordered[int(0.95 * (len(ordered) - 1))]
+
+
+_trackers = {}
+_trackers_lock = threading.Lock()
+
+
+def get_tracker(model: str) -> LatencyTracker:
+    with _trackers_lock:
+        return _trackers.setdefault(model, LatencyTracker())
+
+
+def model_stats() -> dict:
+    """Latency and error summary per model, for logging or a metrics endpoint."""
+    with _trackers_lock:
+        trackers = dict(_trackers)
+    return {
+        model: {"calls": t.calls, "errors": t.errors, "p95_seconds": t.p95()}
+        for model, t in trackers.items()
+    }
+
+
+class TieredLlm(BaseLlm):
+    """
+    Model wrapper that sends requests to a primary model and switches to a fallback model.
+
+    The fallback is used for the rest of a request when the primary raises before producing any
+    output, and for all requests during a cooldown after the primary errors or its p95 latency
+    exceeds p95_threshold. After the cooldown the primary is tried again: the first call is a
+    probe that degrades it again if it alone exceeds the threshold, and from then on p95 only
+    counts samples recorded since the cooldown ended, so old slow samples cannot keep the
+    primary degraded.
+    """
+
+    fallback: str
+    p95_threshold: float = DEFAULT_P95_THRESHOLD
+    cooldown: float = DEFAULT_COOLDOWN_SECONDS
+
+    _degraded_until: float = PrivateAttr(default=0.0)
+    # Primary latency samples recorded before this time are ignored
+    _samples_since: float = PrivateAttr(default=0.0)
+    _llms: dict = PrivateAttr(default_factory=dict)
+
+    def _llm(self, model: str) -> BaseLlm:
+        if model not in self._llms:
+            self._llms[model] = LLMRegistry.new_llm(model)
+        return self._llms[model]
+
+    def _degrade(self, reason: str):
+        self._degraded_until = time.monotonic() + self.cooldown
+        self._samples_since = self._degraded_until
+        logger.warning(
+            f"Model {self.model} degraded ({reason}); using {self.fallback} for {self.cooldown:.0f}s"
+        )
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        if time.monotonic() < self._degraded_until:
+            tiers = [self.fallback]
+        else:
+            tiers = [self.model, self.fallback]
+
+        for i, model in enumerate(tiers):
+            tracker = get_tracker(model)
+            llm_request.model = model
+            started = time.perf_counter()
+            produced = False
+            try:
+                async for response in self._llm(model).generate_content_async(llm_request, stream):
+                    produced = True
+                    yield response
+            except Exception as e:
+                tracker.record_error()
+                if model == self.model:
+                    self._degrade(f"error: {e}")
+                # Output already streamed to the caller cannot be taken back
+                if produced or i == len(tiers) - 1:
+                    raise
+                logger.warning(f"Model {model} failed, retrying on {tiers[i + 1]}: {e}")
+                continue
+
+            seconds = time.perf_counter() - started
+            tracker.record(seconds)
+            if model == self.model:
+                probing = self._samples_since > 0 and tracker.count(self._samples_since) == 1
+                p95 = tracker.p95(self._samples_since)
+                if probing and seconds > self.p95_threshold:
+                    self._degrade(f"probe took {seconds:.2f}s > {self.p95_threshold:.2f}s")
+                elif p95 is not None and p95 > self.p95_threshold:
+                    self._degrade(f"p95 {p95:.2f}s > {self.p95_threshold:.2f}s")
+            return
+
+
+class FakeLlm(BaseLlm):
+    """
+    Local stand-in model for testing without API calls.
+
+    Model names select the behaviour: 'fake' answers immediately, 'fake-<ms>ms' waits that long
+    first (e.g. 'fake-2500ms'), and 'fake-error' always raises.
+    """
+
+    @classmethod
+    def supported_models(cls) -> list[str]:
+        return [r"fake(-.*)?"]
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        model = llm_request.model or self.model
+        if model.endswith("-error"):
+            raise RuntimeError(f"{model} is configured to fail")
+        if model.endswith("ms"):
+            await asyncio.sleep(int(model.rsplit("-", 1)[1][:-2]) / 1000)
+
+        yield LlmResponse(
+            content=types.Content(
+                role="model", parts=[types.Part(text=f"[{model}] fake response")]
+            )
+        )
+
+
+LLMRegistry.register(FakeLlm)
+
+
+# === Per-agent Resolution ===
+def _load_config() -> dict:
+    """Per-agent model settings from the JSON file named by MODEL_CONFIG, if any."""
+    path = os.getenv("MODEL_CONFIG")
+    if not path:
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logger.error(f"Could not read model config {path}: {e}")
+        return {}
+
+
+def resolve_model(agent_name: str, default: str = DEFAULT_MODEL) -> Union[str, BaseLlm]:
+    """
+    Model for an agent, from the environment, then the MODEL_CONFIG file, then the default.
+
+    Environment overrides use the agent name in upper case, e.g. SCHEDULER_MODEL,
+    SCHEDULER_FALLBACK_MODEL, SCHEDULER_P95_THRESHOLD and SCHEDULER_FALLBACK_COOLDOWN (both in
+    seconds). The config file maps agent names to {"model", "fallback", "p95_threshold",
+    "cooldown"}. Without a fallback the plain model name is returned and ADK resolves it as usual.
+    """
+    config = _load_config().get(agent_name, {})
+    prefix = agent_name.upper()
+
+    model = os.getenv(f"{prefix}_MODEL") or config.get("model") or default
+    fallback = os.getenv(f"{prefix}_FALLBACK_MODEL") or config.get("fallback")
+    logger.info(f"Agent {agent_name} using model {model} (fallback: {fallback})")
+    if not fallback or fallback == model:
+        return model
+
+    return TieredLlm(
+        model=model,
+        fallback=fallback,
+        p95_threshold=float(
+            os.getenv(f"{prefix}_P95_THRESHOLD")
+            or config.get("p95_threshold", DEFAULT_P95_THRESHOLD)
+        ),
+        cooldown=float(
+            os.getenv(f"{prefix}_FALLBACK_COOLDOWN")
+            or config.get("cooldown", DEFAULT_COOLDOWN_SECONDS)
+        ),
+    )
@@ -0,0 +1,176 @@
+import asyncio
+import collections
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmResponse
+from google.adk.tools import BaseTool, ToolContext
+
+from utils.logging_config import setup_logger
+from utils.tool_cache import STATE_KEY, remember
+
+logger = setup_logger(__name__)
+
+# === Configuration ===
+PARALLEL_TOOL_WORKERS = int(os.getenv("PARALLEL_TOOL_WORKERS", "16"))
+PARALLEL_TOOLS_PER_TURN = int(os.getenv("PARALLEL_TOOLS_PER_TURN", "4"))
+# Prefetched results nobody picked up (e.g. the turn failed) are dropped after this long
+PREFETCH_TTL_SECONDS = 120
+
+
+def run_in_thread(tool: Callable) -> Callable:
+    """
+    Wrap a synchronous tool so the agent framework awaits it in a worker thread.
+
+    The framework calls synchronous tools directly on the event loop, so a tool waiting on a
+    database query stalls every other session, and identical lookups from two sessions can never
+    be in flight at once for singleflight to coalesce. The wrapper keeps the tool's name,
+    docstring and signature, so the declaration sent to the model and tool_context injection are
+    unchanged.
+    """
+
+    @functools.wraps(tool)
+    async def wrapper(**kwargs):
+        return await asyncio.to_thread(tool, **kwargs)
+
+    return wrapper
+
+
+class ParallelToolPrefetcher:
+    """
+    Runs the independent tool calls of one model response concurrently.
+
+    The agent framework executes the function calls of a response one at a time. As soon as the
+    model responds, after_model_callback queues every call to a parallel-safe tool and hands the
+    queue to at most max_per_turn workers of a shared thread pool, so one response never holds
+    more workers than its cap and the pool stays free for other sessions. When the framework then reaches each call in order,
+    before_tool_callback waits for its prefetched result and returns it in place of running the
+    tool, so responses keep their original order and the turn takes about as long as its slowest
+    call.
+
+    Only tools that read no session state and change nothing belong in parallel_safe; state
+    mutating tools (select_desired_courses, finalize_schedule, ...) run serialized as before.
+    """
+
+    def __init__(
+        self,
+        tools,
+        parallel_safe: set[str],
+        max_per_turn: int = PARALLEL_TOOLS_PER_TURN,
+    ):
+        """
+        Args:
+            tools (Iterable[Callable]): The agent's tool functions.
+            parallel_safe (set[str]): Names of the tools that may be prefetched.
+            max_per_turn (int): How many prefetched calls of one response run at once.
+        """
+        self.tools = {tool.__name__: tool for tool in tools if tool.__name__ in parallel_safe}
+        self.max_per_turn = max_per_turn
+        self._executor = ThreadPoolExecutor(
+            max_workers=PARALLEL_TOOL_WORKERS, thread_name_prefix="tool"
+        )
+        self._pending = {}  # (invocation_id, tool, args) -> (future, submitted_at)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(invocation_id: str, name: str, args: Optional[dict]) -> tuple:
+        return invocation_id, name, json.dumps(args or {}, sort_keys=True, default=str)
+
+    def _is_cached(self, call, cached: dict) -> bool:
+        """Whether the session cache already answers this call, making a prefetch wasted work."""
+        cache_key = getattr(self.tools[call.name], "cache_key", None)
+        try:
+            key = cache_key(**(call.args or {})) if cache_key is not None else None
+        except TypeError:
+            # Arguments that do not fit the tool; it reports that itself when run
+            return False
+        return key is not None and key in cached
+
+    def _call(self, name: str, args: dict) -> Any:
+        tool = self.tools[name]
+        kwargs = dict(args)
+        if "tool_context" in inspect.signature(tool).parameters:
+            # Without a context, session-memoized tools compute the result directly
+            kwargs["tool_context"] = None
+        return tool(**kwargs)
+
+    def _drain(self, queue: collections.deque):
+        """Run the queued (name, args, future) calls of one turn until none are left."""
+        while True:
+            try:
+                name, args, future = queue.popleft()
+            except IndexError:
+                return
+            if not future.set_running_or_notify_cancel():
+                # Expired before it started
+                continue
+            try:
+                future.set_result(self._call(name, args))
+            except Exception as e:
+                future.set_exception(e)
+
+    def after_model_callback(
+        self, callback_context: CallbackContext, llm_response: LlmResponse
+    ) -> Optional[LlmResponse]:
+        cached = callback_context.state.get(STATE_KEY) or {}
+        calls = [
+            part.function_call
+            for part in (llm_response.content.parts if llm_response.content else None) or []
+            if part.function_call is not None
+            and part.function_call.name in self.tools
+            and not self._is_cached(part.function_call, cached)
+        ]
+        self._expire()
+        if len(calls) < 2:
+            return None
+
+        queue = collections.deque()
+        with self._lock:
+            for call in calls:
+                key = self._key(callback_context.invocation_id, call.name, call.args)
+                if key not in self._pending:
+                    future = Future()
+                    queue.append((call.name, call.args or {}, future))
+                    self._pending[key] = (future, time.monotonic())
+        for _ in range(min(max(self.max_per_turn, 1), len(queue))):
+            self._executor.submit(self._drain, queue)
+        logger.info(f"Prefetching {len(calls)} parallel tool calls: {[c.name for c in calls]}")
+        return None
+
+    async def before_tool_callback(
+        self, tool: BaseTool, args: dict, tool_context: ToolContext
+    ) -> Optional[dict]:
+        with self._lock:
+            entry = self._pending.pop(self._key(tool_context.invocation_id, tool.name, args), None)
+        if entry is None:
+            return None
+
+        future, _ = entry
+        try:
+            # Wait without blocking the event loop, which other sessions share
+            result = await asyncio.wrap_future(future)
+        except Exception as e:
+            # Let the tool run normally so it reports the error in its usual shape
+            logger.warning(f"Prefetched {tool.name} failed, running it directly: {e}")
+            return None
+
+        cache_key = getattr(self.tools[tool.name], "cache_key", None)
+        key = cache_key(**args) if cache_key is not None else None
+        if key is not None:
+            remember(tool_context, key, result)
+        return result
+
+    def _expire(self):
+        now = time.monotonic()
+        with self._lock:
+            for key, (future, submitted_at) in list(self._pending.items()):
+                if now - submitted_at > PREFETCH_TTL_SECONDS:
+                    future.cancel()
+                    del self._pending[key]
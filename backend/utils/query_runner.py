@@ -0,0 +1,189 @@
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Optional
+
+from utils.logging_config import setup_logger
+
+logger = setup_logger(__name__)
+
+# === Configuration ===
+QUERY_DEADLINE_SECONDS = float(os.getenv("QUERY_DEADLINE_SECONDS", "10"))
+QUERY_MAX_RETRIES = int(os.getenv("QUERY_MAX_RETRIES", "2"))
+QUERY_WORKERS = int(os.getenv("QUERY_WORKERS", "16"))
+BACKOFF_BASE_SECONDS = 0.2
+BACKOFF_CAP_SECONDS = 2.0
+
+# HTTP status codes (exposed as `.code` by the client's exceptions) worth retrying
+RETRYABLE_CODES = {408, 429, 500, 502, 503, 504}
+
+LATENCY_WINDOW = 200
+MIN_HEDGE_SAMPLES = 20
+
+
+class QueryTimeout(TimeoutError):
+    """Raised when a query does not complete within its deadline, retries included."""
+
+
+def is_retryable(error: Exception) -> bool:
+    """Transient errors: timeouts, dropped connections and throttling/server-side failures."""
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    return getattr(error, "code", None) in RETRYABLE_CODES
+
+
+# === Metrics ===
+class QueryMetrics:
+    """Per-query-name latencies and counters for tail-latency analysis."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latencies = {}
+        self._counters = {}
+
+    def record(self, name: str, seconds: float):
+        with self._lock:
+            self._latencies.setdefault(name, deque(maxlen=LATENCY_WINDOW)).append(seconds)
+
+    def count(self, name: str, event: str):
+        with self._lock:
+            counters = self._counters.setdefault(name, {})
+            counters[event] = counters.get(event, 0) + 1
+
+    def percentile(self, name: str, q: float) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._latencies.get(name, ()))
+        if len(samples) < MIN_HEDGE_SAMPLES:
+            return None
+        return samples[int(q * (len(samples) - 1))]
+
+    def snapshot(self) -> dict:
+        """Counters and p50/p95/p99 latency (seconds) per query name."""
+        with self._lock:
+            names = set(self._latencies) | set(self._counters)
+            counters = {name: dict(self._counters.get(name, {})) for name in names}
+        return {
+            name: {
+                **counters[name],
+                "p50": self.percentile(name, 0.50),
+                "p95": self.percentile(name, 0.95),
+                "p99": self.percentile(name, 0.99),
+            }
+            for name in names
+        }
+
+
+metrics = QueryMetrics()
+_executor = ThreadPoolExecutor(max_workers=QUERY_WORKERS, thread_name_prefix="query")
+
+
+# === Execution ===
+def _execute(client, query: str, job_config, timeout: float, jobs: list) -> list:
+    job = client.query(query, job_config=job_config) if job_config else client.query(query)
+    jobs.append(job)
+    return list(job.result(timeout=max(timeout, 0)))
+
+
+def _cancel(jobs: list):
+    """Best-effort cancellation of abandoned jobs so they stop using database capacity."""
+    for job in jobs:
+        try:
+            job.cancel()
+        except Exception:
+            pass
+
+
+def _attempt(client, query: str, job_config, name: str, deadline: float, hedge: bool) -> list:
+    """
+    One attempt, optionally hedged: if the query is still running after the observed p95, a
+    duplicate is started and whichever finishes first wins.
+    """
+    jobs = []
+    remaining = deadline - time.monotonic()
+    futures = {_executor.submit(_execute, client, query, job_config, remaining, jobs)}
+
+    hedge_after = metrics.percentile(name, 0.95) if hedge else None
+    if hedge_after is not None and hedge_after < remaining:
+        done, _ = wait(futures, timeout=hedge_after)
+        if not done:
+            metrics.count(name, "hedged")
+            remaining = deadline - time.monotonic()
+            futures.add(_executor.submit(_execute, client, query, job_config, remaining, jobs))
+
+    pending = set(futures)
+    error = None
+    while pending:
+        done, pending = wait(pending, timeout=deadline - time.monotonic(), return_when=FIRST_COMPLETED)
+        if not done:
+            break
+        for future in done:
+            try:
+                rows = future.result()
+            except Exception as e:
+                # Keep waiting on the hedge, if any, before reporting the failure
+                error = e
+                continue
+            _cancel(jobs)
+            return rows
+
+    _cancel(jobs)
+    if error is not None and not pending and not isinstance(error, TimeoutError):
+        raise error
+    raise QueryTimeout(f"Query '{name}' exceeded its deadline") from error
+
+
+def run_query(
+    client,
+    query: str,
+    job_config=None,
+    name: str = "query",
+    deadline: float = QUERY_DEADLINE_SECONDS,
+    max_retries: int = QUERY_MAX_RETRIES,
+    hedge: bool = False,
+) -> list:
+    """
+    Run a database query with a deadline, jittered retries and optional hedging.
+
+    Args:
+        client: Database client exposing query(query, job_config=...).result(timeout=...).
+        query (str): SQL text.
+        job_config: Query parameters/config passed through to the client.
+        name (str): Label used for metrics and logs; use one per distinct query.
+        deadline (float): Seconds for the whole call, retries and backoff included.
+        max_retries (int): Retries after the first attempt for transient errors.
+        hedge (bool): Start a duplicate query once the first runs longer than this query's p95.
+            Only for idempotent reads.
+
+    Returns:
+        list: The result rows.
+
+    Raises:
+        QueryTimeout: If the deadline passes first.
+        Exception: The last error, once it is not retryable or the retries are used up.
+    """
+    started = time.monotonic()
+    end = started + deadline
+
+    for attempt in range(max_retries + 1):
+        metrics.count(name, "attempts")
+        try:
+            rows = _attempt(client, query, job_config, name, end, hedge)
+            metrics.record(name, time.monotonic() - started)
+            metrics.count(name, "succeeded")
+            return rows
+        except Exception as e:
+            metrics.count(name, "timeouts" if isinstance(e, QueryTimeout) else "errors")
+            backoff = random.uniform(0, min(BACKOFF_CAP_SECONDS, BACKOFF_BASE_SECONDS * 2**attempt))
+            if (
+                attempt == max_retries
+                or not is_retryable(e)
+                or time.monotonic() + backoff >= end
+            ):
+                logger.error(f"Query '{name}' failed after {attempt + 1} attempts: {e}")
+                raise
+            logger.warning(f"Query '{name}' attempt {attempt + 1} failed, retrying: {e}")
+            metrics.count(name, "retries")
+            time.sleep(backoff)
@@ -0,0 +1,41 @@
+import os
+
+from utils.tokens import estimate_tokens
+
+# === Configuration ===
+# Fields of the student record that are rendered into agent prompts, in order
+DEFAULT_PROMPT_FIELDS = ["Major_1_Desc", "Term", "Term_Code", "courses_still_needed"]
+PROMPT_FIELDS = [
+    field.strip()
+    for field in os.getenv("STUDENT_PROMPT_FIELDS", ",".join(DEFAULT_PROMPT_FIELDS)).split(",")
+    if field.strip()
+]
+
+
+def render_student_profile(student: dict, fields: list[str] = PROMPT_FIELDS) -> str:
+    """
+    Render the prompt-relevant fields of a student record as compact 'Field: value' lines.
+
+    The full record stays in state['student_details'] for the get_student_details tool.
+
+    Args:
+        student (dict): The student record loaded by the coordinator.
+        fields (list[str]): Fields to include; missing or empty ones are skipped.
+
+    Returns:
+        str: One line per field, or a placeholder if nothing is known about the student.
+    """
+    lines = []
+    for field in fields:
+        value = student.get(field)
+        if value is None or value == "" or value == []:
+            continue
+        if isinstance(value, (list, tuple, set)):
+            value = ", ".join(str(v) for v in value)
+        lines.append(f"{field}: {value}")
+    return "\n".join(lines) or "No student details available."
+
+
+def profile_savings(student: dict, profile: str) -> tuple[int, int]:
+    """Estimated prompt tokens of the full record and of the rendered profile."""
+    return estimate_tokens(student), estimate_tokens(profile)
@@ -0,0 +1,29 @@
+TERM_MAP = {"10": "Winter", "20": "Spring", "30": "Summer", "40": "Fall"}
+REGULAR_TERMS = ["10", "20", "40"]
+
+
+def term_label(term_code: str) -> str:
+    """
+    Converts a 6-digit term code (e.g., 202540) into a human-readable format (e.g., Fall 2025)
+    """
+    term_code = str(term_code)
+    if len(term_code) == 6:
+        year = term_code[:4]
+        code = term_code[4:]
+        return f"{TERM_MAP.get(code, 'Unknown')} {year}"
+    return "Unknown Term"
+
+
+def next_term(term_code: str, include_summer: bool = False) -> str:
+    """
+    Returns the term code that follows the given one (e.g., 202540 -> 202610).
+
+    Summer terms (30) are skipped unless include_summer is True.
+    """
+    term_code = str(term_code)
+    year, code = int(term_code[:4]), term_code[4:]
+    codes = sorted(TERM_MAP) if include_summer else REGULAR_TERMS
+    later = [c for c in codes if c > code]
+    if later:
+        return f"{year}{later[0]}"
+    return f"{year + 1}{codes[0]}"
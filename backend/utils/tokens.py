@@ -0,0 +1,19 @@
+import json
+
+# Rough average for English text and JSON with Gemini/GPT-style tokenizers
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(value) -> int:
+    """
+    Cheap token estimate for text, JSON-like values or pydantic models (e.g. genai Content).
+    """
+    if value is None:
+        return 0
+    if isinstance(value, str):
+        text = value
+    elif hasattr(value, "model_dump_json"):
+        text = value.model_dump_json(exclude_none=True)
+    else:
+        text = json.dumps(value, default=str)
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
@@ -0,0 +1,122 @@
+import copy
+import functools
+import inspect
+import json
+import os
+from typing import Callable, Optional
+
+from utils.logging_config import setup_logger
+
+logger = setup_logger(__name__)
+
+# === Configuration ===
+STATE_KEY = "tool_cache"
+TOOL_CACHE_MAX_ENTRIES = int(os.getenv("TOOL_CACHE_MAX_ENTRIES", "32"))
+# Larger results are not cached, since the cache is persisted with the session state
+TOOL_CACHE_MAX_ENTRY_BYTES = int(os.getenv("TOOL_CACHE_MAX_ENTRY_BYTES", "32768"))
+
+# Tools whose cached results are dropped when the student changes their selections
+_selection_dependent = set()
+
+
+def session_memoize(version: Optional[Callable[[], str]] = None, depends_on_selection: bool = False):
+    """
+    Memoize a tool's successful results in session state (state['tool_cache']).
+
+    Entries are keyed by tool name, arguments (other than tool_context) and, if given, a version
+    such as the catalog version, so a catalog refresh naturally misses. The cache keeps the most
+    recent TOOL_CACHE_MAX_ENTRIES results and skips results over TOOL_CACHE_MAX_ENTRY_BYTES.
+
+    The decorated tool must accept a tool_context argument; the wrapper keeps the tool's
+    signature so the agent framework still injects it. If the version cannot be determined
+    (e.g. the catalog fails to load), the tool runs uncached and reports errors as usual.
+
+    Args:
+        version (Callable[[], str] | None): Returns the version of the data the tool reads.
+        depends_on_selection (bool): Whether the tool reads the student's selections, constraints
+            or final schedule; its entries are then dropped in invalidate_selection().
+    """
+
+    def decorator(fn):
+        signature = inspect.signature(fn)
+        if depends_on_selection:
+            _selection_dependent.add(fn.__name__)
+
+        def cache_key(*args, **kwargs) -> Optional[str]:
+            """Cache key for a call (tool_context may be omitted); None if the version is unknown."""
+            bound = signature.bind_partial(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = {k: v for k, v in bound.arguments.items() if k != "tool_context"}
+            try:
+                data_version = version() if version else None
+            except Exception as e:
+                logger.warning(f"No cache version for {fn.__name__}, running uncached: {e}")
+                return None
+            return json.dumps([fn.__name__, data_version, arguments], sort_keys=True, default=str)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            tool_context = signature.bind(*args, **kwargs).arguments.get("tool_context")
+            if tool_context is None:
+                return fn(*args, **kwargs)
+
+            key = cache_key(*args, **kwargs)
+            if key is None:
+                return fn(*args, **kwargs)
+            cache = tool_context.state.get(STATE_KEY) or {}
+            if key in cache:
+                logger.info(f"Session cache hit for {fn.__name__}")
+                return copy.deepcopy(cache[key])
+
+            result = fn(*args, **kwargs)
+            remember(tool_context, key, result)
+            return result
+
+        wrapper.cache_key = cache_key
+        return wrapper
+
+    return decorator
+
+
+def remember(tool_context, key: str, result) -> bool:
+    """
+    Store a successful tool result under key, within the cache's size limits.
+
+    Returns:
+        bool: Whether the result was cached.
+    """
+    if not isinstance(result, dict) or result.get("status") != "success":
+        return False
+    if len(json.dumps(result, default=str)) > TOOL_CACHE_MAX_ENTRY_BYTES:
+        return False
+
+    cache = dict(tool_context.state.get(STATE_KEY) or {})
+    cache[key] = copy.deepcopy(result)
+    # Entries are kept in insertion order, so the oldest go first
+    while len(cache) > TOOL_CACHE_MAX_ENTRIES:
+        cache.pop(next(iter(cache)))
+    tool_context.state[STATE_KEY] = cache
+    return True
+
+
+def invalidate_selection(tool_context) -> int:
+    """
+    Drop cached results of tools that depend on the student's selections.
+
+    Call it whenever state['selected_courses'], state['constraints'] or state['final_schedule']
+    changes.
+
+    Returns:
+        int: Number of entries removed.
+    """
+    cache = tool_context.state.get(STATE_KEY) or {}
+    kept = {
+        key: value
+        for key, value in cache.items()
+        if json.loads(key)[0] not in _selection_dependent
+    }
+    removed = len(cache) - len(kept)
+    if removed:
+        tool_context.state[STATE_KEY] = kept
+        logger.info(f"Invalidated {removed} cached tool results after a selection change")
+    return removed
@@ -0,0 +1,27 @@
+from typing import Optional
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmResponse
+
+from utils.logging_config import setup_logger
+
+logger = setup_logger(__name__)
+
+
+def make_usage_logger(agent_name: str):
+    """
+    Build an after_model_callback that logs the token usage reported for each model call.
+    """
+
+    def after_model_callback(
+        callback_context: CallbackContext, llm_response: LlmResponse
+    ) -> Optional[LlmResponse]:
+        usage = llm_response.usage_metadata
+        if usage is not None:
+            logger.info(
+                f"[{agent_name}] tokens: prompt={usage.prompt_token_count} "
+                f"response={usage.candidates_token_count} total={usage.total_token_count}"
+            )
+        return None
+
+    return after_model_callback